@@ -1,64 +1,562 @@
 """
 Main analysis pipeline orchestrator.
 Calls all three external API services in parallel, then computes the risk score.
+Raw upstream responses go through the per-source cache tier in cache.py, so
+only stale sources are refetched; sources that had nothing (or errored) are
+remembered in the negative tier for a short, per-kind TTL. Each upstream call runs behind a circuit
+breaker, the source's own timeout and the request deadline; sources that don't make
+it are listed in AnalyzeResponse.skipped_sources.
+
+For proxy contracts, the implementation's verified source is fetched and
+scanned as well, and its flags are merged into the admin flags. The scan is
+cached per chain:implementation and concurrent lookups of one implementation
+share a single call, so tokens sharing an implementation cost one extra
+Etherscan request between them.
 """
 import asyncio
-import httpx
-from typing import Optional
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
-from config import get_chain_config
+from cachetools import LRUCache
+
+from cache import (
+    get_negative, get_resolved_chains, get_source_cached,
+    set_negative, set_resolved_chains, set_source_cached,
+)
+from circuit import get_breaker
+from config import CHAIN_CONFIG, get_chain_config, settings
 from models import (
     AnalyzeResponse, TokenInfo, MarketInfo, HoldersInfo,
     AdminInfo, TradeRiskInfo, ScoreInfo, LinksInfo,
 )
-from services.dexscreener import fetch_dexscreener_data
+from services.clients import HttpClients, client_for
+from services.dexscreener import (
+    DEXSCREENER_BATCH_SIZE, fetch_dexscreener_batch, fetch_dexscreener_cross_chain, fetch_dexscreener_data,
+)
 from services.etherscan import fetch_etherscan_data
-from services.goplus import fetch_goplus_data
-from scoring import compute_risk_score
+from services.goplus import GOPLUS_BATCH_SIZE, fetch_goplus_data, fetch_goplus_batch
+from services.upstream import UpstreamBudget, UpstreamTimeout, upstream_budget
+from scoring import ScoreBreakdown, score_incrementally
+from singleflight import SingleFlight
+from scoring_rules import ScoringRules
+from source_scanner import scan_source
+from ratelimit import RateLimitTimeout
+from logs import get_logger
+from metrics import SCORE_CATEGORIES, SCORING_DURATION, SOURCE_SKIPS
+from timing import add_timing, timed
+
+logger = get_logger(__name__)
+
+# Negative-cache kind for a source that answered but had nothing for the token.
+_NO_DATA_KIND = {"dexscreener": "no_dex_pair", "goplus": "no_goplus_data"}
+# Last score breakdown per chain_id:address, so a refresh only rescores the
+# categories whose inputs changed.
+_breakdowns: "LRUCache[str, ScoreBreakdown]" = LRUCache(maxsize=settings.source_cache_maxsize)
+implementation_flight = SingleFlight()
+_CHAIN_BY_DEXSCREENER_ID = {config["dexscreener_id"]: chain for chain, config in CHAIN_CONFIG.items()}
+
+
+class ChainDetectionError(Exception):
+    """The cross-chain lookup failed, so the token's chains are unknown."""
 
 
 async def analyze_token(
     chain: str,
     token_address: str,
-    http_client: httpx.AsyncClient,
+    http_client: HttpClients,
+    deadline: Optional[float] = None,
 ) -> AnalyzeResponse:
+    """
+    deadline is an absolute time.monotonic() value. Sources that have not
+    answered by then are skipped and the response is scored from what arrived.
+    """
     chain_config = get_chain_config(chain)
+    address = normalize_address(token_address)
+
+    skipped: Dict[str, str] = {}
+    fetches = _source_fetches(chain, chain_config, address, http_client, deadline, skipped)
+
+    dex_data, etherscan_data, goplus_data = await asyncio.gather(
+        fetches["dexscreener"], fetches["etherscan"], fetches["goplus"],
+    )
+
+    return _assemble_response(
+        address, chain_config, dex_data, etherscan_data, goplus_data, skipped,
+        score_key=_score_key(chain_config, address),
+    )
+
+
+async def analyze_token_stream(
+    chain: str,
+    token_address: str,
+    http_client: HttpClients,
+    deadline: Optional[float] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Progressive variant of analyze_token. Yields (event, payload) pairs:
+    "market", "holders", "trade_risk" and "admin" as soon as the sources they
+    depend on resolve, a "provisional_score" after each source while others
+    are still pending, then the final "score" and the full "result".
+    """
+    chain_config = get_chain_config(chain)
+    address = normalize_address(token_address)
+
+    skipped: Dict[str, str] = {}
+    fetches = _source_fetches(chain, chain_config, address, http_client, deadline, skipped)
+    tasks = {asyncio.ensure_future(fetch): source for source, fetch in fetches.items()}
+    data: Dict[str, Optional[dict]] = {source: None for source in fetches}
+    resolved = set()
+
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source = tasks[task]
+                data[source] = task.result()
+                resolved.add(source)
+
+                if source == "dexscreener":
+                    yield "market", _build_market_info(data["dexscreener"], chain_config)
+                elif source == "goplus":
+                    yield "holders", _build_holders_info(data["goplus"])
+                    yield "trade_risk", _build_trade_risk_info(data["goplus"])
+                if source in ("etherscan", "goplus") and {"etherscan", "goplus"} <= resolved:
+                    yield "admin", _build_admin_info(data["etherscan"], data["goplus"])
+
+            if pending:
+                provisional = _assemble_response(
+                    address, chain_config, data["dexscreener"], data["etherscan"], data["goplus"],
+                )
+                yield "provisional_score", provisional.score
+    finally:
+        for task in pending:
+            task.cancel()
+
+    result = _assemble_response(
+        address, chain_config, data["dexscreener"], data["etherscan"], data["goplus"], skipped,
+        score_key=_score_key(chain_config, address),
+    )
+    yield "score", result.score
+    yield "result", result
+
+
+async def detect_chains(token_address: str, http_client: HttpClients) -> List[str]:
+    """
+    Supported chains the token trades on, most liquid first, from one
+    cross-chain DexScreener lookup. Results are cached per address. Unless the
+    lookup hit its pair cap, the per-chain pair data also seeds the DexScreener
+    source cache, so the analyses that follow don't call DexScreener again; a
+    truncated pair list is only used to pick the chains.
+    """
+    address = normalize_address(token_address)
+    cached = get_resolved_chains(address)
+    if cached is not None:
+        return cached
+
+    skipped: Dict[str, str] = {}
+    found = await _guarded_fetch(
+        "dexscreener",
+        lambda: fetch_dexscreener_cross_chain(client_for(http_client, "dexscreener"), address),
+        None, skipped,
+    )
+    if found is None:
+        raise ChainDetectionError(f"Chain detection unavailable (dexscreener: {skipped.get('dexscreener')})")
+
+    by_chain = {
+        _CHAIN_BY_DEXSCREENER_ID[chain_id]: data
+        for chain_id, data in found.items()
+        if chain_id in _CHAIN_BY_DEXSCREENER_ID
+    }
+    for chain, data in by_chain.items():
+        if not data.pop("truncated", False):
+            set_source_cached("dexscreener", f"{chain}:{address}", data)
+
+    chains = sorted(by_chain, key=lambda c: by_chain[c]["pair"]["liquidity_usd"] or 0, reverse=True)
+    set_resolved_chains(address, chains)
+    return chains
+
+
+async def analyze_tokens(
+    tokens: List[Tuple[str, str]],
+    http_client: HttpClients,
+) -> List[Union[AnalyzeResponse, Exception]]:
+    """
+    Analyze many (chain, token_address) pairs at once.
+    DexScreener and GoPlus are called once per chain per batch chunk;
+    Etherscan has no multi-address getsourcecode, so it stays per token.
+    Results come back in input order; invalid entries yield their ValueError.
+    """
+    results: List[Union[AnalyzeResponse, Exception, None]] = [None] * len(tokens)
+    by_chain: Dict[str, List[Tuple[int, str]]] = {}
+
+    for i, (chain, token_address) in enumerate(tokens):
+        try:
+            get_chain_config(chain)
+            address = normalize_address(token_address)
+        except ValueError as e:
+            results[i] = e
+            continue
+        by_chain.setdefault(chain, []).append((i, address))
+
+    await asyncio.gather(*(
+        _analyze_chain_batch(chain, entries, http_client, results)
+        for chain, entries in by_chain.items()
+    ))
+    return results
+
+
+async def _analyze_chain_batch(
+    chain: str,
+    entries: List[Tuple[int, str]],
+    http_client: HttpClients,
+    results: list,
+) -> None:
+    chain_config = get_chain_config(chain)
+    addresses = list(dict.fromkeys(address for _, address in entries))
+    skipped: Dict[str, Dict[str, str]] = {a: {} for a in addresses}
+
+    dex_batch, goplus_batch, etherscan_results = await asyncio.gather(
+        _cached_fetch_batch(
+            "dexscreener", chain, addresses, DEXSCREENER_BATCH_SIZE,
+            lambda chunk: fetch_dexscreener_batch(client_for(http_client, "dexscreener"), chain_config["dexscreener_id"], chunk),
+            skipped,
+        ),
+        _cached_fetch_batch(
+            "goplus", chain, addresses, GOPLUS_BATCH_SIZE,
+            lambda chunk: fetch_goplus_batch(client_for(http_client, "goplus"), chain_config["goplus_chain_id"], chunk),
+            skipped,
+        ),
+        asyncio.gather(*(
+            _with_implementation(
+                chain, chain_config, a, http_client, None, skipped[a],
+                _cached_fetch(
+                    "etherscan", f"{chain}:{a}",
+                    lambda a=a: _guarded_fetch(
+                        "etherscan",
+                        lambda: fetch_etherscan_data(client_for(http_client, "etherscan"), chain_config["chain_id"], a),
+                        None, skipped[a],
+                    ),
+                    skipped[a],
+                ),
+            )
+            for a in addresses
+        )),
+    )
+    etherscan_batch = dict(zip(addresses, etherscan_results))
+
+    for i, address in entries:
+        try:
+            results[i] = _assemble_response(
+                address, chain_config, dex_batch.get(address), etherscan_batch.get(address),
+                goplus_batch.get(address), dict(skipped[address]),
+                score_key=_score_key(chain_config, address),
+            )
+        except Exception as e:
+            results[i] = e
+
+
+def _source_fetches(
+    chain: str,
+    chain_config: dict,
+    address: str,
+    http_client: HttpClients,
+    deadline: Optional[float],
+    skipped: Dict[str, str],
+) -> Dict[str, Awaitable[Optional[dict]]]:
+    source_key = f"{chain}:{address}"
+    return {
+        "dexscreener": _cached_fetch(
+            "dexscreener", source_key,
+            lambda: _guarded_fetch(
+                "dexscreener",
+                lambda: fetch_dexscreener_data(client_for(http_client, "dexscreener"), chain_config["dexscreener_id"], address),
+                deadline, skipped,
+            ),
+            skipped,
+        ),
+        "etherscan": _with_implementation(
+            chain, chain_config, address, http_client, deadline, skipped,
+            _cached_fetch(
+                "etherscan", source_key,
+                lambda: _guarded_fetch(
+                    "etherscan",
+                    lambda: fetch_etherscan_data(client_for(http_client, "etherscan"), chain_config["chain_id"], address),
+                    deadline, skipped,
+                ),
+                skipped,
+            ),
+        ),
+        "goplus": _cached_fetch(
+            "goplus", source_key,
+            lambda: _guarded_fetch(
+                "goplus",
+                lambda: fetch_goplus_data(client_for(http_client, "goplus"), chain_config["goplus_chain_id"], address),
+                deadline, skipped,
+            ),
+            skipped,
+        ),
+    }
+
+
+async def _with_implementation(
+    chain: str,
+    chain_config: dict,
+    address: str,
+    http_client: HttpClients,
+    deadline: Optional[float],
+    skipped: Dict[str, str],
+    etherscan_fetch: Awaitable[Optional[dict]],
+) -> Optional[dict]:
+    """Attach the scan of a proxy's implementation contract to its Etherscan data."""
+    data = await etherscan_fetch
+    implementation = _implementation_address(data, address)
+    if implementation is None:
+        return data
+
+    key = f"{chain}:{implementation}"
+
+    async def shared_scan() -> Tuple[Optional[dict], Optional[str]]:
+        # Shared by every caller for this implementation, so it runs on the
+        # source's own timeout rather than any one caller's deadline.
+        scan_skipped: Dict[str, str] = {}
+        scan = await _cached_fetch(
+            "implementation", key,
+            lambda: _guarded_fetch(
+                "etherscan",
+                lambda: _scan_implementation(client_for(http_client, "etherscan"), chain_config["chain_id"], implementation),
+                None, scan_skipped,
+            ),
+            scan_skipped,
+        )
+        return scan, scan_skipped.get("etherscan")
+
+    remaining = None if deadline is None else deadline - time.monotonic()
+    if remaining is not None and remaining <= 0:
+        _skip(skipped, "etherscan_implementation", "budget_exhausted")
+        return data
+    try:
+        # do() shields the shared scan, so a caller giving up doesn't cancel it for the rest.
+        scan, reason = await asyncio.wait_for(implementation_flight.do(key, shared_scan), timeout=remaining)
+    except asyncio.TimeoutError:
+        _skip(skipped, "etherscan_implementation", "timeout")
+        return data
+    if reason is not None:
+        _skip(skipped, "etherscan_implementation", reason)
+    return {**data, "implementation_scan": scan} if scan else data
+
+
+def _implementation_address(etherscan_data: Optional[dict], address: str) -> Optional[str]:
+    if not etherscan_data or not etherscan_data.get("proxy"):
+        return None
+    try:
+        implementation = normalize_address(etherscan_data.get("implementation") or "")
+    except ValueError:
+        return None
+    return implementation if implementation != address else None
+
+
+async def _scan_implementation(client, chain_id: int, implementation: str) -> Optional[dict]:
+    """Fetch an implementation contract and keep only what the admin check needs."""
+    data = await fetch_etherscan_data(client, chain_id, implementation)
+    if data is None:
+        return None
+    return {
+        "address": implementation,
+        "contract_name": data["contract_name"],
+        "is_verified": data["is_verified"],
+        "flags": list(scan_source(data["source_code"])) if data["source_code"] else [],
+    }
+
+
+async def _guarded_fetch(
+    source: str,
+    fetch: Callable[[], Awaitable],
+    deadline: Optional[float],
+    skipped: Dict[str, str],
+):
+    """
+    Run one upstream fetch behind its circuit breaker and timeouts.
+    Failures are recorded in skipped (source -> reason) and yield None.
+
+    Two clocks apply. The source's own timeout (upstream_budget) starts once
+    the request holds a rate-limit slot, and only running out of it counts
+    against the breaker. The caller's deadline bounds the whole fetch,
+    queueing included; running out of that says nothing about the upstream.
+    """
+    remaining = None if deadline is None else deadline - time.monotonic()
+    if remaining is not None and remaining <= 0:
+        _skip(skipped, source, "budget_exhausted")
+        return None
+
+    breaker = get_breaker(source)
+    if not breaker.allow():
+        _skip(skipped, source, "circuit_open")
+        return None
+
+    budget = upstream_budget.set(UpstreamBudget(getattr(settings, f"{source}_timeout_seconds")))
+    try:
+        with timed(source):
+            data = await asyncio.wait_for(fetch(), timeout=remaining)
+    except asyncio.TimeoutError as e:
+        if remaining is None or time.monotonic() < deadline:
+            # Raised by the fetch itself, not by our deadline: an ordinary upstream failure.
+            breaker.record_failure()
+            logger.warning("Upstream fetch failed", extra={"source": source, "error": repr(e)})
+            _skip(skipped, source, "error")
+            return None
+        logger.warning("Request deadline reached", extra={"source": source, "timeout_s": round(remaining, 3)})
+        _skip(skipped, source, "timeout")
+        return None
+    except UpstreamTimeout as e:
+        breaker.record_failure()
+        logger.warning("Upstream timed out", extra={"source": source, "error": str(e)})
+        _skip(skipped, source, "timeout")
+        return None
+    except RateLimitTimeout as e:
+        # Our own queue was full; the upstream itself is not failing.
+        logger.warning("Rate-limit queue full, source skipped", extra={"source": source, "error": str(e)})
+        _skip(skipped, source, "rate_limited")
+        return None
+    except Exception as e:
+        breaker.record_failure()
+        logger.warning("Upstream fetch failed", extra={"source": source, "error": str(e)})
+        _skip(skipped, source, "error")
+        return None
+    finally:
+        upstream_budget.reset(budget)
+
+    breaker.record_success()
+    return data
+
+
+def _skip(skipped: Dict[str, str], source: str, reason: str) -> None:
+    skipped[source] = reason
+    SOURCE_SKIPS.inc(source=source, reason=reason)
+
+
+async def _cached_fetch(
+    source: str,
+    cache_key: str,
+    fetch: Callable[[], Awaitable],
+    skipped: Dict[str, str],
+):
+    cached = get_source_cached(source, cache_key)
+    if cached is not None:
+        return cached
+
+    negative = get_negative(source, cache_key)
+    if negative == "upstream_error":
+        _skip(skipped, source, "upstream_error")
+        return None
+    if negative is not None:
+        return None
+
+    data = await fetch()
+    if data is not None:
+        set_source_cached(source, cache_key, data)
+    else:
+        kind = _negative_kind(source, skipped)
+        if kind:
+            set_negative(source, cache_key, kind)
+    return data
+
+
+async def _cached_fetch_batch(
+    source: str,
+    chain: str,
+    addresses: List[str],
+    chunk_size: int,
+    fetch_chunk: Callable[[List[str]], Awaitable[Dict[str, Optional[dict]]]],
+    skipped: Dict[str, Dict[str, str]],
+) -> Dict[str, Optional[dict]]:
+    """
+    Fetch the addresses that aren't cached, one guarded call per chunk, so a
+    slow or failing chunk only costs its own addresses (recorded in
+    skipped[address]) and counts once against the breaker.
+    Negative "no data" entries are honoured here, but remembered upstream
+    errors are not: the batch call goes out anyway, so retrying them is free.
+    """
+    found = {}
+    missing = []
+    for address in addresses:
+        key = f"{chain}:{address}"
+        cached = get_source_cached(source, key)
+        if cached is not None:
+            found[address] = cached
+        elif get_negative(source, key) in (None, "upstream_error"):
+            missing.append(address)
+        else:
+            found[address] = None
+
+    async def fetch(chunk: List[str]) -> None:
+        chunk_skipped: Dict[str, str] = {}
+        fetched = await _guarded_fetch(source, lambda: fetch_chunk(chunk), None, chunk_skipped) or {}
+        kind = _negative_kind(source, chunk_skipped)
+        for address in chunk:
+            data = fetched.get(address)
+            found[address] = data
+            if data is not None:
+                set_source_cached(source, f"{chain}:{address}", data)
+                continue
+            if kind:
+                set_negative(source, f"{chain}:{address}", kind)
+            if source in chunk_skipped:
+                skipped[address][source] = chunk_skipped[source]
+
+    await asyncio.gather(*(fetch(missing[i:i + chunk_size]) for i in range(0, len(missing), chunk_size)))
+    return found
+
+
+def _negative_kind(source: str, skipped: Dict[str, str]) -> Optional[str]:
+    """
+    What to remember when a fetch came back empty. Only real upstream failures
+    count as errors; our own timeouts, rate-limit queue, breaker and budget
+    depend on this request and are not cached.
+    """
+    reason = skipped.get(source)
+    if reason is None:
+        return _NO_DATA_KIND.get(source)
+    if reason == "error":
+        return "upstream_error"
+    return None
+
+
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def normalize_address(token_address: str) -> str:
     address = token_address.lower().strip()
 
-    if not address.startswith("0x") or len(address) != 42:
+    if not address.startswith("0x") or len(address) != 42 or not _HEX_DIGITS.issuperset(address[2:]):
         raise ValueError("Invalid token address format. Must be 0x followed by 40 hex characters.")
 
-    dex_task = fetch_dexscreener_data(http_client, chain_config["dexscreener_id"], address)
-    etherscan_task = fetch_etherscan_data(http_client, chain_config["chain_id"], address)
-    goplus_task = fetch_goplus_data(http_client, chain_config["goplus_chain_id"], address)
+    return address
 
-    dex_data, etherscan_data, goplus_data = await asyncio.gather(
-        dex_task, etherscan_task, goplus_task,
-        return_exceptions=True,
-    )
 
-    if isinstance(dex_data, Exception):
-        print(f"DexScreener error: {dex_data}")
-        dex_data = None
-    if isinstance(etherscan_data, Exception):
-        print(f"Etherscan error: {etherscan_data}")
-        etherscan_data = None
-    if isinstance(goplus_data, Exception):
-        print(f"GoPlus error: {goplus_data}")
-        goplus_data = None
-
-    token_info = _build_token_info(address, dex_data, etherscan_data, goplus_data)
-    market_info = _build_market_info(dex_data, chain_config)
-    holders_info = _build_holders_info(goplus_data)
-    admin_info = _build_admin_info(etherscan_data, goplus_data)
-    trade_risk_info = _build_trade_risk_info(goplus_data)
-
-    score_info = compute_risk_score(
-        token=token_info,
-        market=market_info,
-        holders=holders_info,
-        admin=admin_info,
-        trade_risk=trade_risk_info,
+def _score_key(chain_config, address: str) -> str:
+    return f"{chain_config['chain_id']}:{address}"
+
+
+def _assemble_response(
+    address, chain_config, dex_data, etherscan_data, goplus_data, skipped=None,
+    score_key: Optional[str] = None,
+) -> AnalyzeResponse:
+    """Pass score_key only for final results; provisional scores must not replace the stored breakdown."""
+    with timed("build_token"):
+        token_info = _build_token_info(address, dex_data, etherscan_data, goplus_data)
+    with timed("build_market"):
+        market_info = _build_market_info(dex_data, chain_config)
+    with timed("build_holders"):
+        holders_info = _build_holders_info(goplus_data)
+    with timed("build_admin"):
+        admin_info = _build_admin_info(etherscan_data, goplus_data)
+    with timed("build_trade_risk"):
+        trade_risk_info = _build_trade_risk_info(goplus_data)
+
+    score_info = _score(
+        token_info, market_info, holders_info, admin_info, trade_risk_info, skipped,
+        score_key=score_key,
     )
 
     explorer_base = chain_config["explorer_url"]
@@ -77,7 +575,47 @@ async def analyze_token(
         trade_risk=trade_risk_info,
         score=score_info,
         links=links_info,
+        partial=bool(skipped),
+        skipped_sources=dict(skipped or {}),
+    )
+
+
+def rescore_response(response: AnalyzeResponse, rules: Optional[ScoringRules] = None) -> AnalyzeResponse:
+    """Recompute the score of an existing response from its signals, without any upstream calls."""
+    score_info = _score(
+        response.token, response.market, response.holders, response.admin,
+        response.trade_risk, response.skipped_sources, rules,
     )
+    return response.model_copy(update={"score": score_info})
+
+
+def _score(
+    token_info, market_info, holders_info, admin_info, trade_risk_info,
+    skipped=None, rules=None, score_key: Optional[str] = None,
+) -> ScoreInfo:
+    """With a score_key, categories whose inputs match that key's last breakdown are reused."""
+    started = time.perf_counter()
+    score_info, breakdown, recomputed = score_incrementally(
+        token=token_info,
+        market=market_info,
+        holders=holders_info,
+        admin=admin_info,
+        trade_risk=trade_risk_info,
+        rules=rules,
+        previous=_breakdowns.get(score_key) if score_key else None,
+    )
+    if score_key:
+        _breakdowns[score_key] = breakdown
+    SCORE_CATEGORIES.inc(len(recomputed), outcome="recomputed")
+    SCORE_CATEGORIES.inc(len(breakdown.parts) - len(recomputed), outcome="reused")
+    elapsed = time.perf_counter() - started
+    SCORING_DURATION.observe(elapsed)
+    add_timing("score", elapsed)
+    if skipped:
+        score_info.reasons.append(
+            f"Partial result — skipped {', '.join(sorted(skipped))}; score may not reflect true risk."
+        )
+    return score_info
 
 
 def _build_token_info(address, dex_data, etherscan_data, goplus_data) -> TokenInfo:
@@ -204,18 +742,15 @@ def _build_admin_info(etherscan_data, goplus_data) -> AdminInfo:
             flags.append("external_call_risk")
 
     if etherscan_data and etherscan_data.get("source_code"):
-        source = etherscan_data["source_code"].lower()
-        danger_patterns = {
-            "mint": "mint_function_detected",
-            "blacklist": "blacklist_terms_detected",
-            "setfee": "fee_modification_detected",
-            "settax": "tax_modification_detected",
-            "pause": "pause_function_detected",
-            "tradingenabled": "trading_toggle_detected",
-            "onlyowner": "owner_restricted_functions",
-        }
-        for keyword, flag in danger_patterns.items():
-            if keyword in source and flag not in flags:
+        for flag in scan_source(etherscan_data["source_code"]):
+            if flag not in flags:
+                flags.append(flag)
+
+    # A proxy's own source is a stub; the logic that matters is in its implementation.
+    implementation_scan = (etherscan_data or {}).get("implementation_scan")
+    if implementation_scan:
+        for flag in implementation_scan["flags"]:
+            if flag not in flags:
                 flags.append(flag)
 
     return AdminInfo(
@@ -0,0 +1,297 @@
+"""
+Vectorized batch scoring engine.
+
+Scores many tokens in one pass over columnar signal arrays (NumPy), for
+rescoring stored snapshots and backtesting threshold changes. Takes the same
+ScoringRules as scoring.py (the active rules by default) and produces
+identical scores, labels and reasons.
+
+Reasons are returned as a uint64 bitmask per row ("reason codes"). Bits are
+assigned per rules version in the order compute_risk_score emits reasons, so
+decoding a row's bits in ascending order reproduces its reason list exactly.
+"""
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import scoring
+from models import AdminInfo, HoldersInfo, MarketInfo, ScoreInfo, TokenInfo, TradeRiskInfo
+from scoring_rules import ScoringRules, get_rules
+
+# Columns not listed here are float64.
+_DTYPES = {
+    "holders_present": bool,
+    "market_present": bool,
+    "liquidity_present": bool,
+    "verified": np.int8,
+    "owner_active": bool,
+    "admin_flags": np.uint64,
+    "trade_present": bool,
+    "honeypot": bool,
+    "cannot_sell": bool,
+    "cannot_buy": bool,
+}
+
+
+@dataclass
+class SignalColumns:
+    """One array per signal; missing numeric values are NaN."""
+    holders_present: np.ndarray
+    top1_pct: np.ndarray
+    top5_pct: np.ndarray
+    holder_count: np.ndarray
+    market_present: np.ndarray
+    liquidity_present: np.ndarray
+    liquidity_usd: np.ndarray
+    age_days: np.ndarray
+    verified: np.ndarray  # int8: -1 unknown, 0 unverified, 1 verified
+    owner_active: np.ndarray
+    admin_flags: np.ndarray  # uint64 bitmask over admin_flag_names
+    trade_present: np.ndarray
+    honeypot: np.ndarray
+    cannot_sell: np.ndarray
+    cannot_buy: np.ndarray
+    sell_tax_pct: np.ndarray
+    buy_tax_pct: np.ndarray
+    admin_flag_names: Tuple[str, ...] = field(default=())
+
+    def __len__(self) -> int:
+        return len(self.holders_present)
+
+    @classmethod
+    def from_signals(
+        cls,
+        signals: Iterable[Tuple[
+            TokenInfo, Optional[MarketInfo], Optional[HoldersInfo], AdminInfo, Optional[TradeRiskInfo],
+        ]],
+        rules: Optional[ScoringRules] = None,
+    ) -> "SignalColumns":
+        """
+        Build columns from the same arguments compute_risk_score takes.
+        Admin flags are encoded over the flags the rules know about; the
+        columns can still be scored under other rule versions.
+        """
+        flag_names = tuple(flag for flag, _, _ in (rules or get_rules()).admin_flag_scores)
+        assert len(flag_names) <= 64, "admin flags must fit in a uint64"
+        rows = [_row(*signal, flag_names) for signal in signals]
+        names = [f.name for f in fields(cls) if f.name != "admin_flag_names"]
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        return cls(
+            **{
+                name: np.array(column, dtype=_DTYPES.get(name, float))
+                for name, column in zip(names, columns)
+            },
+            admin_flag_names=flag_names,
+        )
+
+
+@dataclass
+class BatchScores:
+    risk_score: np.ndarray
+    label: np.ndarray
+    reason_codes: np.ndarray
+
+
+def _row(token, market, holders, admin, trade_risk, flag_names) -> tuple:
+    nan = float("nan")
+
+    def num(value):
+        return nan if value is None else float(value)
+
+    count = scoring.holder_count_value(holders) if holders else None
+    age = scoring.token_age_days(token, market)
+    flag_set = set(admin.flags)
+    flag_bits = 0
+    for bit, flag in enumerate(flag_names):
+        if flag in flag_set:
+            flag_bits |= 1 << bit
+
+    return (
+        bool(holders),
+        num(holders.top1_pct) if holders and holders.top1_pct else nan,
+        num(holders.top5_pct) if holders and holders.top5_pct else nan,
+        num(count),
+        bool(market),
+        bool(market and market.liquidity_usd is not None),
+        num(market.liquidity_usd) if market else nan,
+        num(age),
+        -1 if token.verified is None else int(bool(token.verified)),
+        bool(admin.has_owner and not admin.owner_renounced),
+        flag_bits,
+        bool(trade_risk),
+        bool(trade_risk and trade_risk.honeypot),
+        bool(trade_risk and trade_risk.cannot_sell),
+        bool(trade_risk and trade_risk.cannot_buy),
+        num(trade_risk.sell_tax_pct) if trade_risk else nan,
+        num(trade_risk.buy_tax_pct) if trade_risk else nan,
+    )
+
+
+class _ReasonLayout:
+    """
+    Reason bit assignment for one rules version, in compute_risk_score's
+    emission order. Each entry is (template, column the value is formatted
+    from, cast for formatting).
+    """
+
+    def __init__(self, rules: ScoringRules):
+        self.reasons: List[Tuple[str, Optional[str], Optional[type]]] = []
+        self.top1 = self._tier_bits(rules.top1_tiers, "top1_pct", float)
+        self.top5 = self._tier_bits(rules.top5_tiers, "top5_pct", float)
+        self.holder_count = self._tier_bits(rules.holder_count_tiers, "holder_count", int)
+        self.liquidity_missing = self._bit(rules.liquidity_missing[1])
+        self.liquidity = self._tier_bits(rules.liquidity_tiers, "liquidity_usd", float)
+        self.age = self._tier_bits(rules.age_tiers, "age_days", int)
+        self.unverified = self._bit(rules.unverified[1])
+        self.owner = self._bit(rules.owner_active[1])
+        self.admin_flags = [self._bit(reason) for _, _, reason in rules.admin_flag_scores]
+        self.honeypot = self._bit(rules.honeypot[1])
+        self.cannot_sell = self._bit(rules.cannot_sell[1])
+        self.cannot_buy = self._bit(rules.cannot_buy[1])
+        self.sell_tax = self._tier_bits(rules.sell_tax_tiers, "sell_tax_pct", float)
+        self.buy_tax = self._tier_bits(rules.buy_tax_tiers, "buy_tax_pct", float)
+        self.limited_data = self._bit(rules.limited_data_reason)
+        if len(self.reasons) > 64:
+            raise ValueError("Rule table has more than 64 reasons; reason codes must fit in a uint64")
+
+    def _bit(self, template: str, column: Optional[str] = None, cast: Optional[type] = None) -> int:
+        self.reasons.append((template, column, cast))
+        return len(self.reasons) - 1
+
+    def _tier_bits(self, tiers, column: str, cast: type) -> List[Optional[int]]:
+        return [self._bit(reason, column, cast) if reason else None for _, _, reason in tiers]
+
+
+@lru_cache(maxsize=8)
+def _layout(rules: ScoringRules) -> _ReasonLayout:
+    return _ReasonLayout(rules)
+
+
+def _bit(index: int) -> np.uint64:
+    return np.uint64(1) << np.uint64(index)
+
+
+def _apply_tiers(values, tiers, bits, above: bool, codes) -> np.ndarray:
+    """First matching tier wins; NaN never matches."""
+    points = np.zeros(len(values), dtype=np.int64)
+    matched = np.zeros(len(values), dtype=bool)
+    for (threshold, tier_points, _), bit in zip(tiers, bits):
+        hit = ~matched & ((values > threshold) if above else (values < threshold))
+        points[hit] = tier_points
+        if bit is not None:
+            codes[hit] |= _bit(bit)
+        matched |= hit
+    return points
+
+
+def score_columns(cols: SignalColumns, rules: Optional[ScoringRules] = None) -> BatchScores:
+    rules = rules or get_rules()
+    bits = _layout(rules)
+    n = len(cols)
+    codes = np.zeros(n, dtype=np.uint64)
+
+    holders = (
+        _apply_tiers(cols.top1_pct, rules.top1_tiers, bits.top1, True, codes)
+        + _apply_tiers(cols.top5_pct, rules.top5_tiers, bits.top5, True, codes)
+        + _apply_tiers(cols.holder_count, rules.holder_count_tiers, bits.holder_count, False, codes)
+    )
+    holders = np.where(cols.holders_present, np.minimum(rules.holders_cap, holders), 0)
+
+    liquidity_missing = ~cols.liquidity_present
+    codes[liquidity_missing] |= _bit(bits.liquidity_missing)
+    liquidity = np.where(
+        liquidity_missing,
+        rules.liquidity_missing[0],
+        np.minimum(
+            rules.liquidity_cap,
+            _apply_tiers(cols.liquidity_usd, rules.liquidity_tiers, bits.liquidity, False, codes),
+        ),
+    )
+
+    age = _apply_tiers(cols.age_days, rules.age_tiers, bits.age, False, codes)
+
+    unverified = cols.verified == 0
+    codes[unverified] |= _bit(bits.unverified)
+    verification = np.select(
+        [cols.verified == -1, unverified],
+        [rules.verification_unknown_points, rules.unverified[0]],
+        0,
+    )
+
+    admin = np.where(cols.owner_active, rules.owner_active[0], 0)
+    codes[cols.owner_active] |= _bit(bits.owner)
+    for (flag, pts, _), bit in zip(rules.admin_flag_scores, bits.admin_flags):
+        if flag not in cols.admin_flag_names:
+            continue
+        index = cols.admin_flag_names.index(flag)
+        has_flag = (cols.admin_flags >> np.uint64(index)) & np.uint64(1) == 1
+        admin = admin + np.where(has_flag, pts, 0)
+        codes[has_flag] |= _bit(bit)
+    admin = np.minimum(rules.admin_cap, admin)
+
+    # Honeypot short-circuits the whole trade-risk category, reasons included.
+    honeypot = cols.trade_present & cols.honeypot
+    trade_codes = np.zeros(n, dtype=np.uint64)
+    trade = (
+        np.where(cols.cannot_sell, rules.cannot_sell[0], 0)
+        + np.where(cols.cannot_buy, rules.cannot_buy[0], 0)
+    )
+    trade_codes[cols.cannot_sell] |= _bit(bits.cannot_sell)
+    trade_codes[cols.cannot_buy] |= _bit(bits.cannot_buy)
+    trade = trade + _apply_tiers(cols.sell_tax_pct, rules.sell_tax_tiers, bits.sell_tax, True, trade_codes)
+    trade = trade + _apply_tiers(cols.buy_tax_pct, rules.buy_tax_tiers, bits.buy_tax, True, trade_codes)
+    trade = np.minimum(rules.trade_risk_cap, trade)
+    trade = np.where(honeypot, rules.honeypot[0], trade)
+    trade = np.where(cols.trade_present, trade, 0)
+    trade_codes[honeypot] = _bit(bits.honeypot)
+    trade_codes[~cols.trade_present] = 0
+    codes |= trade_codes
+
+    total = np.clip(holders + liquidity + age + verification + admin + trade, 0, 100)
+
+    label = np.full(n, rules.default_label, dtype=object)
+    for min_score, name in reversed(rules.label_thresholds):
+        label[total >= min_score] = name
+
+    limited = ~cols.market_present & ~cols.holders_present & ~cols.trade_present
+    codes[limited] |= _bit(bits.limited_data)
+
+    return BatchScores(risk_score=total, label=label, reason_codes=codes)
+
+
+def decode_reasons(
+    cols: SignalColumns,
+    reason_codes: np.ndarray,
+    row: int,
+    rules: Optional[ScoringRules] = None,
+) -> List[str]:
+    code = int(reason_codes[row])
+    reasons = []
+    for bit, (template, column, cast) in enumerate(_layout(rules or get_rules()).reasons):
+        if code >> bit & 1:
+            if column is None:
+                reasons.append(template)
+            else:
+                reasons.append(template.format(value=cast(getattr(cols, column)[row])))
+    return reasons
+
+
+def score_infos(
+    cols: SignalColumns,
+    scores: Optional[BatchScores] = None,
+    rules: Optional[ScoringRules] = None,
+) -> List[ScoreInfo]:
+    """Materialize per-row ScoreInfo objects (mainly for parity checks and small batches)."""
+    rules = rules or get_rules()
+    scores = scores or score_columns(cols, rules)
+    return [
+        ScoreInfo(
+            risk_score=int(scores.risk_score[i]),
+            label=scores.label[i],
+            reasons=decode_reasons(cols, scores.reason_codes, i, rules),
+            rules_version=rules.version,
+        )
+        for i in range(len(cols))
+    ]
@@ -0,0 +1,266 @@
+"""
+Benchmark /api/analyze against local upstream stand-ins.
+
+Runs the FastAPI app in-process (httpx ASGITransport) with every upstream
+routed to the stand-ins in bench/upstreams.py, then drives /api/analyze at a
+fixed concurrency in two phases:
+
+  cold  every token requested once with empty caches
+  warm  the same tokens requested again --warm-rounds times
+
+With --replay DIR the stand-ins are replaced by a recording made with
+UPSTREAM_MODE=record (see services/recording.py), and the tokens come from
+--seed (chain,address CSV), so runs use real upstream payloads without
+network access.
+
+Throughput, latency percentiles, errors and X-Cache counts per phase are
+printed and written as JSON (bench/results/ by default). With --baseline, p95
+and throughput are compared against an earlier result file and the exit code
+is 1 when either regressed by more than --tolerance.
+
+    cd backend && python -m bench.run --tokens 200 --concurrency 20 --source-kb 2048
+    cd backend && python -m bench.run --replay recordings --seed seed_tokens.csv
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import httpx
+
+import analyzer
+import cache
+import circuit
+import main as api
+import prewarm
+import ratelimit
+import source_scanner
+from bench.upstreams import StandInConfig, stand_in_router
+from cache_backends import MemoryBackend
+from config import settings
+from services import upstream
+from services.clients import SOURCES, UpstreamClients
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _percentile(ordered: List[float], pct: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _summarize(latencies: List[float], statuses: Counter, cache_status: Counter, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    ms = lambda v: None if v is None else round(v * 1000, 2)  # noqa: E731
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": ms(_percentile(ordered, 50)),
+        "p95_ms": ms(_percentile(ordered, 95)),
+        "p99_ms": ms(_percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1] if ordered else None),
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "x_cache": dict(sorted(cache_status.items())),
+    }
+
+
+def _reset_state(rate_limit_rps: float) -> dict:
+    """
+    Empty every cache and per-process registry so the cold phase is really
+    cold. Returns the settings it overrode, for restoring afterwards.
+    """
+    overridden = {"etherscan_api_key": settings.etherscan_api_key, "history_enabled": settings.history_enabled}
+    settings.etherscan_api_key = settings.etherscan_api_key or "bench"
+    # Bench tokens are made up; keep them out of the real score history.
+    settings.history_enabled = False
+    cache._backend = MemoryBackend()
+    cache._cache.clear()
+    for source_cache in cache._source_caches.values():
+        source_cache.clear()
+    cache._negative_cache.clear()
+    cache._chain_cache.clear()
+    analyzer._breakdowns.clear()
+    source_scanner._scan_cache.clear()
+    ratelimit._limiters.clear()
+    circuit._breakers.clear()
+    upstream._latencies.clear()
+    for source in SOURCES:
+        for name, value in ((f"{source}_rate_per_second", rate_limit_rps),
+                            (f"{source}_rate_burst", max(1, int(rate_limit_rps)))):
+            overridden[name] = getattr(settings, name)
+            setattr(settings, name, value)
+    return overridden
+
+
+async def _drive(client: httpx.AsyncClient, tokens: List[Tuple[str, str]], concurrency: int) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for token in tokens:
+        queue.put_nowait(token)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    cache_status: Counter = Counter()
+
+    async def worker():
+        while True:
+            try:
+                chain, address = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/api/analyze", json={"chain": chain, "token_address": address},
+                )
+                statuses[response.status_code] += 1
+                cache_status[response.headers.get("X-Cache", "none")] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(latencies, statuses, cache_status, time.perf_counter() - started)
+
+
+async def run_benchmark(
+    tokens: int = 100,
+    concurrency: int = 10,
+    warm_rounds: int = 3,
+    latency_ms: float = 50.0,
+    jitter_ms: float = 10.0,
+    error_rate: float = 0.0,
+    source_kb: int = 20,
+    rate_limit_rps: float = 1_000_000.0,
+    chain: str = "ethereum",
+    replay_dir: Optional[str] = None,
+    seed_path: Optional[str] = None,
+    replay_latency_scale: float = 1.0,
+) -> dict:
+    overridden = _reset_state(rate_limit_rps)
+    if replay_dir:
+        for name, value in (("upstream_mode", "replay"), ("upstream_record_dir", replay_dir),
+                            ("upstream_replay_latency_scale", replay_latency_scale)):
+            overridden[name] = getattr(settings, name)
+            setattr(settings, name, value)
+        token_list = prewarm.load_seed_file(seed_path)
+        api.app.state.http_client = UpstreamClients()
+    else:
+        stand_in = StandInConfig(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate)
+        router = stand_in_router(
+            stand_in,
+            StandInConfig(latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, source_kb=source_kb),
+            stand_in,
+        )
+        token_list = [(chain, f"0x{i:040x}") for i in range(1, tokens + 1)]
+        api.app.state.http_client = UpstreamClients(transport=router)
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=api.app), base_url="http://bench", timeout=120,
+        ) as client:
+            cold = await _drive(client, token_list, concurrency)
+            warm = await _drive(client, token_list * warm_rounds, concurrency)
+    finally:
+        await api.app.state.http_client.aclose()
+        for name, value in overridden.items():
+            setattr(settings, name, value)
+        ratelimit._limiters.clear()
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "config": {
+            "tokens": tokens, "concurrency": concurrency, "warm_rounds": warm_rounds,
+            "latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate,
+            "source_kb": source_kb, "rate_limit_rps": rate_limit_rps, "chain": chain,
+            "replay_dir": replay_dir, "seed_path": seed_path, "replay_latency_scale": replay_latency_scale,
+        },
+        "phases": {"cold": cold, "warm": warm},
+    }
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions beyond tolerance (a fraction) in p95 latency or throughput, per phase."""
+    regressions = []
+    for phase, current in result["phases"].items():
+        before = baseline.get("phases", {}).get(phase)
+        if not before:
+            continue
+        if before.get("p95_ms") and current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{phase} p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if before.get("throughput_rps") and current["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{phase} throughput {before['throughput_rps']} -> {current['throughput_rps']} rps")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warm-rounds", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="stand-in latency per upstream call")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stand-in calls answered 503")
+    parser.add_argument("--source-kb", type=int, default=20, help="Etherscan source code size")
+    parser.add_argument("--rate-limit-rps", type=float, default=1_000_000.0,
+                        help="per-upstream rate limit during the run (default: effectively off)")
+    parser.add_argument("--replay", metavar="DIR", help="replay a recording instead of the stand-ins")
+    parser.add_argument("--seed", help="chain,address CSV of tokens to replay (default: PREWARM_SEED_PATH)")
+    parser.add_argument("--replay-latency-scale", type=float, default=1.0,
+                        help="multiplier on recorded latencies (0 = instant)")
+    parser.add_argument("--output", type=Path, help="result file (default: bench/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+    # One access log line per request would dominate the run.
+    logging.getLogger("rugcheck").setLevel(logging.WARNING)
+
+    result = asyncio.run(run_benchmark(
+        tokens=args.tokens, concurrency=args.concurrency, warm_rounds=args.warm_rounds,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        source_kb=args.source_kb, rate_limit_rps=args.rate_limit_rps,
+        replay_dir=args.replay, seed_path=args.seed, replay_latency_scale=args.replay_latency_scale,
+    ))
+
+    output = args.output or RESULTS_DIR / f"{result['timestamp'].replace(':', '')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+
+    for phase, stats in result["phases"].items():
+        print(
+            f"{phase:>5}: {stats['requests']} req, {stats['throughput_rps']} rps, "
+            f"p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms, "
+            f"status {stats['status']}, cache {stats['x_cache']}"
+        )
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
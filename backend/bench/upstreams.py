@@ -0,0 +1,170 @@
+"""
+Local ASGI stand-ins for DexScreener, Etherscan and GoPlus.
+
+Each stand-in answers the endpoints the service clients call with realistic
+payloads derived deterministically from the token address, after a
+configurable latency, and fails a configurable share of requests with 503.
+Etherscan source code can be padded to multi-MB sizes to exercise the source
+scanner and the size-bounded source cache.
+"""
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from services.dexscreener import DEXSCREENER_BASE
+from services.etherscan import ETHERSCAN_V2_BASE
+from services.goplus import GOPLUS_BASE
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    # Etherscan only: approximate size of the returned source code.
+    source_kb: int = 20
+
+
+def _seed(address: str) -> int:
+    return int(hashlib.sha256(address.lower().encode()).hexdigest()[:8], 16)
+
+
+async def _delay_or_fail(config: StandInConfig, rng: random.Random):
+    await asyncio.sleep(max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+    if config.error_rate and rng.random() < config.error_rate:
+        return Response("stand-in error", status_code=503)
+    return None
+
+
+def dexscreener_app(config: StandInConfig) -> Starlette:
+    rng = random.Random(1)
+
+    def pairs_for(address: str) -> list:
+        r = random.Random(_seed(address))
+        return [
+            {
+                "dexId": r.choice(["uniswap", "sushiswap", "pancakeswap"]),
+                "pairAddress": "0x" + hashlib.sha256(f"{address}{i}".encode()).hexdigest()[:40],
+                "baseToken": {"address": address, "name": f"Token {address[2:8]}", "symbol": address[2:6].upper()},
+                "quoteToken": {"address": "0x" + "c" * 40, "name": "Wrapped Ether", "symbol": "WETH"},
+                "priceUsd": f"{r.uniform(0.0001, 10):.6f}",
+                "liquidity": {"usd": r.choice([1_000, 15_000, 80_000, 2_500_000])},
+                "volume": {"h24": r.uniform(0, 1e6)},
+                "priceChange": {"h24": r.uniform(-50, 50)},
+                "fdv": r.uniform(1e4, 1e9),
+                "marketCap": r.uniform(1e4, 1e9),
+                "pairCreatedAt": 1_600_000_000_000 + r.randint(0, 10**11),
+            }
+            for i in range(r.randint(1, 4))
+        ]
+
+    async def tokens(request: Request):
+        failure = await _delay_or_fail(config, rng)
+        if failure:
+            return failure
+        addresses = request.path_params["addresses"].split(",")
+        return JSONResponse([pair for a in addresses for pair in pairs_for(a)])
+
+    return Starlette(routes=[Route("/tokens/v1/{chain}/{addresses}", tokens)])
+
+
+def etherscan_app(config: StandInConfig) -> Starlette:
+    rng = random.Random(2)
+    snippet = (
+        "    function mint(address to, uint256 amount) external onlyOwner { _mint(to, amount); }\n"
+        "    function setFee(uint256 fee) external onlyOwner { _fee = fee; }\n"
+        "    // padding: transfer balanceOf allowance approve totalSupply\n"
+    )
+    padding = snippet * max(1, config.source_kb * 1024 // len(snippet))
+    body = "contract StandIn {\n" + padding + "}\n"
+
+    async def api(request: Request):
+        failure = await _delay_or_fail(config, rng)
+        if failure:
+            return failure
+        address = request.query_params.get("address", "")
+        verified = _seed(address) % 5 != 0
+        # Unique per address, so the scanner's content-hash memo doesn't hide scan cost.
+        source = f"// SPDX-License-Identifier: MIT\n// {address}\npragma solidity ^0.8.0;\n" + body
+        result = {
+            "SourceCode": source if verified else "",
+            "ABI": "[]" if verified else "Contract source code not verified",
+            "ContractName": "StandIn",
+            "CompilerVersion": "v0.8.20",
+            "Proxy": "0",
+            "Implementation": "",
+        }
+        return JSONResponse({"status": "1", "message": "OK", "result": [result]})
+
+    return Starlette(routes=[Route("/v2/api", api)])
+
+
+def goplus_app(config: StandInConfig) -> Starlette:
+    rng = random.Random(3)
+
+    def token_security(address: str) -> dict:
+        r = random.Random(_seed(address) + 1)
+        holders = [
+            {"address": "0x" + hashlib.sha256(f"{address}h{i}".encode()).hexdigest()[:40],
+             "percent": f"{r.uniform(0, 0.3):.6f}", "is_contract": 0, "is_locked": 0}
+            for i in range(10)
+        ]
+        flag = lambda p: "1" if r.random() < p else "0"  # noqa: E731
+        return {
+            "token_name": f"Token {address[2:8]}",
+            "token_symbol": address[2:6].upper(),
+            "total_supply": str(r.randint(10**6, 10**12)),
+            "holder_count": str(r.choice([12, 150, 5_000, 250_000])),
+            "holders": holders,
+            "owner_address": r.choice(["0x" + "0" * 40, "0x" + "e" * 40]),
+            "is_mintable": flag(0.2),
+            "is_proxy": flag(0.1),
+            "transfer_pausable": flag(0.1),
+            "slippage_modifiable": flag(0.1),
+            "is_blacklisted": flag(0.1),
+            "is_honeypot": flag(0.05),
+            "cannot_sell_all": flag(0.05),
+            "cannot_buy": flag(0.02),
+            "buy_tax": f"{r.choice([0, 0.02, 0.12]):.2f}",
+            "sell_tax": f"{r.choice([0, 0.05, 0.25, 0.6]):.2f}",
+        }
+
+    async def security(request: Request):
+        failure = await _delay_or_fail(config, rng)
+        if failure:
+            return failure
+        addresses = request.query_params.get("contract_addresses", "").lower().split(",")
+        return JSONResponse({"code": 1, "message": "OK", "result": {a: token_security(a) for a in addresses if a}})
+
+    return Starlette(routes=[Route("/api/v1/token_security/{chain_id}", security)])
+
+
+class HostRouter(httpx.AsyncBaseTransport):
+    """Route requests to an in-process ASGI app by target host."""
+
+    def __init__(self, apps: Dict[str, Starlette]):
+        self._transports = {host: httpx.ASGITransport(app=app) for host, app in apps.items()}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = self._transports.get(request.url.host)
+        if transport is None:
+            return httpx.Response(502, content=json.dumps({"error": f"no stand-in for {request.url.host}"}))
+        return await transport.handle_async_request(request)
+
+
+def stand_in_router(dexscreener: StandInConfig, etherscan: StandInConfig, goplus: StandInConfig) -> HostRouter:
+    return HostRouter({
+        urlsplit(DEXSCREENER_BASE).hostname: dexscreener_app(dexscreener),
+        urlsplit(ETHERSCAN_V2_BASE).hostname: etherscan_app(etherscan),
+        urlsplit(GOPLUS_BASE).hostname: goplus_app(goplus),
+    })
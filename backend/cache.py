@@ -1,15 +1,312 @@
 """
-Simple TTL cache using cachetools.
+TTL caches using cachetools.
+
+Three tiers:
+  - Full AnalyzeResponse objects, keyed by chain:address. Entries are fresh for
+    cache_ttl_seconds and may then be served stale (while a refresh runs) until
+    cache_max_stale_seconds, after which they are evicted.
+  - Raw upstream responses per source, each with its own TTL, so a full-response
+    miss only refetches the sources that have actually gone stale.
+  - Negative results per source (no DEX pair, GoPlus has no data, the upstream
+    errored), each kind with its own short TTL, so junk and unlisted addresses
+    don't repeat every upstream call on each request.
+
+The active scoring rule table is kept in the shared backend as well, so every
+worker scores with the same rules (see scoring_rules.py).
+
+Chain auto-detection results (address -> chains it trades on) are cached for
+chain_detection_cache_ttl_seconds, or the no-DEX-pair TTL when none was found.
+
+Responses built without any DEX pair are only fresh for the no-DEX-pair TTL,
+so a token that gets listed shows up without waiting out the full TTL.
+
+Response entries also hold the encoded JSON body and a content-hash ETag, so
+cache hits are served without re-validating or re-serializing the model.
+
+Every tier keeps a per-process L1 in memory in front of the shared backend
+selected by settings.cache_backend (see cache_backends.py).
 """
-from cachetools import TTLCache
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from cachetools import TLRUCache
+from cache_backends import create_backend
 from config import settings
+from metrics import CACHE_LOOKUPS, NEGATIVE_CACHE_HITS, SERIALIZATION_DURATION
+from timing import add_timing
+
+_backend = create_backend(
+    settings.cache_backend, settings.cache_sqlite_path,
+    settings.cache_sqlite_busy_timeout_ms, settings.cache_sqlite_max_rows,
+)
+
+_RESPONSE_NAMESPACE = "response"
+_response_max_age = max(settings.cache_max_stale_seconds, settings.cache_ttl_seconds)
+
+
+def _response_ttu(key, entry: "CacheEntry", now):
+    # Counted from when the report was built, not from when this worker cached
+    # it, so entries loaded from the backend or rescored keep their age.
+    return entry.stored_at + _response_max_age
+
+
+_cache = TLRUCache(maxsize=500, ttu=_response_ttu, timer=time.time)
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "backend_hits": 0, "negative_hits": 0}
+
+NEGATIVE_KINDS = ("no_dex_pair", "no_goplus_data", "upstream_error")
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    body: bytes
+    etag: str
+    stored_at: float
+    fresh_for: float
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.stored_at)
+
+    @property
+    def is_stale(self) -> bool:
+        return self.age >= self.fresh_for
+
+
+def _response_ttl(value) -> float:
+    if getattr(value, "market", True) is None:
+        return min(settings.cache_ttl_seconds, settings.negative_cache_no_dex_pair_seconds)
+    return settings.cache_ttl_seconds
+
+
+@dataclass
+class _SourceEntry:
+    value: Any
+    expires_at: float
+
+
+def _source_ttl(source: str, value) -> float:
+    if source == "dexscreener":
+        return settings.dexscreener_cache_ttl_seconds
+    if source == "goplus":
+        return settings.goplus_cache_ttl_seconds
+    # Etherscan data and implementation scans: verified source never changes,
+    # unverified contracts may get verified later.
+    if value.get("is_verified"):
+        return settings.etherscan_cache_ttl_seconds
+    return settings.etherscan_unverified_cache_ttl_seconds
+
+
+def _source_ttu(key, entry: _SourceEntry, now):
+    return entry.expires_at
+
+
+def _etherscan_size(entry: _SourceEntry) -> int:
+    return len(entry.value.get("source_code") or "") + 1
+
+
+_source_caches = {
+    "dexscreener": TLRUCache(
+        maxsize=settings.source_cache_maxsize, ttu=_source_ttu, timer=time.time,
+    ),
+    "etherscan": TLRUCache(
+        maxsize=settings.etherscan_cache_max_bytes, ttu=_source_ttu, timer=time.time,
+        getsizeof=_etherscan_size,
+    ),
+    "goplus": TLRUCache(
+        maxsize=settings.source_cache_maxsize, ttu=_source_ttu, timer=time.time,
+    ),
+    # Scan results of proxy implementation contracts, keyed by chain:implementation.
+    "implementation": TLRUCache(
+        maxsize=settings.source_cache_maxsize, ttu=_source_ttu, timer=time.time,
+    ),
+}
+
+_negative_cache = TLRUCache(maxsize=settings.source_cache_maxsize, ttu=_source_ttu, timer=time.time)
+_chain_cache = TLRUCache(maxsize=settings.source_cache_maxsize, ttu=_source_ttu, timer=time.time)
+
+
+def _load_response_entry(key: str) -> Optional[CacheEntry]:
+    entry = _cache.get(key)
+    if entry is not None and not entry.is_stale:
+        return entry
+
+    # A stale L1 entry may have been refreshed by another worker already.
+    shared = _backend.get(_RESPONSE_NAMESPACE, key)
+    if shared is None:
+        return entry
 
-_cache = TTLCache(maxsize=500, ttl=settings.cache_ttl_seconds)
+    (value, body, etag), stored_at, _ = shared
+    if entry is not None and stored_at <= entry.stored_at:
+        return entry
+    entry = CacheEntry(
+        value=value, body=body, etag=etag, stored_at=stored_at, fresh_for=_response_ttl(value),
+    )
+    _cache[key] = entry
+    _stats["backend_hits"] += 1
+    return entry
+
+
+def get_cached_entry(key: str) -> Optional[CacheEntry]:
+    entry = _load_response_entry(key)
+    if entry is None:
+        _stats["misses"] += 1
+        CACHE_LOOKUPS.inc(result="miss")
+    elif entry.is_stale:
+        _stats["stale_hits"] += 1
+        CACHE_LOOKUPS.inc(result="stale")
+    else:
+        _stats["hits"] += 1
+        CACHE_LOOKUPS.inc(result="hit")
+    return entry
+
+
+def peek_cached_entry(key: str) -> Optional[CacheEntry]:
+    """Like get_cached_entry, but not counted as a lookup (for comparing against what's cached)."""
+    return _load_response_entry(key)
 
 
 def get_cached(key: str):
-    return _cache.get(key)
+    """Return the cached value only while it is still fresh."""
+    entry = get_cached_entry(key)
+    if entry is None or entry.is_stale:
+        return None
+    return entry.value
+
+
+def make_entry(value, stored_at: Optional[float] = None) -> CacheEntry:
+    """Serialize a response model once, alongside its ETag."""
+    started = time.perf_counter()
+    body = value.model_dump_json().encode()
+    elapsed = time.perf_counter() - started
+    SERIALIZATION_DURATION.observe(elapsed)
+    add_timing("serialize", elapsed)
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return CacheEntry(
+        value=value, body=body, etag=etag,
+        stored_at=time.time() if stored_at is None else stored_at,
+        fresh_for=_response_ttl(value),
+    )
+
+
+def set_cached(key: str, value, stored_at: Optional[float] = None) -> CacheEntry:
+    """
+    Cache a response. Pass the original stored_at when replacing an entry
+    derived from the same upstream data (e.g. a rescore) so its age carries over.
+    """
+    entry = make_entry(value, stored_at)
+    _cache[key] = entry
+    _backend.set(
+        _RESPONSE_NAMESPACE, key, (entry.value, entry.body, entry.etag),
+        entry.stored_at, entry.stored_at + _response_max_age,
+    )
+    return entry
+
+
+def get_source_cached(source: str, key: str):
+    entry = _source_caches[source].get(key)
+    if entry is not None:
+        return entry.value
+
+    shared = _backend.get(source, key)
+    if shared is None:
+        return None
+
+    value, _, expires_at = shared
+    _store_source_l1(source, key, _SourceEntry(value=value, expires_at=expires_at))
+    return value
+
+
+def set_source_cached(source: str, key: str, value):
+    stored_at = time.time()
+    expires_at = stored_at + _source_ttl(source, value)
+    _store_source_l1(source, key, _SourceEntry(value=value, expires_at=expires_at))
+    _backend.set(source, key, value, stored_at, expires_at)
+
+
+def get_negative(source: str, key: str) -> Optional[str]:
+    """The negative-result kind cached for source and key, if any."""
+    namespace_key = f"{source}:{key}"
+    entry = _negative_cache.get(namespace_key)
+    if entry is None:
+        shared = _backend.get("negative", namespace_key)
+        if shared is None:
+            return None
+        kind, _, expires_at = shared
+        entry = _SourceEntry(value=kind, expires_at=expires_at)
+        _negative_cache[namespace_key] = entry
+    _stats["negative_hits"] += 1
+    NEGATIVE_CACHE_HITS.inc(source=source, kind=entry.value)
+    return entry.value
+
+
+def set_negative(source: str, key: str, kind: str) -> None:
+    """Remember that source had nothing usable for key, for that kind's TTL."""
+    if kind not in NEGATIVE_KINDS:
+        raise ValueError(f"Unknown negative cache kind: {kind}")
+    stored_at = time.time()
+    expires_at = stored_at + getattr(settings, f"negative_cache_{kind}_seconds")
+    namespace_key = f"{source}:{key}"
+    _negative_cache[namespace_key] = _SourceEntry(value=kind, expires_at=expires_at)
+    _backend.set("negative", namespace_key, kind, stored_at, expires_at)
+
+
+def get_resolved_chains(address: str) -> Optional[List[str]]:
+    entry = _chain_cache.get(address)
+    if entry is not None:
+        return entry.value
+
+    shared = _backend.get("chains", address)
+    if shared is None:
+        return None
+    chains, _, expires_at = shared
+    _chain_cache[address] = _SourceEntry(value=chains, expires_at=expires_at)
+    return chains
+
+
+def set_resolved_chains(address: str, chains: List[str]) -> None:
+    stored_at = time.time()
+    ttl = settings.chain_detection_cache_ttl_seconds if chains else settings.negative_cache_no_dex_pair_seconds
+    _chain_cache[address] = _SourceEntry(value=chains, expires_at=stored_at + ttl)
+    _backend.set("chains", address, chains, stored_at, stored_at + ttl)
+
+
+_RULES_NAMESPACE = "rules"
+# The shared rule table is replaced, never expired.
+_RULES_KEEP_SECONDS = 10 * 365 * 86400
+
+
+def get_shared_rule_table() -> Optional[dict]:
+    shared = _backend.get(_RULES_NAMESPACE, "active")
+    return None if shared is None else shared[0]
+
+
+def set_shared_rule_table(table: dict) -> None:
+    stored_at = time.time()
+    _backend.set(_RULES_NAMESPACE, "active", table, stored_at, stored_at + _RULES_KEEP_SECONDS)
+
+
+def _store_source_l1(source: str, key: str, entry: _SourceEntry) -> None:
+    try:
+        _source_caches[source][key] = entry
+    except ValueError:
+        # Single value larger than the whole cache (e.g. a huge verified source).
+        pass
+
+
+def cache_stats() -> dict:
+    return {
+        **_stats, "size": len(_cache), "negative_size": len(_negative_cache),
+        "resolved_chains": len(_chain_cache),
+        "backend": settings.cache_backend,
+        "backend_busy": getattr(_backend, "busy", 0),
+        "backend_evicted": getattr(_backend, "evicted", 0),
+    }
 
 
-def set_cached(key: str, value):
-    _cache[key] = value
+def cache_hit_ratio() -> float:
+    """Share of response lookups answered from cache, stale included."""
+    lookups = _stats["hits"] + _stats["stale_hits"] + _stats["misses"]
+    return (_stats["hits"] + _stats["stale_hits"]) / lookups if lookups else 0.0
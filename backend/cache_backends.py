@@ -0,0 +1,133 @@
+"""
+Shared (L2) cache backends that sit behind the in-process caches in cache.py.
+
+  - "memory": no shared tier; each worker only has its own L1.
+  - "sqlite": one SQLite file in WAL mode shared by every worker on the node,
+    so a value fetched by one worker is a hit for all of them and survives
+    restarts.
+
+Values are pickled. The store is a local file written only by our own workers.
+
+SQLite calls run on the event loop, so they must never wait long: the busy
+timeout is a few milliseconds, and a read or write that finds the database
+locked for longer is counted and treated as a miss or a skipped write. The
+file is capped at max_rows; the rows closest to expiry are evicted first.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+from logs import get_logger
+
+logger = get_logger(__name__)
+
+# Purge expired rows, and evict down to max_rows, once every this many writes.
+_PURGE_EVERY = 500
+
+
+class MemoryBackend:
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float, float]]:
+        return None
+
+    def set(self, namespace: str, key: str, value: Any, stored_at: float, expires_at: float) -> None:
+        pass
+
+
+def _is_busy(error: Exception) -> bool:
+    return isinstance(error, sqlite3.OperationalError) and (
+        "locked" in str(error) or "busy" in str(error)
+    )
+
+
+class SQLiteBackend:
+    def __init__(self, path: str, busy_timeout_ms: float = 20, max_rows: int = 200_000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.max_rows = max_rows
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.busy = 0
+        self.evicted = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so open one lazily per worker process.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None, check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value BLOB NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[Any, float, float]]:
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value, stored_at, expires_at FROM cache"
+                    " WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (namespace, key, time.time()),
+                ).fetchone()
+            if row is None:
+                return None
+            return pickle.loads(row[0]), row[1], row[2]
+        except Exception as e:
+            if _is_busy(e):
+                self.busy += 1
+                return None
+            # A corrupt row or a model change across deploys is just a miss.
+            logger.warning("Cache backend read failed", extra={"cache_key": f"{namespace}:{key}", "error": str(e)})
+            return None
+
+    def set(self, namespace: str, key: str, value: Any, stored_at: float, expires_at: float) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, blob, stored_at, expires_at),
+                )
+                self._writes += 1
+                if self._writes % _PURGE_EVERY == 0:
+                    self._purge(conn)
+        except Exception as e:
+            if _is_busy(e):
+                self.busy += 1
+                return
+            logger.warning("Cache backend write failed", extra={"cache_key": f"{namespace}:{key}", "error": str(e)})
+
+    def _purge(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        excess = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_rows
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM cache WHERE rowid IN"
+                " (SELECT rowid FROM cache ORDER BY expires_at LIMIT ?)",
+                (excess,),
+            )
+            self.evicted += excess
+
+
+def create_backend(name: str, sqlite_path: str, sqlite_busy_timeout_ms: float = 20, sqlite_max_rows: int = 200_000):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path, sqlite_busy_timeout_ms, sqlite_max_rows)
+    raise ValueError(f"Unsupported cache backend: {name}. Supported: ['memory', 'sqlite']")
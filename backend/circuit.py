@@ -0,0 +1,81 @@
+"""
+Per-upstream circuit breakers.
+
+After circuit_failure_threshold consecutive failures a source is skipped for
+circuit_cooldown_seconds. Once the cooldown has passed, a single trial call is
+let through (half-open). If it succeeds the circuit closes; if it fails the
+circuit opens for another cooldown.
+"""
+import time
+from typing import Dict
+
+from config import settings
+from logs import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, cooldown: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_started_at = 0.0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+            self.trial_started_at = now
+            return True
+        if self.state == HALF_OPEN and now - self.trial_started_at >= self.cooldown:
+            # The previous trial never reported back (e.g. it was cancelled).
+            self.trial_started_at = now
+            return True
+        # Open and cooling down, or a half-open trial call is already running.
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        self.state = CLOSED
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning("Circuit opened", extra={"source": self.name, "failures": self.failures})
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(source: str) -> CircuitBreaker:
+    breaker = _breakers.get(source)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            name=source,
+            failure_threshold=settings.circuit_failure_threshold,
+            cooldown=settings.circuit_cooldown_seconds,
+        )
+        _breakers[source] = breaker
+    return breaker
+
+
+def breaker_stats() -> dict:
+    return {source: breaker.stats() for source, breaker in _breakers.items()}
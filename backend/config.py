@@ -13,6 +13,75 @@ class Settings(BaseSettings):
     backend_port: int = 8000
     frontend_url: str = "http://localhost:3000"
     cache_ttl_seconds: int = 600
+    cache_max_stale_seconds: int = 3600
+    cache_backend: str = "memory"
+    cache_sqlite_path: str = "rugcheck_cache.sqlite3"
+    cache_sqlite_busy_timeout_ms: float = 20
+    cache_sqlite_max_rows: int = 200_000
+    source_cache_maxsize: int = 5000
+    dexscreener_cache_ttl_seconds: int = 30
+    goplus_cache_ttl_seconds: int = 300
+    etherscan_cache_ttl_seconds: int = 3 * 24 * 3600
+    etherscan_unverified_cache_ttl_seconds: int = 3600
+    etherscan_cache_max_bytes: int = 64 * 1024 * 1024
+    negative_cache_no_dex_pair_seconds: int = 120
+    negative_cache_no_goplus_data_seconds: int = 300
+    negative_cache_upstream_error_seconds: int = 15
+    chain_detection_cache_ttl_seconds: int = 6 * 3600
+    history_enabled: bool = True
+    history_dir: str = "history"
+    history_min_interval_seconds: float = 60.0
+    events_queue_size: int = 100
+    events_keepalive_seconds: float = 15.0
+    batch_max_tokens: int = 500
+    dexscreener_rate_per_second: float = 5.0
+    dexscreener_rate_burst: int = 10
+    etherscan_rate_per_second: float = 4.0
+    etherscan_rate_burst: int = 4
+    goplus_rate_per_second: float = 2.0
+    goplus_rate_burst: int = 5
+    rate_limit_max_wait_seconds: float = 10.0
+    request_budget_seconds: float = 10.0
+    request_budget_max_seconds: float = 30.0
+    dexscreener_timeout_seconds: float = 5.0
+    etherscan_timeout_seconds: float = 8.0
+    goplus_timeout_seconds: float = 8.0
+    circuit_failure_threshold: int = 5
+    circuit_cooldown_seconds: float = 30.0
+    upstream_max_retries: int = 2
+    upstream_retry_backoff_seconds: float = 0.25
+    upstream_retry_max_backoff_seconds: float = 2.0
+    upstream_retry_after_max_seconds: float = 5.0
+    upstream_hedge_percentile: float = 95.0
+    upstream_hedge_min_delay_seconds: float = 0.05
+    scoring_rules_path: str = "scoring_rules.json"
+    scoring_rules_sync_seconds: float = 5.0
+    admin_token: Optional[str] = None
+    watchlist_top_k: int = 50
+    watchlist_tokens: str = ""
+    watchlist_interval_seconds: float = 60.0
+    watchlist_refresh_ahead_seconds: float = 120.0
+    watchlist_concurrency: int = 4
+    prewarm_seed_path: str = "seed_tokens.csv"
+    prewarm_concurrency: int = 4
+    prewarm_ready_fraction: float = 0.9
+    dexscreener_max_connections: int = 20
+    dexscreener_max_keepalive_connections: int = 10
+    dexscreener_http2: bool = True
+    etherscan_max_connections: int = 10
+    etherscan_max_keepalive_connections: int = 5
+    etherscan_http2: bool = True
+    goplus_max_connections: int = 10
+    goplus_max_keepalive_connections: int = 5
+    goplus_http2: bool = False
+    upstream_keepalive_expiry_seconds: float = 30.0
+    upstream_mode: str = "off"
+    upstream_record_dir: str = "recordings"
+    upstream_replay_latency_scale: float = 1.0
+    log_level: str = "INFO"
+    log_format: str = "json"
+    profiling_enabled: bool = False
+    profiling_interval_ms: float = 5.0
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,77 @@
+"""
+Score change events.
+
+publish_if_changed() compares a fresh result with the one it replaces and
+publishes a "score_changed" event only when the risk score or label moved, so
+refreshes that reproduce the same score stay silent. Events fan out to every
+subscriber (the /api/events SSE stream) through a bounded queue each; a slow
+consumer loses its oldest events instead of holding up the analysis path.
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Set
+
+from config import settings
+from metrics import SCORE_CHANGE_EVENTS
+
+
+class ChangeFeed:
+    def __init__(self):
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, event: dict) -> None:
+        for queue in list(self._subscribers):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+        self.published += 1
+        SCORE_CHANGE_EVENTS.inc()
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.events_queue_size))
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+feed = ChangeFeed()
+
+
+def score_change(cache_key: str, previous, current) -> Optional[dict]:
+    """The change event between two responses, or None when score and label match (or there's no previous)."""
+    if previous is None:
+        return None
+    before, after = previous.score, current.score
+    if before.risk_score == after.risk_score and before.label == after.label:
+        return None
+    chain, address = cache_key.split(":", 1)
+    return {
+        "chain": chain,
+        "token_address": address,
+        "previous": {"risk_score": before.risk_score, "label": before.label},
+        "current": {"risk_score": after.risk_score, "label": after.label},
+        "rules_version": after.rules_version,
+        "ts": round(time.time(), 3),
+    }
+
+
+def publish_if_changed(cache_key: str, previous, current) -> bool:
+    event = score_change(cache_key, previous, current)
+    if event is None:
+        return False
+    feed.publish(event)
+    return True
+
+
+def events_stats() -> dict:
+    return {"subscribers": len(feed), "published": feed.published, "dropped": feed.dropped}
@@ -0,0 +1,348 @@
+"""
+Append-only history of score snapshots.
+
+Every full analysis appends one fixed-width record (SNAPSHOT_DTYPE, 38 bytes)
+to settings.history_dir/snapshots.bin: time, token id, score and label,
+liquidity, top-5 holder share, taxes, and the admin and trade-risk flags
+packed into one bitmask (FLAG_BITS). Token ids are line numbers in keys.txt.
+Snapshots of the same token closer together than
+settings.history_min_interval_seconds are dropped, whichever process wrote
+the earlier one.
+
+The record file is memory-mapped for reads. An in-memory index maps each
+token to its row numbers. The index is built once from the token-id column at
+startup and extended incrementally as rows are appended. A range query
+therefore only touches that token's rows: a binary search on their
+timestamps, then optional downsampling into evenly spaced time buckets
+(numpy reduceat, per-bucket max score, mean liquidity, OR of flags).
+
+Several worker processes can share one history_dir. Each record is appended
+with a single O_APPEND write, and new token ids are assigned under an
+exclusive lock on keys.txt after reading the ids other processes added, so
+every process agrees on them. (Windows has no fcntl; run a single worker
+per history_dir there.)
+"""
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+from logs import get_logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = get_logger(__name__)
+
+SNAPSHOT_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("key", "<u4"),
+    ("score", "u1"),
+    ("label", "u1"),
+    ("flags", "<u4"),
+    ("liquidity_usd", "<f8"),
+    ("top5_pct", "<f4"),
+    ("buy_tax_pct", "<f4"),
+    ("sell_tax_pct", "<f4"),
+])
+
+LABELS = ("LOW", "MEDIUM", "HIGH")
+_UNKNOWN_LABEL = 255
+
+# Bit positions are part of the file format: only ever append to this tuple.
+FLAG_BITS = (
+    "mint_function_detected",
+    "proxy_contract_detected",
+    "transfer_pausable",
+    "slippage_modifiable",
+    "blacklist_function_detected",
+    "personal_tax_modifiable",
+    "trading_cooldown_enabled",
+    "hidden_owner_detected",
+    "can_reclaim_ownership",
+    "self_destruct_function",
+    "external_call_risk",
+    "blacklist_terms_detected",
+    "fee_modification_detected",
+    "tax_modification_detected",
+    "pause_function_detected",
+    "trading_toggle_detected",
+    "owner_restricted_functions",
+    "owner_active",
+    "honeypot",
+    "cannot_sell",
+    "cannot_buy",
+)
+_FLAG_MASKS = {name: 1 << bit for bit, name in enumerate(FLAG_BITS)}
+OTHER_FLAG = 1 << 31
+
+
+def flag_mask(result) -> int:
+    """Pack a response's admin and trade-risk flags into one bitmask."""
+    mask = 0
+    for flag in result.admin.flags:
+        mask |= _FLAG_MASKS.get(flag, OTHER_FLAG)
+    if result.admin.has_owner:
+        mask |= _FLAG_MASKS["owner_active"]
+    trade = result.trade_risk
+    if trade is not None:
+        for name in ("honeypot", "cannot_sell", "cannot_buy"):
+            if getattr(trade, name):
+                mask |= _FLAG_MASKS[name]
+    return mask
+
+
+def flag_names(mask: int) -> List[str]:
+    names = [name for name, bit in _FLAG_MASKS.items() if mask & bit]
+    if mask & OTHER_FLAG:
+        names.append("other")
+    return names
+
+
+def _or_nan(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def snapshot_row(ts: float, key_id: int, result) -> np.ndarray:
+    row = np.zeros(1, dtype=SNAPSHOT_DTYPE)
+    label = result.score.label
+    row[0] = (
+        ts,
+        key_id,
+        result.score.risk_score,
+        LABELS.index(label) if label in LABELS else _UNKNOWN_LABEL,
+        flag_mask(result),
+        _or_nan(result.market.liquidity_usd if result.market else None),
+        _or_nan(result.holders.top5_pct if result.holders else None),
+        _or_nan(result.trade_risk.buy_tax_pct if result.trade_risk else None),
+        _or_nan(result.trade_risk.sell_tax_pct if result.trade_risk else None),
+    )
+    return row
+
+
+@contextmanager
+def _exclusive(f):
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class HistoryStore:
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._rows_path = self.root / "snapshots.bin"
+        self._keys_path = self.root / "keys.txt"
+        self._lock = threading.Lock()
+
+        # A partial record from an interrupted write is cut off, not misread.
+        if self._rows_path.exists():
+            size = self._rows_path.stat().st_size
+            if size % SNAPSHOT_DTYPE.itemsize:
+                with open(self._rows_path, "r+b") as f:
+                    f.truncate(size - size % SNAPSHOT_DTYPE.itemsize)
+
+        self._rows_fd = os.open(self._rows_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._keys_file = open(self._keys_path, "a+b")
+        self._keys: List[str] = []
+        self._key_ids: Dict[str, int] = {}
+        self._keys_read = 0
+        self._load_new_keys()
+
+        self._rows: np.ndarray = np.zeros(0, dtype=SNAPSHOT_DTYPE)
+        self._index: Dict[int, List[np.ndarray]] = {}
+        self._indexed = 0
+        self._last_ts: Dict[int, float] = {}
+        self._sync()
+
+    def __len__(self) -> int:
+        return self._rows_path.stat().st_size // SNAPSHOT_DTYPE.itemsize
+
+    def append(self, key: str, result, ts: float) -> bool:
+        """Append a snapshot unless the token's previous one is too recent."""
+        with self._lock:
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = self._add_key(key)
+            # Index rows other processes appended, so the interval holds across workers.
+            self._sync()
+            if ts - self._last_ts.get(key_id, float("-inf")) < settings.history_min_interval_seconds:
+                return False
+
+            os.write(self._rows_fd, snapshot_row(ts, key_id, result).tobytes())
+            self._last_ts[key_id] = ts
+            return True
+
+    def query(self, key: str, start: Optional[float] = None, end: Optional[float] = None) -> np.ndarray:
+        """The token's snapshots with start <= ts <= end, oldest first."""
+        with self._lock:
+            if key not in self._key_ids:
+                self._load_new_keys()
+            self._sync()
+            key_id = self._key_ids.get(key)
+            chunks = self._index.get(key_id) if key_id is not None else None
+            if not chunks:
+                return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+            if len(chunks) > 1:
+                chunks[:] = [np.concatenate(chunks)]
+            records = self._rows[chunks[0]]
+
+        ts = records["ts"]
+        if len(ts) > 1 and np.any(ts[1:] < ts[:-1]):
+            records = records[np.argsort(ts, kind="stable")]
+            ts = records["ts"]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="right"))
+        return records[lo:hi]
+
+    def close(self) -> None:
+        with self._lock:
+            os.close(self._rows_fd)
+            self._keys_file.close()
+
+    def _add_key(self, key: str) -> int:
+        """The key's id, appending it to keys.txt unless another process already has."""
+        with _exclusive(self._keys_file):
+            self._load_new_keys()
+            if key not in self._key_ids:
+                self._keys_file.write(key.encode("utf-8") + b"\n")
+                self._keys_file.flush()
+                self._load_new_keys()
+        return self._key_ids[key]
+
+    def _load_new_keys(self) -> None:
+        """Read the keys appended to keys.txt (by any process) since the last call."""
+        self._keys_file.seek(self._keys_read)
+        data = self._keys_file.read()
+        complete = data.rfind(b"\n") + 1
+        for key in data[:complete].decode("utf-8").splitlines():
+            self._key_ids.setdefault(key, len(self._keys))
+            self._keys.append(key)
+        self._keys_read += complete
+
+    def _sync(self) -> None:
+        """Map rows appended since the last call and add them to the index."""
+        total = len(self)
+        if total == self._indexed:
+            return
+        self._rows = np.memmap(self._rows_path, dtype=SNAPSHOT_DTYPE, mode="r", shape=(total,))
+
+        new = self._rows[self._indexed:total]
+        key_ids = np.asarray(new["key"])
+        order = np.argsort(key_ids, kind="stable")
+        bounds = np.flatnonzero(np.diff(key_ids[order])) + 1
+        for rows in np.split(order, bounds):
+            key_id = int(key_ids[rows[0]])
+            self._index.setdefault(key_id, []).append(rows + self._indexed)
+            self._last_ts[key_id] = max(self._last_ts.get(key_id, float("-inf")), float(new["ts"][rows[-1]]))
+        self._indexed = total
+
+
+def downsample(records: np.ndarray, points: int) -> List[dict]:
+    """
+    Reduce time-ordered records to at most `points` evenly spaced time buckets.
+    Each bucket reports its last timestamp, the worst score and label, mean
+    liquidity and top-5 share, the highest taxes and every flag seen.
+    """
+    if len(records) == 0:
+        return []
+    ts = records["ts"]
+    if len(records) <= points:
+        starts = np.arange(len(records))
+    else:
+        span = max(float(ts[-1] - ts[0]), 1e-9)
+        bucket = np.minimum(((ts - ts[0]) / span * points).astype(np.int64), points - 1)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    ends = np.append(starts[1:], len(records)) - 1
+    counts = np.diff(np.append(starts, len(records)))
+
+    def mean(column: str) -> np.ndarray:
+        values = records[column].astype(np.float64)
+        present = ~np.isnan(values)
+        totals = np.add.reduceat(np.where(present, values, 0.0), starts)
+        seen = np.add.reduceat(present.astype(np.int64), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(seen > 0, totals / np.maximum(seen, 1), np.nan)
+
+    def worst(column: str) -> np.ndarray:
+        return np.fmax.reduceat(records[column].astype(np.float64), starts)
+
+    labels = records["label"].astype(np.int64)
+    labels = np.where(labels == _UNKNOWN_LABEL, -1, labels)
+    columns = {
+        "ts": ts[ends],
+        "risk_score": np.maximum.reduceat(records["score"], starts),
+        "label": np.maximum.reduceat(labels, starts),
+        "liquidity_usd": mean("liquidity_usd"),
+        "top5_pct": mean("top5_pct"),
+        "buy_tax_pct": worst("buy_tax_pct"),
+        "sell_tax_pct": worst("sell_tax_pct"),
+        "flags": np.bitwise_or.reduceat(records["flags"], starts),
+    }
+
+    def number(value) -> Optional[float]:
+        return None if np.isnan(value) else round(float(value), 4)
+
+    return [
+        {
+            "ts": float(columns["ts"][i]),
+            "risk_score": int(columns["risk_score"][i]),
+            "label": LABELS[columns["label"][i]] if columns["label"][i] >= 0 else None,
+            "liquidity_usd": number(columns["liquidity_usd"][i]),
+            "top5_pct": number(columns["top5_pct"][i]),
+            "buy_tax_pct": number(columns["buy_tax_pct"][i]),
+            "sell_tax_pct": number(columns["sell_tax_pct"][i]),
+            "flags": flag_names(int(columns["flags"][i])),
+            "samples": int(counts[i]),
+        }
+        for i in range(len(starts))
+    ]
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[HistoryStore]:
+    """The process-wide store, opened on first use; None when history is disabled."""
+    global _store
+    if not settings.history_enabled:
+        return None
+    with _store_lock:
+        if _store is None:
+            root = Path(settings.history_dir)
+            if not root.is_absolute():
+                root = Path(__file__).parent / root
+            _store = HistoryStore(str(root))
+        return _store
+
+
+def record(key: str, result, ts: float) -> None:
+    """Append a full (non-partial) analysis result; failures are logged, never raised."""
+    if result.partial:
+        return
+    try:
+        store = get_store()
+        if store is not None:
+            store.append(key, result, ts)
+    except Exception as e:
+        logger.warning("History append failed", extra={"cache_key": key, "error": str(e)})
+
+
+def close() -> None:
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -0,0 +1,64 @@
+"""
+Structured logging.
+
+Log records are emitted as one JSON object per line (or plain text with
+LOG_FORMAT=text) and carry the id of the request that produced them, taken
+from the request_id context variable the HTTP middleware sets. Fields passed
+through `extra=` are included in the JSON object.
+"""
+import json
+import logging
+import sys
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from config import settings
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class _RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging() -> None:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.addFilter(_RequestIdFilter())
+    if settings.log_format == "text":
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s",
+        ))
+        handler.formatter.converter = time.gmtime
+    else:
+        handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger("rugcheck")
+    root.handlers[:] = [handler]
+    root.setLevel(settings.log_level.upper())
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"rugcheck.{name}")
@@ -1,22 +1,73 @@
 """
 FastAPI application entry point.
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import Body, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
-import httpx
+from contextlib import asynccontextmanager, suppress
+from functools import partial
+import asyncio
+import json
+import re
+import time
+import uuid
 
-from config import settings
-from models import AnalyzeRequest, AnalyzeResponse
-from analyzer import analyze_token
-from cache import get_cached, set_cached
+from config import settings, get_chain_config
+from models import (
+    AnalyzeRequest, AnalyzeResponse, AutoAnalyzeRequest, AutoAnalyzeResponse,
+    BatchAnalyzeRequest, BatchAnalyzeResponse, BatchAnalyzeItem,
+)
+from analyzer import (
+    ChainDetectionError, analyze_token, analyze_tokens, analyze_token_stream, detect_chains,
+    implementation_flight, normalize_address, rescore_response,
+)
+from cache import (
+    CacheEntry, get_cached_entry, make_entry, peek_cached_entry, set_cached, cache_stats, cache_hit_ratio,
+)
+from singleflight import SingleFlight
+from circuit import breaker_stats
+from services.clients import UpstreamClients, pool_stats
+from services.upstream import upstream_stats
+from ratelimit import PRIORITY_BACKGROUND, PriorityGroup, priority_group, request_priority, rate_limit_stats
+from scoring_rules import compile_rules, get_rules, reload_rules
+from watchlist import run_refresher, tracker, watchlist_stats
+from prewarm import load_seed_file, prewarm, warmup_state
+from logs import configure_logging, get_logger, request_id
+from timing import server_timing_header, start_timing, timed
+from profiler import ProfilerBusy, SamplingProfiler
+import events
+import history
+import metrics
+
+configure_logging()
+logger = get_logger("main")
+# Concurrent misses for the same chain:address share one analyze_token call.
+analysis_flight = SingleFlight()
+# Strong references to stale-while-revalidate refreshes so they aren't GC'd mid-flight.
+_background_tasks = set()
+# Priority groups of refreshes in flight, escalated when an interactive miss joins one.
+_refresh_groups: Dict[str, PriorityGroup] = {}
+# Client-supplied X-Request-ID values are echoed only if they look like an id.
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app.state.http_client = httpx.AsyncClient(timeout=30.0)
+    app.state.http_client = UpstreamClients()
+    tasks = [
+        asyncio.create_task(prewarm(load_seed_file(), _warm_token)),
+        asyncio.create_task(run_refresher(_refresh_key)),
+    ]
     yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
     await app.state.http_client.aclose()
+    history.close()
 
 
 app = FastAPI(
@@ -36,55 +87,579 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Age", "ETag", "X-Cache", "X-Request-ID", "Server-Timing"],
 )
 
 
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    """
+    Tag the request with an id for logs, record in-flight/latency metrics, and
+    report the phases timed along the way in a Server-Timing header.
+    """
+    incoming = request.headers.get("x-request-id", "")
+    rid = incoming if _REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex[:16]
+    request_id.set(rid)
+    timings = start_timing()
+
+    started = time.monotonic()
+    status = 500
+    metrics.HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = rid
+        response.headers["Server-Timing"] = server_timing_header(timings, time.monotonic() - started)
+        return response
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
+        elapsed = time.monotonic() - started
+        route = request.scope.get("route")
+        route_path = route.path if route else "unmatched"
+        metrics.HTTP_REQUESTS.inc(method=request.method, route=route_path, status=status)
+        metrics.HTTP_DURATION.observe(elapsed, route=route_path)
+        logger.info(
+            "Request served",
+            extra={
+                "method": request.method, "route": route_path,
+                "status": status, "duration_ms": round(elapsed * 1000, 1),
+            },
+        )
+
+
 @app.get("/api/health")
 async def health():
     return {"status": "ok"}
 
 
-@app.post("/api/analyze", response_model=AnalyzeResponse)
-async def analyze(request: AnalyzeRequest):
-    cache_key = f"{request.chain}:{request.token_address.lower()}"
-    cached = get_cached(cache_key)
-    if cached:
-        return cached
+@app.get("/api/ready")
+async def ready():
+    """Readiness for the load balancer: 503 until startup pre-warming reaches its threshold."""
+    body = {"status": "ready" if warmup_state.ready else "warming", "warmup": warmup_state.stats()}
+    return JSONResponse(body, status_code=200 if warmup_state.ready else 503)
+
 
+@app.post("/api/analyze", response_model=AnalyzeResponse)
+async def analyze(request: AnalyzeRequest, profile: bool = False):
     try:
-        result = await analyze_token(
-            chain=request.chain,
-            token_address=request.token_address,
-            http_client=app.state.http_client,
+        if profile:
+            return await _profiled_response(request.chain, request.token_address, request.budget_ms)
+        entry, cache_status = await _get_or_analyze(
+            request.chain, request.token_address, request.budget_ms,
         )
-        set_cached(cache_key, result)
-        return result
+        return _entry_response(entry, cache_status)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/report/{chain}/{token_address}", response_model=AnalyzeResponse)
-async def get_report(chain: str, token_address: str):
-    cache_key = f"{chain}:{token_address.lower()}"
-    cached = get_cached(cache_key)
-    if cached:
-        return cached
-    try:
-        result = await analyze_token(
-            chain=chain,
-            token_address=token_address,
+@app.post("/api/analyze/batch", response_model=BatchAnalyzeResponse)
+async def analyze_batch(request: BatchAnalyzeRequest):
+    if len(request.tokens) > settings.batch_max_tokens:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many tokens in batch (max {settings.batch_max_tokens}).",
+        )
+    # Batch screening yields upstream rate-limit slots to interactive lookups.
+    request_priority.set(PRIORITY_BACKGROUND)
+
+    items = [
+        BatchAnalyzeItem(chain=t.chain, token_address=t.token_address)
+        for t in request.tokens
+    ]
+    # Each distinct miss is analyzed once, however often the batch repeats it.
+    misses: Dict[str, List[int]] = {}
+    for i, t in enumerate(request.tokens):
+        try:
+            cache_key = _cache_key(t.chain, t.token_address)
+        except ValueError as e:
+            items[i].error = str(e)
+            continue
+        cached = _get_fresh(cache_key)
+        if cached:
+            items[i].result = cached.value
+        else:
+            misses.setdefault(cache_key, []).append(i)
+
+    # Misses another request is already analyzing join that flight instead of refetching.
+    joined = [key for key in misses if analysis_flight.in_flight(key)]
+    batched = [key for key in misses if key not in joined]
+    joined_results, batch_results = await asyncio.gather(
+        asyncio.gather(
+            *(analysis_flight.do(key, partial(_analyze_joined, key)) for key in joined),
+            return_exceptions=True,
+        ),
+        analyze_tokens(
+            [tuple(key.split(":", 1)) for key in batched],
             http_client=app.state.http_client,
+        ),
+    )
+
+    outcomes = [r if isinstance(r, Exception) else r.value for r in joined_results]
+    for key, result in zip(batched, batch_results):
+        if not isinstance(result, Exception) and not result.partial:
+            _store_result(key, result)
+        outcomes.append(result)
+    for key, result in zip(joined + batched, outcomes):
+        for i in misses[key]:
+            if isinstance(result, Exception):
+                items[i].error = str(result)
+            else:
+                items[i].result = result
+
+    return BatchAnalyzeResponse(results=items)
+
+
+@app.post("/api/analyze/auto", response_model=AutoAnalyzeResponse)
+async def analyze_auto(request: AutoAnalyzeRequest):
+    """
+    Chain-agnostic analysis: one cross-chain DexScreener lookup finds the
+    chains the token trades on, and only those are analyzed.
+    """
+    try:
+        address = normalize_address(request.token_address)
+        chains = await detect_chains(address, app.state.http_client)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ChainDetectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not chains:
+        raise HTTPException(
+            status_code=404,
+            detail="No DEX pairs found on any supported chain; pass a chain to /api/analyze instead.",
         )
-        set_cached(cache_key, result)
-        return result
+
+    outcomes = await asyncio.gather(
+        *(_get_or_analyze(chain, address, request.budget_ms) for chain in chains),
+        return_exceptions=True,
+    )
+    items = []
+    for chain, outcome in zip(chains, outcomes):
+        item = BatchAnalyzeItem(chain=chain, token_address=address)
+        if isinstance(outcome, Exception):
+            item.error = str(outcome)
+        else:
+            item.result = outcome[0].value
+        items.append(item)
+    return AutoAnalyzeResponse(token_address=address, chains=chains, results=items)
+
+
+@app.get("/api/report/{chain}/{token_address}", response_model=AnalyzeResponse)
+async def get_report(
+    chain: str,
+    token_address: str,
+    budget_ms: Optional[int] = None,
+    if_none_match: Optional[str] = Header(default=None),
+    profile: bool = False,
+):
+    try:
+        if profile:
+            return await _profiled_response(chain, token_address, budget_ms)
+        entry, cache_status = await _get_or_analyze(chain, token_address, budget_ms)
+        return _entry_response(entry, cache_status, if_none_match)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/analyze/stream/{chain}/{token_address}")
+async def analyze_stream(chain: str, token_address: str, budget_ms: Optional[int] = None):
+    """
+    Server-Sent Events variant of /api/report. Sections are sent as their
+    sources resolve; the final "result" event carries the full AnalyzeResponse.
+    """
+    try:
+        cache_key = _cache_key(chain, token_address)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    tracker.record(cache_key)
+    cached = _get_fresh(cache_key)
+    if cached:
+        stream_events = _cached_events(cached.value)
+    else:
+        stream_events = _analysis_events(cache_key, chain, token_address, _request_deadline(budget_ms))
+
+    return StreamingResponse(
+        _sse_stream(stream_events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/events")
+async def change_events(chain: Optional[str] = None, token_address: Optional[str] = None):
+    """
+    Server-Sent Events feed of "score_changed" events, published only when a
+    refresh or rules change moves a token's score or label. Optionally
+    filtered to one chain and/or address.
+    """
+    address = token_address.lower() if token_address else None
+    return StreamingResponse(
+        _change_event_stream(chain, address),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/history/{chain}/{token_address}")
+async def get_history(
+    chain: str,
+    token_address: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    points: int = Query(default=200, ge=1, le=5000),
+):
+    """
+    Score, liquidity, holder concentration, taxes and flags over time, from
+    the local snapshot history. start/end are unix seconds; more snapshots
+    than `points` in the range are downsampled into evenly spaced buckets.
+    """
+    try:
+        cache_key = _cache_key(chain, token_address)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    store = history.get_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="History is disabled.")
+
+    records = store.query(cache_key, start, end)
+    return {
+        "chain": chain,
+        "token_address": cache_key.split(":", 1)[1],
+        "start": start,
+        "end": end,
+        "snapshots": len(records),
+        "points": history.downsample(records, points),
+    }
+
+
+@app.post("/api/rescore/{chain}/{token_address}", response_model=AnalyzeResponse)
+async def rescore(
+    chain: str,
+    token_address: str,
+    rules_table: Optional[Dict[str, Any]] = Body(default=None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """
+    Rescore a cached report from its stored signals; never calls an upstream.
+    With a rule table in the body this is a dry run under those rules and the
+    cache is left alone; it needs the X-Admin-Token, like a rules reload.
+    Without one the active rules are applied and cached.
+    """
+    if rules_table is not None:
+        _require_admin(x_admin_token)
+    try:
+        cache_key = _cache_key(chain, token_address)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    entry = get_cached_entry(cache_key)
+    if not entry:
+        raise HTTPException(status_code=404, detail="No cached report to rescore.")
+
+    if rules_table is None:
+        return _entry_response(_with_current_rules(cache_key, entry), "HIT")
+
+    try:
+        rules = compile_rules(rules_table)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _entry_response(make_entry(rescore_response(entry.value, rules), entry.stored_at), "HIT")
+
+
+def _require_admin(x_admin_token: Optional[str]) -> None:
+    if not settings.admin_token or x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@app.post("/api/admin/rules/reload")
+async def reload_scoring_rules(x_admin_token: Optional[str] = Header(default=None)):
+    """Reload the scoring rule table. Cached reports pick up the new version when next served."""
+    _require_admin(x_admin_token)
+    previous = get_rules().version
+    try:
+        rules = reload_rules()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Rules not reloaded: {e}")
+    logger.info("Scoring rules reloaded", extra={"previous_version": previous, "version": rules.version})
+    return {"previous_version": previous, "version": rules.version}
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/stats")
+async def stats():
+    store = history.get_store()
+    return {
+        "cache": cache_stats(),
+        "singleflight": analysis_flight.stats(),
+        "implementation_singleflight": implementation_flight.stats(),
+        "rate_limits": rate_limit_stats(),
+        "circuits": breaker_stats(),
+        "upstreams": upstream_stats(),
+        "pools": pool_stats(),
+        "watchlist": watchlist_stats(),
+        "events": events.events_stats(),
+        "history": {"snapshots": len(store)} if store is not None else None,
+    }
+
+
+async def _get_or_analyze(
+    chain: str,
+    token_address: str,
+    budget_ms: Optional[int] = None,
+) -> Tuple[CacheEntry, str]:
+    """Return the response entry for chain:address and its X-Cache status."""
+    cache_key = _cache_key(chain, token_address)
+    with timed("cache"):
+        entry = get_cached_entry(cache_key)
+    if entry:
+        tracker.record(cache_key)
+        entry = _with_current_rules(cache_key, entry)
+        if entry.is_stale:
+            _schedule_refresh(cache_key, chain, token_address)
+            return entry, "STALE"
+        return entry, "HIT"
+
+    deadline = _request_deadline(budget_ms)
+    group = _refresh_groups.get(cache_key)
+    if group is not None:
+        # This caller is about to wait on a background refresh; stop queueing it behind other background work.
+        group.escalate(request_priority.get())
+    entry = await analysis_flight.do(
+        cache_key, lambda: _analyze_and_cache(cache_key, chain, token_address, deadline),
+    )
+    # Counted only once the address proved analyzable, so junk input never gets refreshed.
+    tracker.record(cache_key)
+    return entry, "MISS"
+
+
+async def _analyze_and_cache(
+    cache_key: str,
+    chain: str,
+    token_address: str,
+    deadline: Optional[float] = None,
+) -> CacheEntry:
+    result = await analyze_token(
+        chain=chain,
+        token_address=token_address,
+        http_client=app.state.http_client,
+        deadline=deadline,
+    )
+    # Partial results are returned to the caller but never replace a full one.
+    if result.partial:
+        return make_entry(result)
+    return _store_result(cache_key, result)
+
+
+async def _analyze_joined(cache_key: str) -> CacheEntry:
+    """Fallback for a batch miss whose in-flight analysis finished before the batch could join it."""
+    chain, token_address = cache_key.split(":", 1)
+    return await _analyze_and_cache(cache_key, chain, token_address, _request_deadline(None))
+
+
+def _store_result(cache_key: str, result: AnalyzeResponse) -> CacheEntry:
+    """
+    Cache a full analysis result, append it to the score history, and publish
+    a change event if its score or label differs from the report it replaces.
+    """
+    previous = peek_cached_entry(cache_key)
+    entry = set_cached(cache_key, result)
+    history.record(cache_key, result, entry.stored_at)
+    events.publish_if_changed(cache_key, previous.value if previous else None, result)
+    return entry
+
+
+async def _profiled_response(chain: str, token_address: str, budget_ms: Optional[int]) -> JSONResponse:
+    """
+    Debug mode (settings.profiling_enabled): run a fresh analysis under the
+    sampling profiler and return the report alongside the hot stack summary.
+    The response cache is bypassed so the analysis actually runs.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled.")
+    cache_key = _cache_key(chain, token_address)
+    try:
+        with SamplingProfiler(settings.profiling_interval_ms / 1000) as profiler:
+            entry = await _analyze_and_cache(cache_key, chain, token_address, _request_deadline(budget_ms))
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return JSONResponse(
+        {"report": json.loads(entry.body), "profile": profiler.summary()},
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+def _cache_key(chain: str, token_address: str) -> str:
+    """
+    Validate chain and address (ValueError) before any cache or upstream work,
+    so junk input costs a string check, and return the response cache key.
+    """
+    get_chain_config(chain)
+    return f"{chain}:{normalize_address(token_address)}"
+
+
+def _get_fresh(cache_key: str) -> Optional[CacheEntry]:
+    entry = get_cached_entry(cache_key)
+    if entry is None or entry.is_stale:
+        return None
+    return _with_current_rules(cache_key, entry)
+
+
+def _with_current_rules(cache_key: str, entry: CacheEntry) -> CacheEntry:
+    """Rescore an entry cached under an older rules version, keeping its age."""
+    if entry.value.score.rules_version == get_rules().version:
+        return entry
+    rescored = set_cached(cache_key, rescore_response(entry.value), entry.stored_at)
+    events.publish_if_changed(cache_key, entry.value, rescored.value)
+    return rescored
+
+
+def _entry_response(
+    entry: CacheEntry,
+    cache_status: str,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """Serve the pre-encoded body; answer 304 when the client's ETag still matches."""
+    headers = {
+        "ETag": entry.etag,
+        "Age": str(int(entry.age)),
+        "X-Cache": cache_status,
+        "Cache-Control": "public, no-cache",
+    }
+    if if_none_match and _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _request_deadline(budget_ms: Optional[int]) -> float:
+    budget = settings.request_budget_seconds if budget_ms is None else budget_ms / 1000
+    return time.monotonic() + min(budget, settings.request_budget_max_seconds)
+
+
+async def _cached_events(result: AnalyzeResponse) -> AsyncIterator[tuple]:
+    yield "market", result.market
+    yield "holders", result.holders
+    yield "trade_risk", result.trade_risk
+    yield "admin", result.admin
+    yield "score", result.score
+    yield "result", result
+
+
+async def _analysis_events(
+    cache_key: str,
+    chain: str,
+    token_address: str,
+    deadline: float,
+) -> AsyncIterator[tuple]:
+    async for event, payload in analyze_token_stream(
+        chain=chain,
+        token_address=token_address,
+        http_client=app.state.http_client,
+        deadline=deadline,
+    ):
+        if event == "result" and not payload.partial:
+            _store_result(cache_key, payload)
+        yield event, payload
+
+
+async def _sse_stream(stream_events: AsyncIterator[tuple]) -> AsyncIterator[str]:
+    try:
+        async for event, payload in stream_events:
+            yield _sse_event(event, payload)
+    except Exception as e:
+        logger.exception("Stream analysis failed")
+        yield _sse_event("error", {"detail": str(e)})
+
+
+async def _change_event_stream(chain: Optional[str], address: Optional[str]) -> AsyncIterator[str]:
+    with events.feed.subscribe() as queue:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.events_keepalive_seconds)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle stream.
+                yield ": keepalive\n\n"
+                continue
+            if (chain is None or event["chain"] == chain) and (address is None or event["token_address"] == address):
+                yield _sse_event("score_changed", event)
+
+
+def _sse_event(event: str, payload: Any) -> str:
+    if isinstance(payload, BaseModel):
+        data = payload.model_dump_json()
+    else:
+        data = json.dumps(payload)
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _warm_token(chain: str, token_address: str) -> None:
+    """Pre-warm one seed; skipped when the shared cache already has a fresh report."""
+    cache_key = f"{chain}:{token_address}"
+    if _get_fresh(cache_key) is None:
+        await _refresh_key(cache_key)
+
+
+async def _refresh_key(cache_key: str) -> None:
+    """Watchlist refresh: re-analyze at background priority, sharing any in-flight analysis."""
+    chain, token_address = cache_key.split(":", 1)
+    await analysis_flight.do(cache_key, partial(_refresh_analysis, cache_key, chain, token_address))
+
+
+async def _refresh_analysis(cache_key: str, chain: str, token_address: str) -> CacheEntry:
+    """
+    Flight body of a refresh. Its rate-limit waits share one background
+    PriorityGroup, which _get_or_analyze escalates when an interactive miss
+    joins the flight.
+    """
+    group = PriorityGroup(PRIORITY_BACKGROUND)
+    priority_group.set(group)
+    _refresh_groups[cache_key] = group
+    try:
+        return await _analyze_and_cache(cache_key, chain, token_address, _request_deadline(None))
+    finally:
+        _refresh_groups.pop(cache_key, None)
+
+
+def _schedule_refresh(cache_key: str, chain: str, token_address: str) -> None:
+    if analysis_flight.in_flight(cache_key):
+        return
+
+    async def refresh():
+        try:
+            await analysis_flight.do(cache_key, partial(_refresh_analysis, cache_key, chain, token_address))
+        except Exception as e:
+            logger.warning("Background refresh failed", extra={"cache_key": cache_key, "error": str(e)})
+
+    task = asyncio.create_task(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _collect_metrics() -> None:
+    metrics.CACHE_HIT_RATIO.set(cache_hit_ratio())
+    metrics.ANALYSES_IN_FLIGHT.set(analysis_flight.stats()["in_flight"])
+
+
+metrics.register_collector(_collect_metrics)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=settings.backend_port, reload=True)
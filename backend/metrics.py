@@ -0,0 +1,215 @@
+"""
+Minimal Prometheus metrics.
+
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+exposition format by /api/metrics. Gauges derived from state other modules
+already keep (cache hit ratio, analyses in flight) are set at scrape time by
+registered collectors.
+"""
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def _label_str(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{self._label_str(k)} {_fmt(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (non-cumulative bucket counts, sum, count).
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _fmt(bound)
+                lines.append(f"{self.name}_bucket{self._label_str(key, le)} {cumulative}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{self._label_str(key, inf)} {count}")
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {count}")
+        return lines
+
+
+_registry: List[_Metric] = []
+_collectors: List[Callable[[], None]] = []
+
+
+def counter(name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+    return _register(Counter(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, labels: Iterable[str] = ()) -> Gauge:
+    return _register(Gauge(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, help_text, labels, buckets))
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def register_collector(collect: Callable[[], None]) -> None:
+    """collect() runs before each render, typically to set gauges from existing stats."""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# Shared metrics. Defined here so every module records into the same series.
+UPSTREAM_LATENCY = histogram(
+    "rugcheck_upstream_request_duration_seconds", "Upstream HTTP request latency.", ["source"],
+)
+UPSTREAM_REQUESTS = counter(
+    "rugcheck_upstream_requests_total",
+    "Upstream HTTP requests by outcome (status code, or transport_error).",
+    ["source", "status"],
+)
+UPSTREAM_POOL_WAIT = histogram(
+    "rugcheck_upstream_pool_wait_seconds", "Time spent waiting for a pooled connection.", ["source"],
+)
+SOURCE_SKIPS = counter(
+    "rugcheck_source_skipped_total",
+    "Sources left out of a result, by reason "
+    "(timeout, error, upstream_error, rate_limited, circuit_open, budget_exhausted).",
+    ["source", "reason"],
+)
+SCORING_DURATION = histogram(
+    "rugcheck_scoring_duration_seconds", "Time to compute a risk score.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+SCORE_CATEGORIES = counter(
+    "rugcheck_score_categories_total",
+    "Score categories computed per scoring, by outcome (recomputed, or reused from the last breakdown).",
+    ["outcome"],
+)
+SCORE_CHANGE_EVENTS = counter(
+    "rugcheck_score_change_events_total", "Score change events published (score or label moved).",
+)
+SERIALIZATION_DURATION = histogram(
+    "rugcheck_serialization_duration_seconds", "Time to serialize a response body.",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+CACHE_LOOKUPS = counter(
+    "rugcheck_cache_lookups_total", "Response cache lookups by result (hit, stale, miss).", ["result"],
+)
+NEGATIVE_CACHE_HITS = counter(
+    "rugcheck_negative_cache_hits_total",
+    "Upstream calls avoided by a cached negative result, by kind.",
+    ["source", "kind"],
+)
+CACHE_HIT_RATIO = gauge(
+    "rugcheck_cache_hit_ratio", "Share of response cache lookups served from cache (fresh or stale).",
+)
+ANALYSES_IN_FLIGHT = gauge("rugcheck_analyses_in_flight", "Distinct token analyses currently running.")
+HTTP_IN_FLIGHT = gauge("rugcheck_http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_REQUESTS = counter(
+    "rugcheck_http_requests_total", "HTTP requests served.", ["method", "route", "status"],
+)
+HTTP_DURATION = histogram(
+    "rugcheck_http_request_duration_seconds", "HTTP request latency.", ["route"],
+)
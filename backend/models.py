@@ -2,7 +2,7 @@
 Pydantic models for request/response validation.
 """
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 
 class AnalyzeRequest(BaseModel):
@@ -16,6 +16,11 @@ class AnalyzeRequest(BaseModel):
         min_length=42,
         max_length=42,
     )
+    budget_ms: Optional[int] = Field(
+        default=None,
+        description="Latency budget; sources still pending when it runs out are skipped",
+        ge=100,
+    )
 
 
 class TokenInfo(BaseModel):
@@ -71,6 +76,7 @@ class ScoreInfo(BaseModel):
     risk_score: int = Field(ge=0, le=100)
     label: str
     reasons: List[str] = Field(default_factory=list)
+    rules_version: Optional[str] = None
 
 
 class LinksInfo(BaseModel):
@@ -86,3 +92,50 @@ class AnalyzeResponse(BaseModel):
     trade_risk: Optional[TradeRiskInfo] = None
     score: ScoreInfo
     links: LinksInfo
+    partial: bool = False
+    skipped_sources: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Sources left out of this result, mapped to why (timeout, circuit_open, ...)",
+    )
+
+
+class BatchAnalyzeRequest(BaseModel):
+    tokens: List[AnalyzeRequest] = Field(
+        ...,
+        description="Tokens to analyze; addresses are grouped by chain upstream",
+        min_length=1,
+    )
+
+
+class BatchAnalyzeItem(BaseModel):
+    chain: str
+    token_address: str
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[str] = None
+
+
+class BatchAnalyzeResponse(BaseModel):
+    results: List[BatchAnalyzeItem] = Field(default_factory=list)
+
+
+class AutoAnalyzeRequest(BaseModel):
+    token_address: str = Field(
+        ...,
+        description="Token contract address (0x...); the chain is detected",
+        min_length=42,
+        max_length=42,
+    )
+    budget_ms: Optional[int] = Field(
+        default=None,
+        description="Latency budget per chain analysis",
+        ge=100,
+    )
+
+
+class AutoAnalyzeResponse(BaseModel):
+    token_address: str
+    chains: List[str] = Field(
+        default_factory=list,
+        description="Chains the token trades on, most liquid first",
+    )
+    results: List[BatchAnalyzeItem] = Field(default_factory=list)
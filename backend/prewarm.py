@@ -0,0 +1,116 @@
+"""
+Startup cache pre-warming.
+
+Reads a seed file of chain,address pairs (settings.prewarm_seed_path) and
+analyzes them with bounded concurrency right after startup, so the first users
+of well-known tokens after a deploy get a cache hit. Progress is tracked in
+warmup_state, which /api/ready reports to the load balancer.
+"""
+import asyncio
+import csv
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from analyzer import normalize_address
+from config import get_chain_config, settings
+from logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class WarmupState:
+    def __init__(self):
+        self.total = 0
+        self.warmed = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of seeds attempted. Failures count, so an upstream outage can't block readiness forever."""
+        if self.total == 0:
+            return 0.0 if self.started_at is None else 1.0
+        return (self.warmed + self.failed) / self.total
+
+    @property
+    def ready(self) -> bool:
+        """Never before prewarm() has started, even with nothing to warm."""
+        if self.started_at is None:
+            return False
+        return self.finished_at is not None or self.progress >= settings.prewarm_ready_fraction
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "progress": round(self.progress, 3),
+            "total": self.total,
+            "warmed": self.warmed,
+            "failed": self.failed,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+warmup_state = WarmupState()
+
+
+def load_seed_file(path: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Parse a seed file of chain,address rows. Blank lines, # comments, a
+    "chain,address" header and rows with an unknown chain or bad address are
+    skipped; duplicates are dropped.
+    """
+    path = path or settings.prewarm_seed_path
+    if not path:
+        return []
+    seed_path = Path(path)
+    if not seed_path.is_absolute():
+        seed_path = Path(__file__).parent / seed_path
+    if not seed_path.exists():
+        return []
+
+    seeds = []
+    with open(seed_path, encoding="utf-8", newline="") as f:
+        for line_no, row in enumerate(csv.reader(f), start=1):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            chain = row[0].strip().lower()
+            if chain == "chain":
+                continue
+            try:
+                get_chain_config(chain)
+                address = normalize_address(row[1] if len(row) > 1 else "")
+            except ValueError as e:
+                logger.warning("Skipping seed row", extra={"seed_file": seed_path.name, "line": line_no, "error": str(e)})
+                continue
+            seeds.append((chain, address))
+    return list(dict.fromkeys(seeds))
+
+
+async def prewarm(
+    seeds: List[Tuple[str, str]],
+    warm: Callable[[str, str], Awaitable],
+    state: WarmupState = warmup_state,
+) -> None:
+    """Run warm(chain, address) for every seed, settings.prewarm_concurrency at a time."""
+    state.total = len(seeds)
+    state.started_at = time.time()
+    semaphore = asyncio.Semaphore(max(1, settings.prewarm_concurrency))
+
+    async def warm_one(chain: str, address: str) -> None:
+        async with semaphore:
+            try:
+                await warm(chain, address)
+                state.warmed += 1
+            except Exception as e:
+                state.failed += 1
+                logger.warning("Pre-warm failed", extra={"cache_key": f"{chain}:{address}", "error": str(e)})
+
+    await asyncio.gather(*(warm_one(chain, address) for chain, address in seeds))
+    state.finished_at = time.time()
+    logger.info(
+        "Pre-warm finished",
+        extra={"warmed": state.warmed, "failed": state.failed, "total": state.total},
+    )
@@ -0,0 +1,85 @@
+"""
+Sampled stack profiler for debug requests.
+
+A daemon thread snapshots the event loop thread's Python stack every
+settings.profiling_interval_ms and counts identical stacks. Sampling only sees
+what the loop thread is doing, so time spent waiting on upstreams shows up as
+the loop idling in the selector, and other requests served concurrently are
+included in the samples. Only one profile runs at a time.
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+Frame = Tuple[str, str, int]
+_MAX_DEPTH = 15
+_active = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        if not _active.acquire(blocking=False):
+            raise ProfilerBusy("Another request is being profiled.")
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        _active.release()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self._stacks[_stack(frame)] += 1
+            self.samples += 1
+
+    def summary(self, top: int = 10) -> dict:
+        """Hottest full stacks, and functions by own (leaf) samples."""
+        leaves: Counter = Counter()
+        for stack, count in self._stacks.items():
+            leaves[stack[-1]] += count
+        total = max(1, self.samples)
+        return {
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "hot_functions": [
+                {"frame": _fmt(frame), "samples": count, "pct": round(100 * count / total, 1)}
+                for frame, count in leaves.most_common(top)
+            ],
+            "hot_stacks": [
+                {"stack": [_fmt(f) for f in stack], "samples": count, "pct": round(100 * count / total, 1)}
+                for stack, count in self._stacks.most_common(top)
+            ],
+        }
+
+
+def _stack(frame) -> Tuple[Frame, ...]:
+    frames: List[Frame] = []
+    while frame is not None and len(frames) < _MAX_DEPTH:
+        code = frame.f_code
+        frames.append((code.co_filename, code.co_name, frame.f_lineno))
+        frame = frame.f_back
+    return tuple(reversed(frames))
+
+
+def _fmt(frame: Frame) -> str:
+    filename, function, line = frame
+    return f"{os.path.basename(filename)}:{function}:{line}"
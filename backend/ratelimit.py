@@ -0,0 +1,144 @@
+"""
+Per-upstream token-bucket rate limiting with a priority wait queue.
+
+Callers that find the bucket empty queue up instead of firing a request the
+upstream would reject. When tokens free up, interactive requests are served
+before background and batch work. The priority comes from the request_priority
+context variable, which endpoints set for their own work, or from a
+PriorityGroup in priority_group, which background jobs use so that their
+queued requests can be promoted when an interactive caller starts waiting on them.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from config import settings
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+
+class PriorityGroup:
+    """A priority shared by all rate-limit waits of one job, which can be raised while they are queued."""
+
+    def __init__(self, priority: int = PRIORITY_BACKGROUND):
+        self.priority = priority
+
+    def escalate(self, priority: int) -> None:
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        for limiter in _limiters.values():
+            limiter._reprioritize(self)
+
+
+priority_group: ContextVar[Optional[PriorityGroup]] = ContextVar("priority_group", default=None)
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, burst: int, max_wait: float):
+        self.name = name
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.max_wait = max_wait
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.waited = 0
+        self.timeouts = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._drainer: Optional[asyncio.Task] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority: Optional[int] = None) -> None:
+        group = None
+        if priority is None:
+            group = priority_group.get()
+            priority = group.priority if group else request_priority.get()
+
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        self.waited += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future, group))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = asyncio.create_task(self._drain())
+
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise RateLimitTimeout(
+                f"{self.name} rate limit: waited more than {self.max_wait}s for a slot"
+            )
+
+    async def _drain(self) -> None:
+        while self._waiters:
+            self._refill()
+            while self._waiters and self.tokens >= 1:
+                _, _, future, _ = heapq.heappop(self._waiters)
+                if future.done():
+                    # Waiter timed out or was cancelled; don't spend a token on it.
+                    continue
+                self.tokens -= 1
+                future.set_result(None)
+            if self._waiters:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def _reprioritize(self, group: PriorityGroup) -> None:
+        """Move the group's queued waiters to its new priority, keeping their arrival order."""
+        if not any(waiter[3] is group for waiter in self._waiters):
+            return
+        self._waiters = [
+            (group.priority, seq, future, g) if g is group else (priority, seq, future, g)
+            for priority, seq, future, g in self._waiters
+        ]
+        heapq.heapify(self._waiters)
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": self.rate,
+            "queued": sum(1 for _, _, f, _ in self._waiters if not f.done()),
+            "waited": self.waited,
+            "timeouts": self.timeouts,
+        }
+
+
+_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_limiter(source: str) -> TokenBucket:
+    limiter = _limiters.get(source)
+    if limiter is None:
+        limiter = TokenBucket(
+            name=source,
+            rate=getattr(settings, f"{source}_rate_per_second"),
+            burst=getattr(settings, f"{source}_rate_burst"),
+            max_wait=settings.rate_limit_max_wait_seconds,
+        )
+        _limiters[source] = limiter
+    return limiter
+
+
+async def rate_limit(source: str) -> None:
+    await get_limiter(source).acquire()
+
+
+def rate_limit_stats() -> dict:
+    return {source: limiter.stats() for source, limiter in _limiters.items()}
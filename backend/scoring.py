@@ -12,12 +12,35 @@ Scoring Categories:
   - Honeypot/Tax Risk: 0-30 points
 
 Total possible: 120, clamped to 0-100.
+
+Thresholds, points and reason templates come from the declarative rule table
+in scoring_rules.py (loaded from scoring_rules.json, reloadable at runtime).
+The scalar path here and the vectorized path in batch_scoring.py read the same
+compiled ScoringRules, so both produce identical results for a given version.
+
+score_incrementally() also returns a ScoreBreakdown: each category's points and
+reasons next to a fingerprint of the normalized inputs it was computed from.
+Passing the previous breakdown back in reuses every category whose inputs (and
+rules version) are unchanged, so a refresh where only liquidity moved only
+rescores liquidity.
 """
-from typing import Optional
+from dataclasses import dataclass
+from typing import Hashable, List, Optional, Tuple
 from models import (
     TokenInfo, MarketInfo, HoldersInfo, AdminInfo,
     TradeRiskInfo, ScoreInfo,
 )
+from scoring_rules import ScoringRules, get_rules
+
+
+CATEGORIES = ("holders", "liquidity", "age", "verification", "admin", "trade_risk")
+
+
+@dataclass(frozen=True)
+class ScoreBreakdown:
+    rules_version: str
+    fingerprints: Tuple[Hashable, ...]
+    parts: Tuple[Tuple[int, Tuple[str, ...]], ...]
 
 
 def compute_risk_score(
@@ -26,202 +49,224 @@ def compute_risk_score(
     holders: Optional[HoldersInfo],
     admin: AdminInfo,
     trade_risk: Optional[TradeRiskInfo],
+    rules: Optional[ScoringRules] = None,
 ) -> ScoreInfo:
-    score = 0
-    reasons = []
-
-    score += _score_holders(holders, reasons)
-    score += _score_liquidity(market, reasons)
-    score += _score_age(token, market, reasons)
-    score += _score_verification(token, reasons)
-    score += _score_admin(admin, reasons)
-    score += _score_trade_risk(trade_risk, reasons)
+    return score_incrementally(token, market, holders, admin, trade_risk, rules)[0]
 
-    final_score = max(0, min(100, score))
 
-    if final_score >= 67:
-        label = "HIGH"
-    elif final_score >= 34:
-        label = "MEDIUM"
-    else:
-        label = "LOW"
+def score_incrementally(
+    token: TokenInfo,
+    market: Optional[MarketInfo],
+    holders: Optional[HoldersInfo],
+    admin: AdminInfo,
+    trade_risk: Optional[TradeRiskInfo],
+    rules: Optional[ScoringRules] = None,
+    previous: Optional[ScoreBreakdown] = None,
+) -> Tuple[ScoreInfo, ScoreBreakdown, List[str]]:
+    """Score, its breakdown, and the categories that had to be recomputed."""
+    # Bind the rules once so a reload mid-call can't mix two versions.
+    rules = rules or get_rules()
+    age = token_age_days(token, market)
+    fingerprints = category_fingerprints(token, market, holders, admin, trade_risk, age)
+    scorers = (
+        lambda reasons: _score_holders(holders, rules, reasons),
+        lambda reasons: _score_liquidity(market, rules, reasons),
+        lambda reasons: _score_age_days(age, rules, reasons),
+        lambda reasons: _score_verification(token, rules, reasons),
+        lambda reasons: _score_admin(admin, rules, reasons),
+        lambda reasons: _score_trade_risk(trade_risk, rules, reasons),
+    )
+    reusable = previous is not None and previous.rules_version == rules.version
+
+    parts = []
+    recomputed = []
+    for i, scorer in enumerate(scorers):
+        if reusable and previous.fingerprints[i] == fingerprints[i]:
+            parts.append(previous.parts[i])
+            continue
+        category_reasons: List[str] = []
+        parts.append((scorer(category_reasons), tuple(category_reasons)))
+        recomputed.append(CATEGORIES[i])
+
+    final_score = max(0, min(100, sum(points for points, _ in parts)))
+    label = score_label(final_score, rules)
+    reasons = [reason for _, category_reasons in parts for reason in category_reasons]
 
     if not market and not holders and not trade_risk:
-        reasons.append("Limited data available — score may not reflect true risk.")
+        reasons.append(rules.limited_data_reason)
 
-    return ScoreInfo(
+    score_info = ScoreInfo(
         risk_score=final_score,
         label=label,
         reasons=reasons,
+        rules_version=rules.version,
     )
+    return score_info, ScoreBreakdown(rules.version, fingerprints, tuple(parts)), recomputed
 
 
-def _score_holders(holders: Optional[HoldersInfo], reasons: list) -> int:
-    if not holders:
-        return 0
+def category_fingerprints(
+    token: TokenInfo,
+    market: Optional[MarketInfo],
+    holders: Optional[HoldersInfo],
+    admin: AdminInfo,
+    trade_risk: Optional[TradeRiskInfo],
+    age: Optional[int],
+) -> Tuple[Hashable, ...]:
+    """The inputs each _score_* function reads, normalized, in CATEGORIES order."""
+    return (
+        (holders.top1_pct, holders.top5_pct, holder_count_value(holders)) if holders else None,
+        market.liquidity_usd if market else None,
+        age,
+        token.verified,
+        (bool(admin.has_owner and not admin.owner_renounced), frozenset(admin.flags)),
+        (
+            trade_risk.honeypot, trade_risk.cannot_sell, trade_risk.cannot_buy,
+            trade_risk.sell_tax_pct, trade_risk.buy_tax_pct,
+        ) if trade_risk else None,
+    )
 
-    points = 0
 
-    if holders.top1_pct and holders.top1_pct > 20:
-        points += 10
-        reasons.append(f"Top holder controls {holders.top1_pct}% of supply.")
-    elif holders.top1_pct and holders.top1_pct > 10:
-        points += 5
-
-    if holders.top5_pct and holders.top5_pct > 70:
-        points += 20
-        reasons.append(f"Top 5 holders control {holders.top5_pct}% of supply — extreme concentration.")
-    elif holders.top5_pct and holders.top5_pct > 50:
-        points += 12
-        reasons.append(f"Top 5 holders control {holders.top5_pct}% of supply — high concentration.")
-    elif holders.top5_pct and holders.top5_pct > 30:
-        points += 5
-
-    if holders.holder_count is not None:
+def score_label(score: int, rules: Optional[ScoringRules] = None) -> str:
+    rules = rules or get_rules()
+    for min_score, label in rules.label_thresholds:
+        if score >= min_score:
+            return label
+    return rules.default_label
+
+
+def token_age_days(token: TokenInfo, market: Optional[MarketInfo]) -> Optional[int]:
+    age = token.age_days
+
+    if age is None and market and market.pair_created_at:
+        from datetime import datetime, timezone
         try:
-            count = int(holders.holder_count)
-            if count < 50:
-                points += 5
-                reasons.append(f"Only {count} holders — very low distribution.")
-            elif count < 200:
-                points += 2
-        except (ValueError, TypeError):
+            created = datetime.fromtimestamp(market.pair_created_at / 1000, tz=timezone.utc)
+            age = (datetime.now(timezone.utc) - created).days
+        except (ValueError, OSError):
             pass
 
-    return min(30, points)
+    return age
 
 
-def _score_liquidity(market: Optional[MarketInfo], reasons: list) -> int:
-    if not market or market.liquidity_usd is None:
-        reasons.append("No DEX liquidity data found.")
-        return 10
+def holder_count_value(holders: HoldersInfo) -> Optional[int]:
+    if holders.holder_count is None:
+        return None
+    try:
+        return int(holders.holder_count)
+    except (ValueError, TypeError):
+        return None
+
+
+def _tier_above(value, tiers, reasons: list) -> int:
+    for threshold, points, reason in tiers:
+        if value > threshold:
+            if reason:
+                reasons.append(reason.format(value=value))
+            return points
+    return 0
+
+
+def _tier_below(value, tiers, reasons: list) -> int:
+    for threshold, points, reason in tiers:
+        if value < threshold:
+            if reason:
+                reasons.append(reason.format(value=value))
+            return points
+    return 0
+
+
+def _score_holders(holders: Optional[HoldersInfo], rules: ScoringRules, reasons: list) -> int:
+    if not holders:
+        return 0
 
-    liq = market.liquidity_usd
     points = 0
 
-    if liq < 5_000:
-        points = 20
-        reasons.append(f"Extremely low liquidity (${liq:,.0f}).")
-    elif liq < 20_000:
-        points = 15
-        reasons.append(f"Very low liquidity (${liq:,.0f}).")
-    elif liq < 50_000:
-        points = 10
-        reasons.append(f"Low liquidity (${liq:,.0f}).")
-    elif liq < 100_000:
-        points = 5
+    if holders.top1_pct:
+        points += _tier_above(holders.top1_pct, rules.top1_tiers, reasons)
 
-    return min(20, points)
+    if holders.top5_pct:
+        points += _tier_above(holders.top5_pct, rules.top5_tiers, reasons)
 
+    count = holder_count_value(holders)
+    if count is not None:
+        points += _tier_below(count, rules.holder_count_tiers, reasons)
 
-def _score_age(token: TokenInfo, market: Optional[MarketInfo], reasons: list) -> int:
-    age = token.age_days
+    return min(rules.holders_cap, points)
 
-    if age is None and market and market.pair_created_at:
-        from datetime import datetime, timezone
-        try:
-            created = datetime.fromtimestamp(market.pair_created_at / 1000, tz=timezone.utc)
-            age = (datetime.now(timezone.utc) - created).days
-        except (ValueError, OSError):
-            pass
 
+def _score_liquidity(market: Optional[MarketInfo], rules: ScoringRules, reasons: list) -> int:
+    if not market or market.liquidity_usd is None:
+        points, reason = rules.liquidity_missing
+        reasons.append(reason)
+        return points
+
+    points = _tier_below(market.liquidity_usd, rules.liquidity_tiers, reasons)
+    return min(rules.liquidity_cap, points)
+
+
+def _score_age_days(age: Optional[int], rules: ScoringRules, reasons: list) -> int:
     if age is None:
         return 0
 
-    if age < 3:
-        reasons.append(f"Token is only {age} day(s) old — very new.")
-        return 10
-    elif age < 7:
-        reasons.append(f"Token is {age} days old.")
-        return 8
-    elif age < 30:
-        return 5
-    elif age < 90:
-        return 2
-    return 0
+    return _tier_below(age, rules.age_tiers, reasons)
 
 
-def _score_verification(token: TokenInfo, reasons: list) -> int:
+def _score_verification(token: TokenInfo, rules: ScoringRules, reasons: list) -> int:
     if token.verified is None:
-        return 3
+        return rules.verification_unknown_points
 
     if not token.verified:
-        reasons.append("Contract source code is not verified.")
-        return 10
+        points, reason = rules.unverified
+        reasons.append(reason)
+        return points
 
     return 0
 
 
-def _score_admin(admin: AdminInfo, reasons: list) -> int:
+def _score_admin(admin: AdminInfo, rules: ScoringRules, reasons: list) -> int:
     points = 0
 
     if admin.has_owner and not admin.owner_renounced:
-        points += 6
-        reasons.append("Contract has an active owner (not renounced).")
-
-    flag_scores = {
-        "mint_function_detected": (6, "Owner can mint new tokens."),
-        "blacklist_function_detected": (4, "Contract has blacklist capability."),
-        "blacklist_terms_detected": (4, "Contract source mentions blacklist."),
-        "proxy_contract_detected": (5, "Upgradeable proxy pattern detected — contract logic can be changed."),
-        "transfer_pausable": (4, "Token transfers can be paused."),
-        "slippage_modifiable": (5, "Tax/slippage can be modified by owner."),
-        "personal_tax_modifiable": (5, "Per-address tax manipulation possible."),
-        "hidden_owner_detected": (6, "Hidden owner detected — ownership may be disguised."),
-        "can_reclaim_ownership": (5, "Ownership can be reclaimed after renouncing."),
-        "self_destruct_function": (5, "Self-destruct function found."),
-        "trading_toggle_detected": (4, "Trading can be toggled on/off."),
-        "fee_modification_detected": (3, "Fee modification functions detected."),
-        "tax_modification_detected": (3, "Tax modification functions detected."),
-    }
-
-    for flag in admin.flags:
-        if flag in flag_scores:
-            pts, reason = flag_scores[flag]
+        owner_points, reason = rules.owner_active
+        points += owner_points
+        reasons.append(reason)
+
+    # Walk the table rather than admin.flags so each flag counts once and
+    # reasons come out in a stable order.
+    flags = set(admin.flags)
+    for flag, pts, reason in rules.admin_flag_scores:
+        if flag in flags:
             points += pts
             reasons.append(reason)
 
-    return min(20, points)
+    return min(rules.admin_cap, points)
 
 
-def _score_trade_risk(trade_risk: Optional[TradeRiskInfo], reasons: list) -> int:
+def _score_trade_risk(
+    trade_risk: Optional[TradeRiskInfo], rules: ScoringRules, reasons: list,
+) -> int:
     if not trade_risk:
         return 0
 
     points = 0
 
     if trade_risk.honeypot:
-        points += 30
-        reasons.append("HONEYPOT DETECTED — you likely cannot sell this token.")
-        return 30
+        honeypot_points, reason = rules.honeypot
+        reasons.append(reason)
+        return honeypot_points
 
     if trade_risk.cannot_sell:
-        points += 25
-        reasons.append("Token cannot be sold (sell restriction detected).")
+        points += rules.cannot_sell[0]
+        reasons.append(rules.cannot_sell[1])
 
     if trade_risk.cannot_buy:
-        points += 10
-        reasons.append("Token cannot be bought (buy restriction detected).")
+        points += rules.cannot_buy[0]
+        reasons.append(rules.cannot_buy[1])
 
     if trade_risk.sell_tax_pct is not None:
-        if trade_risk.sell_tax_pct > 50:
-            points += 20
-            reasons.append(f"Extremely high sell tax: {trade_risk.sell_tax_pct}%.")
-        elif trade_risk.sell_tax_pct > 20:
-            points += 12
-            reasons.append(f"High sell tax: {trade_risk.sell_tax_pct}%.")
-        elif trade_risk.sell_tax_pct > 10:
-            points += 6
-            reasons.append(f"Moderate sell tax: {trade_risk.sell_tax_pct}%.")
-        elif trade_risk.sell_tax_pct > 5:
-            points += 3
+        points += _tier_above(trade_risk.sell_tax_pct, rules.sell_tax_tiers, reasons)
 
     if trade_risk.buy_tax_pct is not None:
-        if trade_risk.buy_tax_pct > 20:
-            points += 8
-            reasons.append(f"High buy tax: {trade_risk.buy_tax_pct}%.")
-        elif trade_risk.buy_tax_pct > 10:
-            points += 5
-            reasons.append(f"Moderate buy tax: {trade_risk.buy_tax_pct}%.")
-
-    return min(30, points)
+        points += _tier_above(trade_risk.buy_tax_pct, rules.buy_tax_tiers, reasons)
+
+    return min(rules.trade_risk_cap, points)
@@ -0,0 +1,198 @@
+"""
+Declarative scoring rules.
+
+Thresholds, points and reason templates live in a JSON rule table
+(settings.scoring_rules_path, scoring_rules.json by default). The table is
+compiled once into an immutable ScoringRules object of plain tuples. Reloading
+compiles a new object and swaps the module-level reference in one assignment:
+a request that already picked up the old rules finishes with them, and the
+next request sees the new ones.
+
+With several workers, the active table lives in the shared cache backend. A
+worker publishes the table it loaded on its first get_rules() call and on
+every reload, and the other workers adopt a table with a different version
+within settings.scoring_rules_sync_seconds. So a reload sent to any one
+worker reaches them all instead of leaving them scoring with different rules.
+With the memory backend there is nothing to share, and a reload only affects
+the worker that receives it.
+
+A tier is (threshold, points, reason template or None); the first tier whose
+threshold the value crosses wins. Whether "crosses" means above or below is
+fixed per signal and spelled out in the table as "above"/"below".
+Reason templates may only use {value}, with a short format spec; each one is
+formatted once at compile time so a bad template fails the load, not a request.
+"""
+import json
+import re
+import string
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+from cache import get_shared_rule_table, set_shared_rule_table
+from config import settings
+from logs import get_logger
+
+logger = get_logger(__name__)
+
+Tier = Tuple[float, int, Optional[str]]
+Rule = Tuple[int, str]
+
+# Widths and precisions above this in a reason template's format spec are rejected.
+_MAX_FORMAT_NUMBER = 64
+
+
+@dataclass(frozen=True)
+class ScoringRules:
+    version: str
+    label_thresholds: Tuple[Tuple[int, str], ...]
+    default_label: str
+    limited_data_reason: str
+    holders_cap: int
+    top1_tiers: Tuple[Tier, ...]
+    top5_tiers: Tuple[Tier, ...]
+    holder_count_tiers: Tuple[Tier, ...]
+    liquidity_cap: int
+    liquidity_missing: Rule
+    liquidity_tiers: Tuple[Tier, ...]
+    age_tiers: Tuple[Tier, ...]
+    verification_unknown_points: int
+    unverified: Rule
+    admin_cap: int
+    owner_active: Rule
+    admin_flag_scores: Tuple[Tuple[str, int, str], ...]
+    trade_risk_cap: int
+    honeypot: Rule
+    cannot_sell: Rule
+    cannot_buy: Rule
+    sell_tax_tiers: Tuple[Tier, ...]
+    buy_tax_tiers: Tuple[Tier, ...]
+
+
+def compile_rules(table: dict) -> ScoringRules:
+    """Validate a rule table and compile it. Raises ValueError on a malformed table."""
+    try:
+        holders = table["holders"]
+        liquidity = table["liquidity"]
+        verification = table["verification"]
+        admin = table["admin"]
+        trade = table["trade_risk"]
+
+        return ScoringRules(
+            version=str(table["version"]),
+            label_thresholds=tuple(
+                (int(t["min_score"]), str(t["label"]))
+                for t in sorted(table["labels"]["thresholds"], key=lambda t: -t["min_score"])
+            ),
+            default_label=str(table["labels"]["default"]),
+            limited_data_reason=str(table["limited_data_reason"]),
+            holders_cap=int(holders["cap"]),
+            top1_tiers=_tiers(holders["top1_pct"], "above"),
+            top5_tiers=_tiers(holders["top5_pct"], "above"),
+            holder_count_tiers=_tiers(holders["holder_count"], "below"),
+            liquidity_cap=int(liquidity["cap"]),
+            liquidity_missing=_rule(liquidity["missing"]),
+            liquidity_tiers=_tiers(liquidity["liquidity_usd"], "below"),
+            age_tiers=_tiers(table["age"]["age_days"], "below"),
+            verification_unknown_points=int(verification["unknown_points"]),
+            unverified=_rule(verification["unverified"]),
+            admin_cap=int(admin["cap"]),
+            owner_active=_rule(admin["owner_active"]),
+            admin_flag_scores=tuple(
+                (str(flag), *_rule(rule)) for flag, rule in admin["flags"].items()
+            ),
+            trade_risk_cap=int(trade["cap"]),
+            honeypot=_rule(trade["honeypot"]),
+            cannot_sell=_rule(trade["cannot_sell"]),
+            cannot_buy=_rule(trade["cannot_buy"]),
+            sell_tax_tiers=_tiers(trade["sell_tax_pct"], "above"),
+            buy_tax_tiers=_tiers(trade["buy_tax_pct"], "above"),
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid scoring rule table: {e!r}")
+
+
+def _tiers(entries: list, direction: str) -> Tuple[Tier, ...]:
+    tiers = []
+    for entry in entries:
+        threshold = float(entry[direction])
+        tiers.append((threshold, int(entry["points"]), _template(entry.get("reason"), threshold)))
+    return tuple(tiers)
+
+
+def _template(reason, sample: float) -> Optional[str]:
+    """Check a reason template against a sample value; raises ValueError if it can't format."""
+    if reason is None:
+        return None
+    reason = str(reason)
+    for _, field, spec, _ in string.Formatter().parse(reason):
+        if field is None:
+            continue
+        if field != "value":
+            raise ValueError(f"reason template field {{{field}}} is not {{value}}")
+        if "{" in spec or any(int(n) > _MAX_FORMAT_NUMBER for n in re.findall(r"\d+", spec)):
+            raise ValueError(f"reason template format spec {spec!r} is not allowed")
+    reason.format(value=sample)
+    return reason
+
+
+def _rule(entry: dict) -> Rule:
+    return int(entry["points"]), str(entry["reason"])
+
+
+def load_rules(path: Optional[str] = None) -> ScoringRules:
+    return compile_rules(_read_table(path))
+
+
+def _read_table(path: Optional[str] = None) -> dict:
+    rules_path = Path(path or settings.scoring_rules_path)
+    if not rules_path.is_absolute():
+        rules_path = Path(__file__).parent / rules_path
+    with open(rules_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+_active_table = _read_table()
+_active_rules = compile_rules(_active_table)
+# When this process last compared its rules with the shared table; None until it has published its own.
+_synced_at: Optional[float] = None
+
+
+def get_rules() -> ScoringRules:
+    if _synced_at is None or time.monotonic() - _synced_at >= settings.scoring_rules_sync_seconds:
+        _sync_shared()
+    return _active_rules
+
+
+def _sync_shared() -> None:
+    global _active_rules, _active_table, _synced_at
+    first = _synced_at is None
+    _synced_at = time.monotonic()
+    if first:
+        set_shared_rule_table(_active_table)
+        return
+
+    table = get_shared_rule_table()
+    if table is None or str(table.get("version")) == _active_rules.version:
+        return
+    try:
+        rules = compile_rules(table)
+    except ValueError as e:
+        logger.warning("Shared scoring rules rejected", extra={"error": str(e)})
+        return
+    logger.info("Scoring rules updated from the shared cache", extra={
+        "previous_version": _active_rules.version, "version": rules.version,
+    })
+    _active_rules, _active_table = rules, table
+
+
+def reload_rules(path: Optional[str] = None) -> ScoringRules:
+    """Load, compile and activate a rule table, and share it with the other workers. The old rules stay active on error."""
+    global _active_rules, _active_table, _synced_at
+    table = _read_table(path)
+    rules = compile_rules(table)
+    _active_rules, _active_table = rules, table
+    set_shared_rule_table(table)
+    _synced_at = time.monotonic()
+    return _active_rules
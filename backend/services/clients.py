@@ -0,0 +1,123 @@
+"""
+Dedicated HTTP client per upstream.
+
+Each upstream gets its own httpx.AsyncClient and connection pool, sized from
+settings ({source}_max_connections, {source}_max_keepalive_connections,
+{source}_http2), so a burst of slow calls to one host can't starve the others
+of connections. HTTP/2 is used where enabled and the h2 package is installed.
+In record/replay mode (settings.upstream_mode) each client's transport is
+wrapped by services.recording.
+
+Pool-wait time (from handing a request to the client until it gets a
+connection) is measured with httpcore's trace extension and reported by
+pool_stats() for sizing pools under real load.
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Union
+
+import httpx
+
+from config import settings
+from metrics import UPSTREAM_POOL_WAIT
+from logs import get_logger
+from services.recording import wrap_transport
+
+logger = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401  (httpx[http2])
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+SOURCES = ("dexscreener", "etherscan", "goplus")
+# The first of these trace events marks the end of the wait for a pool slot:
+# either a new connection starts, or a reused one starts sending.
+_CONNECTION_ACQUIRED = (".connect_tcp.started", ".send_request_headers.started")
+_WAIT_WINDOW = 500
+
+_pool_waits: Dict[str, Deque[float]] = {}
+_pool_stats: Dict[str, Dict[str, float]] = {}
+
+
+class UpstreamClients:
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._clients = {source: _build_client(source, transport) for source in SOURCES}
+
+    def get(self, source: str) -> httpx.AsyncClient:
+        return self._clients[source]
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+
+
+HttpClients = Union[httpx.AsyncClient, UpstreamClients]
+
+
+def client_for(clients: HttpClients, source: str) -> httpx.AsyncClient:
+    """The client for source; a plain AsyncClient is shared by every source."""
+    if isinstance(clients, UpstreamClients):
+        return clients.get(source)
+    return clients
+
+
+def _build_client(source: str, transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    http2 = getattr(settings, f"{source}_http2")
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but h2 is not installed; using HTTP/1.1", extra={"source": source})
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=getattr(settings, f"{source}_max_connections"),
+        max_keepalive_connections=getattr(settings, f"{source}_max_keepalive_connections"),
+        keepalive_expiry=settings.upstream_keepalive_expiry_seconds,
+    )
+    if transport is None and settings.upstream_mode == "record":
+        # The recorder wraps the pooled transport httpx would otherwise build itself.
+        transport = httpx.AsyncHTTPTransport(http2=http2, limits=limits)
+
+    return httpx.AsyncClient(
+        timeout=30.0,
+        http2=http2,
+        limits=limits,
+        transport=wrap_transport(transport),
+        event_hooks={"request": [_pool_wait_tracer(source)]},
+    )
+
+
+def _pool_wait_tracer(source: str):
+    async def attach(request: httpx.Request) -> None:
+        started = time.monotonic()
+        acquired = False
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal acquired
+            if not acquired and event.endswith(_CONNECTION_ACQUIRED):
+                acquired = True
+                _record_wait(source, time.monotonic() - started)
+
+        request.extensions["trace"] = trace
+
+    return attach
+
+
+def _record_wait(source: str, seconds: float) -> None:
+    UPSTREAM_POOL_WAIT.observe(seconds, source=source)
+    _pool_waits.setdefault(source, deque(maxlen=_WAIT_WINDOW)).append(seconds)
+    stats = _pool_stats.setdefault(source, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+    stats["count"] += 1
+    stats["total_seconds"] += seconds
+    stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+
+def pool_stats() -> dict:
+    result = {}
+    for source, stats in _pool_stats.items():
+        recent = sorted(_pool_waits[source])
+        result[source] = {
+            **stats,
+            "p95_seconds": recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+        }
+    return result
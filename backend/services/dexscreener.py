@@ -4,10 +4,16 @@ Fetches trading pair data, liquidity, volume, and price information.
 No API key required.
 """
 import httpx
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
 
+from services.upstream import upstream_get
+
 DEXSCREENER_BASE = "https://api.dexscreener.com"
+# /tokens/v1 accepts at most 30 comma-separated addresses per call.
+DEXSCREENER_BATCH_SIZE = 30
+# /latest/dex/tokens returns at most this many pairs, across all chains.
+DEXSCREENER_CROSS_CHAIN_LIMIT = 30
 
 
 async def fetch_dexscreener_data(
@@ -17,7 +23,7 @@ async def fetch_dexscreener_data(
 ) -> Optional[dict]:
     url = f"{DEXSCREENER_BASE}/tokens/v1/{chain_id}/{token_address}"
 
-    response = await client.get(url)
+    response = await upstream_get(client, "dexscreener", url)
     response.raise_for_status()
 
     pairs = response.json()
@@ -25,6 +31,72 @@ async def fetch_dexscreener_data(
     if not pairs or not isinstance(pairs, list) or len(pairs) == 0:
         return None
 
+    return _parse_pairs(pairs)
+
+
+async def fetch_dexscreener_batch(
+    client: httpx.AsyncClient,
+    chain_id: str,
+    token_addresses: List[str],
+) -> Dict[str, Optional[dict]]:
+    """Fetch many tokens on one chain, keyed by lowercased address."""
+    addresses = [a.lower() for a in token_addresses]
+    grouped: Dict[str, list] = {a: [] for a in addresses}
+
+    for i in range(0, len(addresses), DEXSCREENER_BATCH_SIZE):
+        chunk = addresses[i:i + DEXSCREENER_BATCH_SIZE]
+        url = f"{DEXSCREENER_BASE}/tokens/v1/{chain_id}/{','.join(chunk)}"
+
+        response = await upstream_get(client, "dexscreener", url)
+        response.raise_for_status()
+
+        pairs = response.json()
+        if not pairs or not isinstance(pairs, list):
+            continue
+
+        for pair in pairs:
+            for side in ("baseToken", "quoteToken"):
+                side_address = ((pair.get(side) or {}).get("address") or "").lower()
+                if side_address in grouped:
+                    grouped[side_address].append(pair)
+
+    return {
+        address: _parse_pairs(pairs) if pairs else None
+        for address, pairs in grouped.items()
+    }
+
+
+async def fetch_dexscreener_cross_chain(
+    client: httpx.AsyncClient,
+    token_address: str,
+) -> Dict[str, dict]:
+    """
+    Look a token up on every chain DexScreener indexes, in one call.
+    Returns parsed pair data keyed by DexScreener chain id, for each chain
+    where the token is one side of at least one pair. When the response hit
+    the pair cap, some pairs are missing and every entry is marked truncated.
+    """
+    address = token_address.lower()
+    url = f"{DEXSCREENER_BASE}/latest/dex/tokens/{address}"
+
+    response = await upstream_get(client, "dexscreener", url)
+    response.raise_for_status()
+
+    pairs = (response.json() or {}).get("pairs") or []
+    by_chain: Dict[str, list] = {}
+    for pair in pairs:
+        sides = {((pair.get(side) or {}).get("address") or "").lower() for side in ("baseToken", "quoteToken")}
+        if address in sides and pair.get("chainId"):
+            by_chain.setdefault(pair["chainId"], []).append(pair)
+
+    truncated = len(pairs) >= DEXSCREENER_CROSS_CHAIN_LIMIT
+    return {
+        chain_id: {**_parse_pairs(chain_pairs), "truncated": truncated}
+        for chain_id, chain_pairs in by_chain.items()
+    }
+
+
+def _parse_pairs(pairs: list) -> dict:
     best_pair = max(
         pairs,
         key=lambda p: (p.get("liquidity") or {}).get("usd") or 0,
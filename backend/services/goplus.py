@@ -4,10 +4,25 @@ Fetches comprehensive token security analysis including honeypot detection,
 holder analysis, ownership flags, and tax information.
 """
 import httpx
-from typing import Optional
+from typing import Dict, List, Optional
 from config import settings
+from services.upstream import upstream_get
+from logs import get_logger
+
+logger = get_logger(__name__)
 
 GOPLUS_BASE = "https://api.gopluslabs.io/api/v1"
+# token_security takes comma-separated contract_addresses.
+GOPLUS_BATCH_SIZE = 20
+
+
+class GoPlusError(Exception):
+    """GoPlus answered with a code other than 1 (rate limit, bad request, outage)."""
+
+
+def _check_code(data: dict) -> None:
+    if data.get("code") != 1:
+        raise GoPlusError(f"GoPlus code {data.get('code')}: {data.get('message')}")
 
 
 async def fetch_goplus_data(
@@ -22,30 +37,49 @@ async def fetch_goplus_data(
     if settings.goplus_api_key:
         headers["Authorization"] = settings.goplus_api_key
 
-    try:
-        response = await client.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        data = response.json()
+    response = await upstream_get(client, "goplus", url, params=params, headers=headers)
+    response.raise_for_status()
+    data = response.json()
+    _check_code(data)
 
-        if data.get("code") != 1:
-            print(f"GoPlus returned error code: {data.get('code')}, message: {data.get('message')}")
-            return None
+    result = data.get("result", {})
 
-        result = data.get("result", {})
+    token_data = result.get(token_address.lower())
+    if not token_data:
+        token_data = result.get(token_address)
 
-        token_data = result.get(token_address.lower())
-        if not token_data:
-            token_data = result.get(token_address)
+    if not token_data:
+        logger.info("GoPlus has no data for token", extra={"token": token_address, "chain_id": chain_id})
+        return None
 
-        if not token_data:
-            print(f"GoPlus: No data found for {token_address} on chain {chain_id}")
-            return None
+    return token_data
 
-        return token_data
 
-    except httpx.HTTPStatusError as e:
-        print(f"GoPlus HTTP error: {e.response.status_code}")
-        return None
-    except Exception as e:
-        print(f"GoPlus error: {e}")
-        return None
+async def fetch_goplus_batch(
+    client: httpx.AsyncClient,
+    chain_id: str,
+    token_addresses: List[str],
+) -> Dict[str, Optional[dict]]:
+    """Fetch many tokens on one chain, keyed by lowercased address."""
+    addresses = [a.lower() for a in token_addresses]
+    results: Dict[str, Optional[dict]] = {a: None for a in addresses}
+
+    url = f"{GOPLUS_BASE}/token_security/{chain_id}"
+    headers = {}
+    if settings.goplus_api_key:
+        headers["Authorization"] = settings.goplus_api_key
+
+    for i in range(0, len(addresses), GOPLUS_BATCH_SIZE):
+        chunk = addresses[i:i + GOPLUS_BATCH_SIZE]
+        params = {"contract_addresses": ",".join(chunk)}
+
+        response = await upstream_get(client, "goplus", url, params=params, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        _check_code(data)
+
+        for address, token_data in (data.get("result") or {}).items():
+            if address.lower() in results and token_data:
+                results[address.lower()] = token_data
+
+    return results
@@ -0,0 +1,170 @@
+"""
+Record/replay of raw upstream responses.
+
+With settings.upstream_mode = "record", every upstream response passes through
+RecordReplayTransport on its way to the service clients and is written to a
+ResponseStore. With "replay", the transport answers from the store instead of
+the network, after the recorded latency times settings.upstream_replay_latency_scale
+(0 serves instantly). A request that was never recorded gets a 404 with an
+X-Replay-Miss header, so it fails like an upstream error instead of hanging.
+
+The store lives in settings.upstream_record_dir:
+
+  blobs/ab/abcdef....z   zlib-compressed response bodies, named by the sha256
+                         of their content, so identical bodies are stored once
+  index.jsonl            one line per recorded request: request key, status,
+                         headers, body hash, latency. Later lines win.
+
+Request keys are the method plus the URL with its query sorted and credentials
+(apikey) removed, so a recording can be replayed without API keys.
+"""
+import asyncio
+import hashlib
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+from config import settings
+from logs import get_logger
+
+logger = get_logger(__name__)
+
+MODES = ("off", "record", "replay")
+_REDACTED_PARAMS = {"apikey", "api_key"}
+_KEPT_HEADERS = ("content-type", "retry-after")
+
+
+def request_key(request: httpx.Request) -> str:
+    return f"{request.method} {_redacted_url(request.url)}"
+
+
+def _redacted_url(url: httpx.URL) -> str:
+    params = sorted(
+        (k, v) for k, v in url.params.multi_items() if k.lower() not in _REDACTED_PARAMS
+    )
+    return str(url.copy_with(params=params))
+
+
+class ResponseStore:
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self._index_path = self.root / "index.jsonl"
+        self._index: Dict[str, dict] = {}
+        if self._index_path.exists():
+            with open(self._index_path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._index[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._index.get(key)
+
+    def put(self, key: str, status: int, headers: dict, body: bytes, latency: float) -> None:
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            blob.write_bytes(zlib.compress(body, 6))
+
+        entry = {
+            "key": key,
+            "status": status,
+            "headers": headers,
+            "body": digest,
+            "latency_ms": round(latency * 1000, 1),
+            "recorded_at": round(time.time(), 3),
+        }
+        self._index[key] = entry
+        with open(self._index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def body(self, digest: str) -> bytes:
+        return zlib.decompress(self._blob_path(digest).read_bytes())
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.z"
+
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(
+        self,
+        mode: str,
+        store: ResponseStore,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+        latency_scale: float = 1.0,
+    ):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown record/replay mode: {mode}")
+        if mode == "record" and inner is None:
+            raise ValueError("Record mode needs a transport to record from")
+        self.mode = mode
+        self.store = store
+        self.inner = inner
+        self.latency_scale = latency_scale
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        if self.mode == "replay":
+            return await self._replay(key, request)
+
+        started = time.monotonic()
+        response = await self.inner.handle_async_request(request)
+        body = await response.aread()
+        latency = time.monotonic() - started
+        headers = {k: response.headers[k] for k in _KEPT_HEADERS if k in response.headers}
+        self.store.put(key, response.status_code, headers, body, latency)
+        return httpx.Response(
+            response.status_code, headers=headers, content=body,
+            request=request, extensions=response.extensions,
+        )
+
+    async def _replay(self, key: str, request: httpx.Request) -> httpx.Response:
+        entry = self.store.get(key)
+        if entry is None:
+            logger.warning("Replay miss", extra={"request": key})
+            return httpx.Response(404, headers={"X-Replay-Miss": "1"}, request=request)
+
+        delay = entry["latency_ms"] / 1000 * self.latency_scale
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return httpx.Response(
+            entry["status"], headers=entry["headers"], content=self.store.body(entry["body"]),
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
+
+
+def wrap_transport(inner: Optional[httpx.AsyncBaseTransport]) -> Optional[httpx.AsyncBaseTransport]:
+    """Wrap a client transport according to settings.upstream_mode ("off" returns it unchanged)."""
+    mode = settings.upstream_mode
+    if mode not in MODES:
+        raise ValueError(f"UPSTREAM_MODE must be one of {MODES}, got {mode!r}")
+    if mode == "off":
+        return inner
+    return RecordReplayTransport(
+        mode, _shared_store(), inner, settings.upstream_replay_latency_scale,
+    )
+
+
+_stores: Dict[str, ResponseStore] = {}
+
+
+def _shared_store() -> ResponseStore:
+    root = Path(settings.upstream_record_dir)
+    if not root.is_absolute():
+        root = Path(__file__).parent.parent / root
+    key = str(root)
+    if key not in _stores:
+        _stores[key] = ResponseStore(key)
+    return _stores[key]
@@ -0,0 +1,197 @@
+"""
+Shared request helper for the upstream API clients.
+
+Every attempt goes through the per-source rate limiter. Transport errors, 429s
+and 5xx responses are retried a bounded number of times with jittered
+exponential backoff, honoring Retry-After when the upstream sends one. When
+enough latency samples exist, a hedged duplicate is sent if the first attempt
+hasn't answered by the configured latency percentile, counted from when it got
+its rate-limit slot (a request still queued behind our own limiter is never
+hedged); whichever finishes first wins and the other is cancelled.
+
+A caller can bound the upstream's own time with upstream_budget. The budget
+starts when the first attempt gets its rate-limit slot, so time spent queued
+behind our own limiter never counts against the upstream; running out raises
+UpstreamTimeout.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+
+import httpx
+
+from config import settings
+from metrics import UPSTREAM_LATENCY, UPSTREAM_REQUESTS
+from ratelimit import rate_limit
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Latency samples kept per source, and how many are needed before hedging.
+_LATENCY_WINDOW = 200
+_MIN_HEDGE_SAMPLES = 20
+
+_latencies: Dict[str, Deque[float]] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+class UpstreamTimeout(Exception):
+    """The upstream didn't answer within its budget once it had a rate-limit slot."""
+
+
+class UpstreamBudget:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started: Optional[float] = None
+
+    def remaining(self) -> float:
+        """Seconds left; the clock starts on the first call."""
+        now = time.monotonic()
+        if self.started is None:
+            self.started = now
+        return self.seconds - (now - self.started)
+
+
+upstream_budget: ContextVar[Optional[UpstreamBudget]] = ContextVar("upstream_budget", default=None)
+
+
+async def upstream_get(
+    client: httpx.AsyncClient,
+    source: str,
+    url: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+) -> httpx.Response:
+    attempt = 0
+    while True:
+        try:
+            response = await _hedged_get(client, source, url, params, headers)
+        except httpx.TransportError:
+            if attempt >= settings.upstream_max_retries:
+                raise
+            delay = _backoff(attempt)
+        else:
+            if response.status_code not in RETRYABLE_STATUS or attempt >= settings.upstream_max_retries:
+                return response
+            delay = _retry_after(response)
+            if delay is None:
+                delay = _backoff(attempt)
+            elif delay > settings.upstream_retry_after_max_seconds:
+                # Not worth holding the request that long; let the caller see the error.
+                return response
+
+        attempt += 1
+        _stat(source, "retries")
+        await asyncio.sleep(delay)
+
+
+async def _hedged_get(client, source, url, params, headers) -> httpx.Response:
+    slot = asyncio.Event()
+    first = asyncio.ensure_future(_timed_get(client, source, url, params, headers, slot))
+    hedge_delay = _hedge_delay(source)
+    if hedge_delay is None:
+        return await first
+
+    pending = {first}
+    try:
+        slot_wait = asyncio.ensure_future(slot.wait())
+        try:
+            await asyncio.wait({first, slot_wait}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            slot_wait.cancel()
+        done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+        if not done:
+            _stat(source, "hedges")
+            pending.add(asyncio.ensure_future(_timed_get(client, source, url, params, headers)))
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        _stat(source, "hedge_wins")
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _timed_get(client, source, url, params, headers, slot: Optional[asyncio.Event] = None) -> httpx.Response:
+    await rate_limit(source)
+    if slot is not None:
+        slot.set()
+    budget = upstream_budget.get()
+    started = time.monotonic()
+    try:
+        if budget is None:
+            response = await client.get(url, params=params, headers=headers)
+        else:
+            remaining = budget.remaining()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            response = await asyncio.wait_for(client.get(url, params=params, headers=headers), remaining)
+    except httpx.TransportError:
+        UPSTREAM_REQUESTS.inc(source=source, status="transport_error")
+        raise
+    except asyncio.TimeoutError:
+        UPSTREAM_REQUESTS.inc(source=source, status="timeout")
+        raise UpstreamTimeout(f"{source} did not answer within {budget.seconds}s")
+    elapsed = time.monotonic() - started
+    _latencies.setdefault(source, deque(maxlen=_LATENCY_WINDOW)).append(elapsed)
+    UPSTREAM_LATENCY.observe(elapsed, source=source)
+    UPSTREAM_REQUESTS.inc(source=source, status=response.status_code)
+    return response
+
+
+def _hedge_delay(source: str) -> Optional[float]:
+    percentile = settings.upstream_hedge_percentile
+    samples = _latencies.get(source)
+    if percentile <= 0 or not samples or len(samples) < _MIN_HEDGE_SAMPLES:
+        return None
+
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+    return max(ordered[index], settings.upstream_hedge_min_delay_seconds)
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform in [0, base * 2^attempt], capped.
+    ceiling = min(
+        settings.upstream_retry_max_backoff_seconds,
+        settings.upstream_retry_backoff_seconds * (2 ** attempt),
+    )
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _counters(source: str) -> Dict[str, int]:
+    return _stats.setdefault(source, {"retries": 0, "hedges": 0, "hedge_wins": 0})
+
+
+def _stat(source: str, name: str) -> None:
+    _counters(source)[name] += 1
+
+
+def upstream_stats() -> dict:
+    return {
+        source: {**_counters(source), "hedge_delay_seconds": _hedge_delay(source)}
+        for source in sorted(set(_stats) | set(_latencies))
+    }
@@ -0,0 +1,105 @@
+"""
+Single-pass feature scanner for verified contract source code.
+
+Understands Etherscan's SourceCode formats (a plain Solidity file, a JSON map
+of files, and the {{...}} standard-json input). It skips comments and string
+literals and matches whole identifiers rather than raw substrings, so "mint"
+in a comment or inside "administrator" no longer counts. Results are memoized
+by source hash because many scam tokens are deployed from the same template.
+"""
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import List, Tuple
+
+from cachetools import LRUCache
+
+# One alternation over the whole text: comments and string literals match (and
+# capture nothing), identifiers are captured. findall() then runs entirely in C.
+_TOKEN_RE = re.compile(
+    r"//[^\n]*"
+    r"|/\*.*?(?:\*/|\Z)"
+    r'|"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r"|([A-Za-z_$][A-Za-z0-9_$]*)",
+    re.DOTALL,
+)
+# Splits camelCase / PascalCase / SNAKE_CASE identifiers into lowercase words.
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Emitted in this order, matching the flags the analyzer has always produced.
+SOURCE_FLAGS = (
+    "mint_function_detected",
+    "blacklist_terms_detected",
+    "fee_modification_detected",
+    "tax_modification_detected",
+    "pause_function_detected",
+    "trading_toggle_detected",
+    "owner_restricted_functions",
+)
+
+_PAUSE_WORDS = {"pause", "unpause", "paused", "pausable"}
+
+_scan_cache = LRUCache(maxsize=2048)
+
+
+def scan_source(source_code: str) -> Tuple[str, ...]:
+    """Return the SOURCE_FLAGS present in source_code, memoized by content hash."""
+    digest = hashlib.sha256(source_code.encode("utf-8", "surrogatepass")).hexdigest()
+    flags = _scan_cache.get(digest)
+    if flags is None:
+        found = set()
+        for text in _source_files(source_code):
+            for identifier in set(_TOKEN_RE.findall(text)):
+                if identifier:
+                    found.update(_classify(identifier))
+        flags = tuple(flag for flag in SOURCE_FLAGS if flag in found)
+        _scan_cache[digest] = flags
+    return flags
+
+
+def _source_files(source_code: str) -> List[str]:
+    text = source_code.strip()
+    # Standard-json input is wrapped in an extra pair of braces.
+    if text.startswith("{{") and text.endswith("}}"):
+        text = text[1:-1]
+    if not text.startswith("{"):
+        return [source_code]
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return [source_code]
+
+    files = data.get("sources", data) if isinstance(data, dict) else {}
+    return [
+        f["content"] for f in files.values()
+        if isinstance(f, dict) and isinstance(f.get("content"), str)
+    ]
+
+
+@lru_cache(maxsize=65536)
+def _classify(identifier: str) -> Tuple[str, ...]:
+    words = [w.lower() for w in _WORD_RE.findall(identifier)]
+    if not words:
+        return ()
+    compact = "".join(words)
+    flags = []
+
+    if words[0] == "mint":
+        flags.append("mint_function_detected")
+    if "blacklist" in compact or "blocklist" in compact:
+        flags.append("blacklist_terms_detected")
+    if words[0] == "set" and any(w.startswith("fee") for w in words[1:]):
+        flags.append("fee_modification_detected")
+    if words[0] == "set" and any(w.startswith("tax") for w in words[1:]):
+        flags.append("tax_modification_detected")
+    if _PAUSE_WORDS.intersection(words):
+        flags.append("pause_function_detected")
+    if "tradingenabled" in compact or "enabletrading" in compact:
+        flags.append("trading_toggle_detected")
+    if compact == "onlyowner":
+        flags.append("owner_restricted_functions")
+
+    return tuple(flags)
@@ -0,0 +1,431 @@
+"""Test the analysis pipeline against mocked upstream APIs."""
+import asyncio
+import time
+import httpx
+
+from analyzer import (
+    _guarded_fetch, analyze_token, analyze_token_stream, analyze_tokens, detect_chains, normalize_address,
+)
+from circuit import get_breaker
+from config import settings
+from metrics import SCORE_CATEGORIES
+
+TOKEN_A = "0x" + "a" * 40
+TOKEN_B = "0x" + "b" * 40
+
+
+def _dex_pair(address, liquidity):
+    return {
+        "dexId": "uniswap",
+        "pairAddress": "0x" + "f" * 40,
+        "baseToken": {"address": address, "name": "Tok", "symbol": "TOK"},
+        "quoteToken": {"address": "0x" + "e" * 40, "symbol": "WETH"},
+        "liquidity": {"usd": liquidity},
+    }
+
+
+def _mock_upstreams(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        if request.url.host == "api.dexscreener.com":
+            return httpx.Response(200, json=[_dex_pair(TOKEN_A, 1_000_000), _dex_pair(TOKEN_B, 1_000)])
+        if request.url.host == "api.gopluslabs.io":
+            addresses = request.url.params["contract_addresses"].split(",")
+            return httpx.Response(200, json={
+                "code": 1,
+                "result": {a: {"is_honeypot": "1" if a == TOKEN_B else "0"} for a in addresses},
+            })
+        return httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_batch_makes_one_call_per_source_per_chain():
+    settings.etherscan_api_key = ""
+    calls = []
+
+    async def run():
+        async with _mock_upstreams(calls) as client:
+            return await analyze_tokens(
+                [("ethereum", TOKEN_A), ("ethereum", TOKEN_B.upper().replace("0X", "0x")), ("ethereum", "0x123")],
+                http_client=client,
+            )
+
+    results = asyncio.run(run())
+
+    assert calls.count("api.dexscreener.com") == 1
+    assert calls.count("api.gopluslabs.io") == 1
+    assert results[0].market.liquidity_usd == 1_000_000
+    assert results[1].trade_risk.honeypot
+    assert isinstance(results[2], ValueError)
+
+
+def test_fresh_sources_are_served_from_source_cache():
+    settings.etherscan_api_key = ""
+    calls = []
+
+    async def run():
+        async with _mock_upstreams(calls) as client:
+            await analyze_token("base", TOKEN_A, http_client=client)
+            return await analyze_token("base", TOKEN_A, http_client=client)
+
+    result = asyncio.run(run())
+
+    assert calls.count("api.dexscreener.com") == 1
+    assert calls.count("api.gopluslabs.io") == 1
+    assert result.market.liquidity_usd == 1_000_000
+
+
+def test_budget_exhaustion_returns_scored_partial_result():
+    settings.etherscan_api_key = ""
+    token = "0x" + "c" * 40
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.gopluslabs.io":
+            await asyncio.sleep(1)
+        return httpx.Response(200, json=[_dex_pair(token, 50_000)])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await analyze_token(
+                "polygon", token, http_client=client, deadline=time.monotonic() + 0.1,
+            )
+
+    result = asyncio.run(run())
+
+    assert result.partial
+    assert result.skipped_sources == {"goplus": "timeout"}
+    assert result.market.liquidity_usd == 50_000
+    assert 0 <= result.score.risk_score <= 100
+
+
+def test_only_upstream_timeouts_count_against_the_breaker():
+    settings.etherscan_api_key = ""
+    breaker = get_breaker("goplus")
+    breaker.record_success()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.gopluslabs.io":
+            await asyncio.sleep(0.3)
+        return httpx.Response(200, json=[])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            # The caller's deadline runs out first: the upstream isn't to blame.
+            clamped = await analyze_token(
+                "arbitrum", "0x" + "5" * 40, http_client=client, deadline=time.monotonic() + 0.05,
+            )
+            after_deadline = breaker.failures
+            # The source's own timeout runs out first: that is an upstream failure.
+            slow = await analyze_token("arbitrum", "0x" + "6" * 40, http_client=client)
+            return clamped, after_deadline, slow
+
+    settings.goplus_timeout_seconds = 0.1
+    try:
+        clamped, after_deadline, slow = asyncio.run(run())
+        failures = breaker.failures
+    finally:
+        settings.goplus_timeout_seconds = 8.0
+        breaker.record_success()
+
+    assert clamped.skipped_sources == {"goplus": "timeout"}
+    assert after_deadline == 0
+    assert slow.skipped_sources == {"goplus": "timeout"}
+    assert failures == 1
+
+
+def test_timeout_raised_by_the_fetch_itself_is_an_upstream_error():
+    breaker = get_breaker("goplus")
+    breaker.record_success()
+
+    async def fetch():
+        raise asyncio.TimeoutError()
+
+    try:
+        for deadline in (None, time.monotonic() + 5):
+            skipped = {}
+            assert asyncio.run(_guarded_fetch("goplus", fetch, deadline, skipped)) is None
+            assert skipped == {"goplus": "error"}
+        failures = breaker.failures
+    finally:
+        breaker.record_success()
+
+    assert failures == 2
+
+
+def test_batch_chunks_time_out_independently():
+    settings.etherscan_api_key = ""
+    tokens = ["0x" + "e" * 30 + f"{i:010x}" for i in range(25)]
+    slow = tokens[-1]
+    breaker = get_breaker("goplus")
+    breaker.record_success()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host != "api.gopluslabs.io":
+            return httpx.Response(200, json=[])
+        addresses = request.url.params["contract_addresses"].split(",")
+        if slow in addresses:
+            await asyncio.sleep(0.3)
+        return httpx.Response(200, json={"code": 1, "result": {a: {"is_honeypot": "0"} for a in addresses}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await analyze_tokens([("base", t) for t in tokens], http_client=client)
+
+    settings.goplus_timeout_seconds = 0.1
+    try:
+        results = asyncio.run(run())
+        failures = breaker.failures
+    finally:
+        settings.goplus_timeout_seconds = 8.0
+        breaker.record_success()
+
+    # The first chunk of 20 answered in time; only the slow chunk's tokens are partial.
+    assert all(r.trade_risk is not None and not r.partial for r in results[:20])
+    assert all(r.skipped_sources == {"goplus": "timeout"} for r in results[20:])
+    assert failures == 1
+
+
+def test_tokens_without_data_are_negatively_cached():
+    settings.etherscan_api_key = ""
+    token = "0x" + "d" * 40
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        if request.url.host == "api.dexscreener.com":
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json={"code": 1, "result": {}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await analyze_token("arbitrum", token, http_client=client)
+            return await analyze_token("arbitrum", token, http_client=client)
+
+    result = asyncio.run(run())
+
+    # The second analysis is answered from the negative cache.
+    assert sorted(calls) == ["api.dexscreener.com", "api.gopluslabs.io"]
+    assert result.market is None and not result.partial
+
+
+def test_upstream_errors_are_remembered_briefly():
+    settings.etherscan_api_key = ""
+    token = "0x" + "9" * 40
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.host)
+        if request.url.host == "api.dexscreener.com":
+            return httpx.Response(400)
+        return httpx.Response(200, json={"code": 1, "result": {token: {"is_honeypot": "0"}}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await analyze_token("bsc", token, http_client=client)
+            second = await analyze_token("bsc", token, http_client=client)
+            return first, second
+
+    first, second = asyncio.run(run())
+
+    assert calls.count("api.dexscreener.com") == 1
+    assert first.skipped_sources == {"dexscreener": "error"}
+    assert second.partial and second.skipped_sources == {"dexscreener": "upstream_error"}
+
+
+def test_goplus_error_codes_are_upstream_errors():
+    settings.etherscan_api_key = ""
+    token = "0x" + "8" * 40
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.dexscreener.com":
+            return httpx.Response(200, json=[_dex_pair(token, 10_000)])
+        return httpx.Response(200, json={"code": 4029, "message": "too many requests", "result": {}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await analyze_token("polygon", token, http_client=client)
+            second = await analyze_token("polygon", token, http_client=client)
+            return first, second
+
+    first, second = asyncio.run(run())
+
+    # Remembered as a short-lived upstream error, not as "GoPlus has no data".
+    assert first.partial and first.skipped_sources == {"goplus": "error"}
+    assert second.partial and second.skipped_sources == {"goplus": "upstream_error"}
+
+
+def test_non_hex_addresses_are_rejected():
+    try:
+        normalize_address("0x" + "g" * 40)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("non-hex address accepted")
+    assert normalize_address(" 0x" + "AB" * 20) == "0x" + "ab" * 20
+
+
+def test_chain_detection_uses_one_cross_chain_lookup():
+    settings.etherscan_api_key = ""
+    token = "0x" + "7" * 40
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.startswith("/latest/dex/tokens/"):
+            pairs = [
+                {**_dex_pair(token, 5_000), "chainId": "base"},
+                {**_dex_pair(token, 900_000), "chainId": "bsc"},
+                {**_dex_pair(token, 1_000_000), "chainId": "solana"},
+            ]
+            return httpx.Response(200, json={"pairs": pairs})
+        if request.url.host == "api.gopluslabs.io":
+            return httpx.Response(200, json={"code": 1, "result": {token: {"is_honeypot": "0"}}})
+        return httpx.Response(404)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            chains = await detect_chains(token, http_client=client)
+            again = await detect_chains(token, http_client=client)
+            result = await analyze_token(chains[0], token, http_client=client)
+            return chains, again, result
+
+    chains, again, result = asyncio.run(run())
+
+    assert chains == again == ["bsc", "base"]
+    # Detection ran once, and its pair data served the analysis's DexScreener lookup.
+    assert [p for p in calls if "dex" in p] == [f"/latest/dex/tokens/{token}"]
+    assert result.market.liquidity_usd == 900_000
+
+
+def test_truncated_cross_chain_lookup_does_not_seed_the_source_cache():
+    settings.etherscan_api_key = ""
+    token = "0x" + "8" * 40
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.startswith("/latest/dex/tokens/"):
+            # A full page of pairs: the token may have more on base than the one shown.
+            pairs = [{**_dex_pair(token, 1_000), "chainId": "solana"}] * 29
+            pairs.append({**_dex_pair(token, 5_000), "chainId": "base"})
+            return httpx.Response(200, json={"pairs": pairs})
+        if request.url.host == "api.dexscreener.com":
+            return httpx.Response(200, json=[_dex_pair(token, 5_000), _dex_pair(token, 750_000)])
+        return httpx.Response(200, json={"code": 1, "result": {token: {"is_honeypot": "0"}}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            chains = await detect_chains(token, http_client=client)
+            return chains, await analyze_token(chains[0], token, http_client=client)
+
+    chains, result = asyncio.run(run())
+
+    assert chains == ["base"]
+    assert f"/tokens/v1/base/{token}" in calls
+    assert result.market.liquidity_usd == 750_000
+
+
+def test_proxy_implementation_is_scanned_once_and_merged():
+    settings.etherscan_api_key = "test"
+    proxies = ["0x" + "1" * 40, "0x" + "2" * 40]
+    implementation = "0x" + "3" * 40
+    implementation_calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host != "api.etherscan.io":
+            return httpx.Response(200, json=[] if request.url.host == "api.dexscreener.com" else {"code": 1, "result": {}})
+        address = request.url.params["address"]
+        if address == implementation:
+            implementation_calls.append(address)
+            source = "contract Impl { function mint(address to) external onlyOwner {} }"
+            result = {"SourceCode": source, "ABI": "[]", "ContractName": "Impl", "Proxy": "0"}
+        else:
+            source = "contract Proxy { fallback() external { } }"
+            result = {"SourceCode": source, "ABI": "[]", "ContractName": "Proxy",
+                      "Proxy": "1", "Implementation": implementation.upper().replace("0X", "0x")}
+        return httpx.Response(200, json={"status": "1", "message": "OK", "result": [result]})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await analyze_tokens([("polygon", p) for p in proxies], http_client=client)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        settings.etherscan_api_key = ""
+
+    assert implementation_calls == [implementation]
+    for result in results:
+        assert "mint_function_detected" in result.admin.flags
+
+
+def test_failed_implementation_scan_is_reported_to_every_caller():
+    settings.etherscan_api_key = "test"
+    proxies = ["0x" + "4" * 40, "0x" + "5" * 40]
+    implementation = "0x" + "6" * 40
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host != "api.etherscan.io":
+            return httpx.Response(200, json=[] if request.url.host == "api.dexscreener.com" else {"code": 1, "result": {}})
+        if request.url.params["address"] == implementation:
+            return httpx.Response(400)
+        result = {"SourceCode": "contract Proxy {}", "ABI": "[]", "ContractName": "Proxy",
+                  "Proxy": "1", "Implementation": implementation}
+        return httpx.Response(200, json={"status": "1", "message": "OK", "result": [result]})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await analyze_tokens([("bsc", p) for p in proxies], http_client=client)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        settings.etherscan_api_key = ""
+
+    for result in results:
+        assert result.partial
+        assert result.skipped_sources == {"etherscan_implementation": "error"}
+
+
+def test_provisional_stream_scores_do_not_replace_the_stored_breakdown():
+    settings.etherscan_api_key = ""
+    token = "0x" + "c" * 40
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "api.dexscreener.com":
+            return httpx.Response(200, json=[_dex_pair(token, 50_000)])
+        # Keep GoPlus pending so the stream yields a provisional score first.
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"code": 1, "result": {token: {"is_honeypot": "1"}}})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [event async for event in analyze_token_stream("ethereum", token, http_client=client)]
+
+    reused = SCORE_CATEGORIES._values.get(("reused",), 0.0)
+    events = asyncio.run(run())
+
+    assert "provisional_score" in [name for name, _ in events]
+    assert events[-1][1].trade_risk.honeypot
+    # Only the final result is keyed, so nothing was reused from the provisional breakdown.
+    assert SCORE_CATEGORIES._values.get(("reused",), 0.0) == reused
+
+
+if __name__ == "__main__":
+    test_batch_makes_one_call_per_source_per_chain()
+    test_fresh_sources_are_served_from_source_cache()
+    test_budget_exhaustion_returns_scored_partial_result()
+    test_only_upstream_timeouts_count_against_the_breaker()
+    test_timeout_raised_by_the_fetch_itself_is_an_upstream_error()
+    test_batch_chunks_time_out_independently()
+    test_tokens_without_data_are_negatively_cached()
+    test_upstream_errors_are_remembered_briefly()
+    test_goplus_error_codes_are_upstream_errors()
+    test_non_hex_addresses_are_rejected()
+    test_chain_detection_uses_one_cross_chain_lookup()
+    test_truncated_cross_chain_lookup_does_not_seed_the_source_cache()
+    test_proxy_implementation_is_scanned_once_and_merged()
+    test_failed_implementation_scan_is_reported_to_every_caller()
+    test_provisional_stream_scores_do_not_replace_the_stored_breakdown()
+    print("All tests passed!")
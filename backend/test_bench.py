@@ -0,0 +1,26 @@
+"""Smoke-test the benchmark harness against the upstream stand-ins."""
+import asyncio
+
+from bench.run import compare, run_benchmark
+
+
+def test_benchmark_reports_cold_and_warm_phases():
+    result = asyncio.run(run_benchmark(
+        tokens=6, concurrency=3, warm_rounds=2, latency_ms=1, jitter_ms=0, source_kb=64,
+    ))
+
+    cold, warm = result["phases"]["cold"], result["phases"]["warm"]
+    assert cold["requests"] == 6 and cold["status"] == {"200": 6}
+    assert cold["x_cache"] == {"MISS": 6}
+    assert warm["requests"] == 12 and warm["x_cache"] == {"HIT": 12}
+    assert cold["p50_ms"] <= cold["p95_ms"] <= cold["p99_ms"]
+
+    slower = {"phases": {"warm": {**warm, "p95_ms": warm["p95_ms"] * 2}}}
+    assert compare(slower, result, tolerance=0.2) == [
+        f"warm p95 {warm['p95_ms']}ms -> {warm['p95_ms'] * 2}ms",
+    ]
+
+
+if __name__ == "__main__":
+    test_benchmark_reports_cold_and_warm_phases()
+    print("All tests passed!")
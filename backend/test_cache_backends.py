@@ -0,0 +1,118 @@
+"""Test the shared SQLite cache backend and the in-process L1 in front of it."""
+import sqlite3
+import time
+
+from cachetools import TLRUCache
+
+import cache
+import cache_backends
+from cache_backends import SQLiteBackend
+from config import settings
+from models import AdminInfo, AnalyzeResponse, LinksInfo, ScoreInfo, TokenInfo
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a = SQLiteBackend(path)
+    worker_b = SQLiteBackend(path)
+
+    value = AnalyzeResponse(
+        token=TokenInfo(address="0x" + "a" * 40),
+        admin=AdminInfo(),
+        score=ScoreInfo(risk_score=10, label="LOW"),
+        links=LinksInfo(),
+    )
+    now = time.time()
+    worker_a.set("response", "ethereum:0xa", value, now, now + 60)
+
+    stored, stored_at, expires_at = worker_b.get("response", "ethereum:0xa")
+    assert stored == value
+    assert stored_at == now
+    assert expires_at == now + 60
+
+
+def test_sqlite_backend_ignores_expired_rows(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    now = time.time()
+    backend.set("goplus", "ethereum:0xa", {"is_honeypot": "0"}, now - 120, now - 60)
+
+    assert backend.get("goplus", "ethereum:0xa") is None
+
+
+def test_sqlite_backend_evicts_rows_closest_to_expiry(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_rows=10)
+    now = time.time()
+    for i in range(cache_backends._PURGE_EVERY):
+        backend.set("goplus", f"ethereum:0x{i}", {}, now, now + 60 + i)
+
+    assert backend.evicted == cache_backends._PURGE_EVERY - 10
+    assert backend.get("goplus", "ethereum:0x0") is None
+    assert backend.get("goplus", f"ethereum:0x{cache_backends._PURGE_EVERY - 1}") is not None
+
+
+def test_sqlite_backend_does_not_wait_on_a_locked_database(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    backend = SQLiteBackend(path, busy_timeout_ms=10)
+    now = time.time()
+    backend.set("goplus", "ethereum:0xa", {}, now, now + 60)
+
+    other_worker = sqlite3.connect(path, isolation_level=None)
+    other_worker.execute("BEGIN EXCLUSIVE")
+    try:
+        started = time.monotonic()
+        backend.set("goplus", "ethereum:0xb", {}, now, now + 60)
+        assert time.monotonic() - started < 1
+        # WAL readers aren't blocked by the writer.
+        assert backend.get("goplus", "ethereum:0xa") is not None
+    finally:
+        other_worker.execute("ROLLBACK")
+        other_worker.close()
+
+    # The write was skipped, not queued.
+    assert backend.busy == 1
+    assert backend.get("goplus", "ethereum:0xb") is None
+
+
+def test_l1_expiry_counts_from_the_original_stored_at(tmp_path):
+    original_backend = cache._backend
+    cache._backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    value = ScoreInfo(risk_score=10, label="LOW")
+    now = time.time()
+    try:
+        # A rescore of a report that is about to reach the hard max age.
+        cache.set_cached("ethereum:0xold", value, stored_at=now - cache._response_max_age + 0.5)
+        # A report another worker stored long ago, loaded from the backend now.
+        cache._backend.set("response", "ethereum:0xshared", (value, b"{}", '"x"'),
+                           now - cache._response_max_age + 0.5, now + 0.5)
+        assert cache.peek_cached_entry("ethereum:0xshared") is not None
+
+        cache._cache.expire(now + 1)
+        assert "ethereum:0xold" not in cache._cache
+        assert "ethereum:0xshared" not in cache._cache
+    finally:
+        cache._backend = original_backend
+        cache._cache.clear()
+
+
+def test_stale_l1_entry_picks_up_another_workers_refresh(tmp_path):
+    original_backend, original_l1 = cache._backend, cache._cache
+    cache._backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    worker_a = TLRUCache(maxsize=500, ttu=cache._response_ttu, timer=time.time)
+    worker_b = TLRUCache(maxsize=500, ttu=cache._response_ttu, timer=time.time)
+    stale_at = time.time() - settings.cache_ttl_seconds - 1
+    try:
+        cache._cache = worker_a
+        cache.set_cached("ethereum:0xrefresh", ScoreInfo(risk_score=10, label="LOW"), stored_at=stale_at)
+        assert cache.peek_cached_entry("ethereum:0xrefresh").is_stale
+
+        # Worker B refreshes the report and writes it to the shared backend.
+        cache._cache = worker_b
+        cache.set_cached("ethereum:0xrefresh", ScoreInfo(risk_score=80, label="HIGH"))
+
+        # Worker A's L1 copy is stale, so it checks the backend and serves B's refresh.
+        cache._cache = worker_a
+        entry = cache.get_cached_entry("ethereum:0xrefresh")
+        assert not entry.is_stale and entry.value.risk_score == 80
+        assert worker_a["ethereum:0xrefresh"] is entry
+    finally:
+        cache._backend, cache._cache = original_backend, original_l1
@@ -0,0 +1,66 @@
+"""Test per-upstream clients and pool-wait measurement."""
+import asyncio
+
+import httpx
+
+from config import settings
+from services import clients
+from services.clients import UpstreamClients, client_for
+
+
+async def _serve_slowly(reader, writer):
+    await reader.readuntil(b"\r\n\r\n")
+    await asyncio.sleep(0.05)
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+    await writer.drain()
+    writer.close()
+
+
+def test_each_upstream_has_its_own_client():
+    async def run():
+        upstreams = UpstreamClients()
+        try:
+            assert client_for(upstreams, "etherscan") is not client_for(upstreams, "dexscreener")
+            shared = httpx.AsyncClient()
+            assert client_for(shared, "goplus") is shared
+            await shared.aclose()
+        finally:
+            await upstreams.aclose()
+
+    asyncio.run(run())
+
+
+def test_pool_wait_is_measured_when_pool_is_full():
+    settings.goplus_max_connections = 1
+
+    async def run():
+        server = await asyncio.start_server(_serve_slowly, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        upstreams = UpstreamClients()
+        try:
+            client = upstreams.get("goplus")
+            responses = await asyncio.gather(
+                *(client.get(f"http://127.0.0.1:{port}/") for _ in range(2))
+            )
+        finally:
+            await upstreams.aclose()
+            server.close()
+            await server.wait_closed()
+        return responses
+
+    try:
+        responses = asyncio.run(run())
+    finally:
+        settings.goplus_max_connections = 10
+
+    assert [r.text for r in responses] == ["ok", "ok"]
+    stats = clients.pool_stats()["goplus"]
+    assert stats["count"] == 2
+    # The second request waited for the first to release the only connection.
+    assert stats["max_seconds"] >= 0.04
+
+
+if __name__ == "__main__":
+    test_each_upstream_has_its_own_client()
+    test_pool_wait_is_measured_when_pool_is_full()
+    print("All tests passed!")
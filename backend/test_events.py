@@ -0,0 +1,53 @@
+"""Test score change events."""
+import asyncio
+
+from config import settings
+from events import ChangeFeed, score_change
+from models import AdminInfo, AnalyzeResponse, LinksInfo, ScoreInfo, TokenInfo
+
+KEY = "ethereum:0x" + "a" * 40
+
+
+def _result(score, label):
+    return AnalyzeResponse(
+        token=TokenInfo(address="0x" + "a" * 40),
+        admin=AdminInfo(),
+        score=ScoreInfo(risk_score=score, label=label, rules_version="1"),
+        links=LinksInfo(),
+    )
+
+
+def test_only_score_or_label_changes_produce_events():
+    assert score_change(KEY, None, _result(40, "MEDIUM")) is None
+    assert score_change(KEY, _result(40, "MEDIUM"), _result(40, "MEDIUM")) is None
+
+    event = score_change(KEY, _result(40, "MEDIUM"), _result(70, "HIGH"))
+    assert event["chain"] == "ethereum" and event["token_address"] == "0x" + "a" * 40
+    assert event["previous"] == {"risk_score": 40, "label": "MEDIUM"}
+    assert event["current"] == {"risk_score": 70, "label": "HIGH"}
+
+
+def test_slow_subscribers_lose_their_oldest_events():
+    settings.events_queue_size = 2
+
+    async def run():
+        feed = ChangeFeed()
+        with feed.subscribe() as queue:
+            for i in range(3):
+                feed.publish({"n": i})
+            received = [queue.get_nowait()["n"] for _ in range(queue.qsize())]
+        return feed, received
+
+    try:
+        feed, received = asyncio.run(run())
+    finally:
+        settings.events_queue_size = 100
+
+    assert received == [1, 2]
+    assert feed.dropped == 1 and len(feed) == 0
+
+
+if __name__ == "__main__":
+    test_only_score_or_label_changes_produce_events()
+    test_slow_subscribers_lose_their_oldest_events()
+    print("All tests passed!")
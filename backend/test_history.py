@@ -0,0 +1,111 @@
+"""Test the score snapshot history store."""
+import tempfile
+
+from config import settings
+from history import HistoryStore, downsample, flag_mask, flag_names
+from models import (
+    AdminInfo, AnalyzeResponse, HoldersInfo, LinksInfo, MarketInfo, ScoreInfo, TokenInfo, TradeRiskInfo,
+)
+
+KEY = "ethereum:0x" + "a" * 40
+OTHER = "base:0x" + "b" * 40
+
+
+def _result(score, liquidity=1000.0, flags=(), honeypot=False):
+    return AnalyzeResponse(
+        token=TokenInfo(address="0x" + "a" * 40),
+        market=MarketInfo(liquidity_usd=liquidity),
+        holders=HoldersInfo(top5_pct=40.0),
+        admin=AdminInfo(has_owner=False, flags=list(flags)),
+        trade_risk=TradeRiskInfo(honeypot=honeypot, buy_tax_pct=1.0, sell_tax_pct=None),
+        score=ScoreInfo(risk_score=score, label="HIGH" if score >= 67 else "LOW"),
+        links=LinksInfo(),
+    )
+
+
+def test_flags_round_trip_through_the_bitmask():
+    result = _result(10, flags=["proxy_contract_detected", "something_new"], honeypot=True)
+    assert flag_names(flag_mask(result)) == ["proxy_contract_detected", "honeypot", "other"]
+
+
+def test_range_queries_survive_a_reopen():
+    settings.history_min_interval_seconds = 0
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            store = HistoryStore(root)
+            for i in range(100):
+                store.append(KEY, _result(i % 50), ts=1000.0 + i)
+                store.append(OTHER, _result(99), ts=1000.0 + i)
+            store.close()
+
+            reopened = HistoryStore(root)
+            assert len(reopened) == 200
+            records = reopened.query(KEY, start=1010, end=1019)
+            assert list(records["ts"]) == [1000.0 + i for i in range(10, 20)]
+            assert list(records["score"]) == list(range(10, 20))
+            assert len(reopened.query("ethereum:0x" + "c" * 40)) == 0
+
+            # Appends after reopening are indexed on the next query.
+            reopened.append(KEY, _result(77), ts=2000.0)
+            assert reopened.query(KEY, start=1500)["score"].tolist() == [77]
+            reopened.close()
+    finally:
+        settings.history_min_interval_seconds = 60.0
+
+
+def test_snapshots_closer_than_the_interval_are_dropped():
+    with tempfile.TemporaryDirectory() as root:
+        store = HistoryStore(root)
+        assert store.append(KEY, _result(10), ts=1000.0)
+        assert not store.append(KEY, _result(20), ts=1000.0 + settings.history_min_interval_seconds / 2)
+        assert store.append(KEY, _result(30), ts=1000.0 + settings.history_min_interval_seconds)
+        assert store.query(KEY)["score"].tolist() == [10, 30]
+        store.close()
+
+
+def test_stores_sharing_a_directory_agree_on_key_ids():
+    with tempfile.TemporaryDirectory() as root:
+        # Two worker processes' stores on the same directory.
+        worker_a, worker_b = HistoryStore(root), HistoryStore(root)
+        assert worker_a.append(KEY, _result(10), ts=1000.0)
+        assert worker_b.append(OTHER, _result(20), ts=1000.0)
+        assert worker_a.append(OTHER, _result(30), ts=2000.0)
+
+        for store in (worker_a, worker_b):
+            assert store.query(KEY)["score"].tolist() == [10]
+            assert store.query(OTHER)["score"].tolist() == [20, 30]
+
+        # The minimum interval holds across stores, not just within one.
+        assert not worker_b.append(KEY, _result(40), ts=1000.0 + settings.history_min_interval_seconds / 2)
+        worker_a.close()
+        worker_b.close()
+
+
+def test_downsampling_aggregates_each_bucket():
+    settings.history_min_interval_seconds = 0
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            store = HistoryStore(root)
+            for i in range(10):
+                store.append(KEY, _result(90 if i == 2 else 10, liquidity=100.0 * (i + 1),
+                                          honeypot=(i == 7)), ts=float(i))
+            points = downsample(store.query(KEY), 2)
+            store.close()
+    finally:
+        settings.history_min_interval_seconds = 60.0
+
+    assert [p["samples"] for p in points] == [5, 5]
+    first, second = points
+    assert first["risk_score"] == 90 and first["label"] == "HIGH"
+    assert first["liquidity_usd"] == 300.0 and first["ts"] == 4.0
+    assert first["sell_tax_pct"] is None and first["buy_tax_pct"] == 1.0
+    assert second["risk_score"] == 10 and second["flags"] == ["honeypot"]
+
+
+if __name__ == "__main__":
+    test_flags_round_trip_through_the_bitmask()
+    test_range_queries_survive_a_reopen()
+    test_snapshots_closer_than_the_interval_are_dropped()
+    test_stores_sharing_a_directory_agree_on_key_ids()
+    test_downsampling_aggregates_each_bucket()
+    print("All tests passed!")
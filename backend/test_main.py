@@ -0,0 +1,321 @@
+"""Test the API endpoints in-process against the benchmark's upstream stand-ins."""
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import httpx
+
+import analyzer
+import cache
+import circuit
+import main
+import prewarm
+import scoring_rules
+from bench.upstreams import StandInConfig, stand_in_router
+from config import get_chain_config, settings
+from metrics import SCORE_CATEGORIES
+from ratelimit import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from services.clients import UpstreamClients
+
+_FAST = StandInConfig(latency_ms=0, jitter_ms=0, source_kb=1)
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """Record the host of every upstream request before passing it on."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.hosts = []
+
+    async def handle_async_request(self, request):
+        self.hosts.append(request.url.host)
+        return await self.transport.handle_async_request(request)
+
+
+def _call(scenario, transport=None):
+    """Run scenario(client) against the app, with upstreams served by the stand-ins (or transport)."""
+    async def run():
+        main.app.state.http_client = UpstreamClients(transport=transport or stand_in_router(_FAST, _FAST, _FAST))
+        try:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=main.app), base_url="http://test",
+            ) as client:
+                return await scenario(client)
+        finally:
+            await main.app.state.http_client.aclose()
+
+    settings.etherscan_api_key = ""
+    # Test tokens stay out of the real score history.
+    settings.history_enabled = False
+    try:
+        return asyncio.run(run())
+    finally:
+        settings.history_enabled = True
+
+
+def test_report_etag_revalidation():
+    url = "/api/report/ethereum/0x" + "1a" * 20
+
+    async def scenario(client):
+        first = await client.get(url)
+        etag = first.headers["ETag"]
+        revalidations = {
+            value: await client.get(url, headers={"If-None-Match": value})
+            for value in (etag, f"W/{etag}", f'"other", {etag}', "*", '"other"')
+        }
+        return first, revalidations
+
+    first, revalidations = _call(scenario)
+
+    assert first.status_code == 200 and first.headers["X-Cache"] == "MISS"
+    etag = first.headers["ETag"]
+    for value in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = revalidations[value]
+        assert response.status_code == 304, value
+        assert response.content == b""
+        assert response.headers["ETag"] == etag and response.headers["X-Cache"] == "HIT"
+
+    mismatch = revalidations['"other"']
+    assert mismatch.status_code == 200
+    assert mismatch.content == first.content
+
+
+def _make_stale(cache_key: str) -> None:
+    cache.peek_cached_entry(cache_key).stored_at -= settings.cache_ttl_seconds + 5
+    # A refresh has to reach the upstreams instead of the per-source caches.
+    for source_cache in cache._source_caches.values():
+        source_cache.pop(cache_key, None)
+
+
+def test_stale_report_is_served_while_one_refresh_runs():
+    address = "0x" + "2b" * 20
+    url = f"/api/report/base/{address}"
+    slow = StandInConfig(latency_ms=50, jitter_ms=0, source_kb=1)
+
+    async def scenario(client):
+        await client.get(url)
+        _make_stale(f"base:{address}")
+        executions = main.analysis_flight.executions
+        stale = [await client.get(url), await client.get(url)]
+        await asyncio.gather(*main._background_tasks)
+        refreshes = main.analysis_flight.executions - executions
+        return stale, refreshes, await client.get(url)
+
+    stale, refreshes, refreshed = _call(scenario, stand_in_router(slow, slow, slow))
+
+    for response in stale:
+        assert response.status_code == 200 and response.headers["X-Cache"] == "STALE"
+        assert int(response.headers["Age"]) >= settings.cache_ttl_seconds
+    assert refreshes == 1
+    assert refreshed.headers["X-Cache"] == "HIT" and int(refreshed.headers["Age"]) < 5
+
+
+def test_failed_refresh_keeps_the_stale_report():
+    address = "0x" + "3c" * 20
+    url = f"/api/report/arbitrum/{address}"
+
+    async def scenario(client):
+        return await client.get(url)
+
+    first = _call(scenario)
+    _make_stale(f"arbitrum:{address}")
+
+    async def stale_scenario(client):
+        stale = await client.get(url)
+        await asyncio.gather(*main._background_tasks)
+        return stale, await client.get(url)
+
+    settings.upstream_max_retries = 0
+    try:
+        stale, after = _call(stale_scenario, httpx.MockTransport(lambda request: httpx.Response(500)))
+    finally:
+        settings.upstream_max_retries = 2
+        circuit._breakers.clear()
+
+    assert stale.headers["X-Cache"] == "STALE"
+    assert after.status_code == 200 and after.headers["X-Cache"] == "STALE"
+    assert after.headers["ETag"] == first.headers["ETag"]
+
+
+def test_custom_rules_and_reloads_need_the_admin_token():
+    address = "0x" + "4d" * 20
+    table = json.loads((Path(__file__).parent / "scoring_rules.json").read_text(encoding="utf-8"))
+    table["version"] = "dry-run"
+
+    async def scenario(client):
+        await client.get(f"/api/report/polygon/{address}")
+        rescore_url = f"/api/rescore/polygon/{address}"
+        return {
+            "rescore_no_token": await client.post(rescore_url, json=table),
+            "rescore_wrong_token": await client.post(rescore_url, json=table, headers={"X-Admin-Token": "nope"}),
+            "rescore": await client.post(rescore_url, json=table, headers={"X-Admin-Token": "secret"}),
+            "rescore_active_rules": await client.post(rescore_url),
+            "reload_no_token": await client.post("/api/admin/rules/reload"),
+            "reload": await client.post("/api/admin/rules/reload", headers={"X-Admin-Token": "secret"}),
+        }
+
+    previous_version = scoring_rules.get_rules().version
+    with tempfile.TemporaryDirectory() as root:
+        reloaded = dict(table, version="reloaded")
+        rules_path = Path(root) / "rules.json"
+        rules_path.write_text(json.dumps(reloaded), encoding="utf-8")
+        settings.admin_token, settings.scoring_rules_path = "secret", str(rules_path)
+        try:
+            responses = _call(scenario)
+        finally:
+            settings.admin_token, settings.scoring_rules_path = None, "scoring_rules.json"
+            scoring_rules.reload_rules()
+
+    for name in ("rescore_no_token", "rescore_wrong_token", "reload_no_token"):
+        assert responses[name].status_code == 403, name
+    assert responses["rescore"].status_code == 200
+    assert responses["rescore"].json()["score"]["rules_version"] == "dry-run"
+    assert responses["rescore_active_rules"].status_code == 200
+    assert responses["reload"].json() == {"previous_version": previous_version, "version": "reloaded"}
+    assert scoring_rules.get_rules().version == previous_version
+
+
+def test_ready_only_after_prewarm_starts_and_reaches_the_threshold():
+    seeds = [("bsc", "0x" + "5e" * 20)]
+
+    async def scenario(client):
+        before = await client.get("/api/ready")
+        await prewarm.prewarm(seeds, main._warm_token, main.warmup_state)
+        return before, await client.get("/api/ready")
+
+    state, main.warmup_state = main.warmup_state, prewarm.WarmupState()
+    try:
+        before, after = _call(scenario)
+    finally:
+        main.warmup_state = state
+
+    assert before.status_code == 503 and before.json()["status"] == "warming"
+    assert before.json()["warmup"]["progress"] == 0
+    assert after.status_code == 200
+    assert after.json()["warmup"]["warmed"] == 1
+
+
+def test_batch_analyzes_each_distinct_miss_once_and_caches_full_results():
+    address = "0x" + "6f" * 20
+    upstreams = _CountingTransport(stand_in_router(_FAST, _FAST, _FAST))
+    tokens = [
+        {"chain": "polygon", "token_address": address},
+        {"chain": "polygon", "token_address": address.upper().replace("0X", "0x")},
+        {"chain": "solana", "token_address": address},
+    ]
+
+    async def scenario(client):
+        return await client.post("/api/analyze/batch", json={"tokens": tokens})
+
+    scored = sum(SCORE_CATEGORIES._values.values())
+    response = _call(scenario, upstreams)
+    scored = sum(SCORE_CATEGORIES._values.values()) - scored
+
+    first, duplicate, invalid = response.json()["results"]
+    assert first["result"] == duplicate["result"] and not first["result"]["partial"]
+    assert invalid["result"] is None and invalid["error"]
+    assert upstreams.hosts.count("api.dexscreener.com") == 1
+    assert upstreams.hosts.count("api.gopluslabs.io") == 1
+    assert scored == len(analyzer._breakdowns[analyzer._score_key(get_chain_config("polygon"), address)].parts)
+    assert cache.peek_cached_entry(f"polygon:{address}").value.model_dump(mode="json") == first["result"]
+
+
+def test_batch_joins_an_analysis_already_in_flight():
+    address = "0x" + "7a" * 20
+    slow = StandInConfig(latency_ms=50, jitter_ms=0, source_kb=1)
+    upstreams = _CountingTransport(stand_in_router(slow, slow, slow))
+
+    async def scenario(client):
+        executions = main.analysis_flight.executions
+        single = asyncio.ensure_future(client.get(f"/api/report/ethereum/{address}"))
+        while not main.analysis_flight.in_flight(f"ethereum:{address}"):
+            await asyncio.sleep(0.001)
+        batch = await client.post(
+            "/api/analyze/batch", json={"tokens": [{"chain": "ethereum", "token_address": address}]},
+        )
+        await single
+        return batch, main.analysis_flight.executions - executions
+
+    batch, executions = _call(scenario, upstreams)
+
+    assert batch.json()["results"][0]["result"]["token"]["address"] == address
+    assert executions == 1
+    assert upstreams.hosts.count("api.dexscreener.com") == 1
+
+
+def test_batch_does_not_cache_partial_results():
+    address = "0x" + "8b" * 20
+
+    async def scenario(client):
+        return await client.post(
+            "/api/analyze/batch", json={"tokens": [{"chain": "bsc", "token_address": address}]},
+        )
+
+    settings.upstream_max_retries = 0
+    try:
+        response = _call(scenario, httpx.MockTransport(lambda request: httpx.Response(500)))
+    finally:
+        settings.upstream_max_retries = 2
+        circuit._breakers.clear()
+
+    result = response.json()["results"][0]["result"]
+    assert result["partial"] and result["skipped_sources"]
+    assert cache.peek_cached_entry(f"bsc:{address}") is None
+
+
+def test_interactive_miss_escalates_the_refresh_it_joins():
+    address = "0x" + "9c" * 20
+    cache_key = f"arbitrum:{address}"
+    slow = StandInConfig(latency_ms=50, jitter_ms=0, source_kb=1)
+
+    async def scenario(client):
+        refresh = asyncio.ensure_future(main._refresh_key(cache_key))
+        while cache_key not in main._refresh_groups:
+            await asyncio.sleep(0.001)
+        group = main._refresh_groups[cache_key]
+        before = group.priority
+        response = await client.get(f"/api/report/arbitrum/{address}")
+        await refresh
+        return before, group.priority, response
+
+    before, after, response = _call(scenario, stand_in_router(slow, slow, slow))
+
+    assert (before, after) == (PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE)
+    assert response.headers["X-Cache"] == "MISS"
+    assert cache_key not in main._refresh_groups
+
+
+def test_auto_analysis_without_pairs_or_without_detection():
+    def auto(address):
+        async def scenario(client):
+            return await client.post("/api/analyze/auto", json={"token_address": address})
+        return scenario
+
+    no_pairs = _call(
+        auto("0x" + "ad" * 20), httpx.MockTransport(lambda request: httpx.Response(200, json={"pairs": []})),
+    )
+    settings.upstream_max_retries = 0
+    try:
+        failed = _call(auto("0x" + "be" * 20), httpx.MockTransport(lambda request: httpx.Response(500)))
+    finally:
+        settings.upstream_max_retries = 2
+        circuit._breakers.clear()
+
+    assert no_pairs.status_code == 404
+    assert failed.status_code == 503
+    assert "dexscreener: error" in failed.json()["detail"]
+
+
+if __name__ == "__main__":
+    test_report_etag_revalidation()
+    test_stale_report_is_served_while_one_refresh_runs()
+    test_failed_refresh_keeps_the_stale_report()
+    test_custom_rules_and_reloads_need_the_admin_token()
+    test_ready_only_after_prewarm_starts_and_reaches_the_threshold()
+    test_batch_analyzes_each_distinct_miss_once_and_caches_full_results()
+    test_batch_joins_an_analysis_already_in_flight()
+    test_batch_does_not_cache_partial_results()
+    test_interactive_miss_escalates_the_refresh_it_joins()
+    test_auto_analysis_without_pairs_or_without_detection()
+    print("All tests passed!")
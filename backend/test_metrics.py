@@ -0,0 +1,47 @@
+"""Test Prometheus rendering and request-id tagged structured logs."""
+import json
+import logging
+
+import metrics
+from logs import JsonFormatter, _RequestIdFilter, request_id
+
+
+def test_histogram_and_counter_render_in_prometheus_format():
+    latency = metrics.Histogram("test_latency_seconds", "Test latency.", ["source"], buckets=(0.1, 1.0))
+    requests = metrics.Counter("test_requests_total", "Test requests.", ["source", "status"])
+    for value in (0.05, 0.5, 3.0):
+        latency.observe(value, source="goplus")
+    requests.inc(source="goplus", status=429)
+    requests.inc(source="goplus", status=429)
+
+    assert latency.samples() == [
+        'test_latency_seconds_bucket{source="goplus",le="0.1"} 1',
+        'test_latency_seconds_bucket{source="goplus",le="1"} 2',
+        'test_latency_seconds_bucket{source="goplus",le="+Inf"} 3',
+        'test_latency_seconds_sum{source="goplus"} 3.55',
+        'test_latency_seconds_count{source="goplus"} 3',
+    ]
+    assert requests.samples() == ['test_requests_total{source="goplus",status="429"} 2']
+    assert "# TYPE rugcheck_upstream_request_duration_seconds histogram" in metrics.render()
+
+
+def test_json_logs_carry_request_id_and_extra_fields():
+    record = logging.LogRecord("rugcheck.analyzer", logging.WARNING, __file__, 1, "Upstream timed out", None, None)
+    record.source = "etherscan"
+    token = request_id.set("req-123")
+    try:
+        _RequestIdFilter().filter(record)
+    finally:
+        request_id.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "warning"
+    assert entry["msg"] == "Upstream timed out"
+    assert entry["source"] == "etherscan"
+    assert entry["request_id"] == "req-123"
+
+
+if __name__ == "__main__":
+    test_histogram_and_counter_render_in_prometheus_format()
+    test_json_logs_carry_request_id_and_extra_fields()
+    print("All tests passed!")
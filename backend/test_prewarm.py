@@ -0,0 +1,70 @@
+"""Test seed file parsing and pre-warm readiness."""
+import asyncio
+
+from config import settings
+from prewarm import WarmupState, load_seed_file, prewarm
+
+USDT = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+
+
+def test_seed_file_skips_comments_headers_and_bad_rows(tmp_path):
+    seed = tmp_path / "seeds.csv"
+    seed.write_text(
+        "# warm these\n"
+        "chain,address\n"
+        f"ethereum,{USDT.upper().replace('0X', '0x')}\n"
+        "\n"
+        "solana,So11111111111111111111111111111111111111112\n"
+        "base,0x123\n"
+        f"ethereum,{USDT}\n"
+        f"Base, {USDT}\n"
+    )
+
+    assert load_seed_file(str(seed)) == [("ethereum", USDT), ("base", USDT)]
+    assert load_seed_file(str(tmp_path / "missing.csv")) == []
+
+
+def test_ready_once_threshold_of_seeds_attempted():
+    settings.prewarm_concurrency = 2
+    settings.prewarm_ready_fraction = 0.5
+    state = WarmupState()
+    seeds = [("ethereum", f"0x{i:040x}") for i in range(4)]
+    readiness = []
+
+    async def warm(chain, address):
+        readiness.append(state.ready)
+        await asyncio.sleep(0.01)
+        if address.endswith("3"):
+            raise RuntimeError("upstream down")
+
+    try:
+        asyncio.run(prewarm(seeds, warm, state))
+    finally:
+        settings.prewarm_concurrency = 4
+        settings.prewarm_ready_fraction = 0.9
+
+    # Not ready while the first seeds run; ready before the last one finishes.
+    assert readiness[:2] == [False, False]
+    assert readiness[-1] is True
+    assert (state.warmed, state.failed) == (3, 1)
+    assert state.ready
+
+
+def test_not_ready_until_prewarm_starts():
+    state = WarmupState()
+    assert not state.ready
+
+    asyncio.run(prewarm([], None, state))
+
+    assert state.ready  # nothing to warm
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_seed_file_skips_comments_headers_and_bad_rows(Path(tmp))
+    test_ready_once_threshold_of_seeds_attempted()
+    test_not_ready_until_prewarm_starts()
+    print("All tests passed!")
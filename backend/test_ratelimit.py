@@ -0,0 +1,74 @@
+"""Test the per-upstream token bucket and its priority queue."""
+import asyncio
+
+import ratelimit
+from ratelimit import (
+    PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PriorityGroup, RateLimitTimeout, TokenBucket, priority_group,
+)
+
+
+def test_interactive_waiters_are_served_before_background():
+    bucket = TokenBucket("test", rate=50.0, burst=1, max_wait=5.0)
+    order = []
+
+    async def take(priority, label):
+        await bucket.acquire(priority)
+        order.append(label)
+
+    async def run():
+        await bucket.acquire(PRIORITY_INTERACTIVE)
+        background = [asyncio.create_task(take(PRIORITY_BACKGROUND, f"bg{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(take(PRIORITY_INTERACTIVE, "interactive"))
+        await asyncio.gather(*background, interactive)
+
+    asyncio.run(run())
+    assert order[0] == "interactive"
+    assert sorted(order[1:]) == ["bg0", "bg1", "bg2"]
+
+
+def test_waiting_longer_than_max_wait_raises():
+    bucket = TokenBucket("test", rate=0.1, burst=1, max_wait=0.05)
+
+    async def run():
+        await bucket.acquire(PRIORITY_INTERACTIVE)
+        await bucket.acquire(PRIORITY_INTERACTIVE)
+
+    try:
+        asyncio.run(run())
+    except RateLimitTimeout:
+        pass
+    else:
+        raise AssertionError("expected RateLimitTimeout")
+    assert bucket.timeouts == 1
+
+
+def test_escalated_group_waiters_move_ahead_of_background():
+    bucket = TokenBucket("test", rate=50.0, burst=1, max_wait=5.0)
+    group = PriorityGroup(PRIORITY_BACKGROUND)
+    order = []
+
+    async def take(label, priority=None):
+        await bucket.acquire(priority)
+        order.append(label)
+
+    async def take_in_group(label):
+        priority_group.set(group)
+        await take(label)
+
+    async def run():
+        await bucket.acquire(PRIORITY_INTERACTIVE)
+        background = asyncio.create_task(take("background", PRIORITY_BACKGROUND))
+        refresh = asyncio.create_task(take_in_group("refresh"))
+        await asyncio.sleep(0)
+        group.escalate(PRIORITY_INTERACTIVE)
+        interactive = asyncio.create_task(take("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.gather(background, refresh, interactive)
+
+    ratelimit._limiters["test"] = bucket
+    try:
+        asyncio.run(run())
+    finally:
+        del ratelimit._limiters["test"]
+
+    assert order == ["refresh", "interactive", "background"]
@@ -0,0 +1,89 @@
+"""Test recording upstream responses and replaying them offline."""
+import asyncio
+import tempfile
+
+import httpx
+
+from config import settings
+from services.recording import RecordReplayTransport, ResponseStore, request_key
+
+
+def _upstream(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"path": request.url.path}, headers={"X-Other": "dropped"})
+
+
+def test_request_key_ignores_api_key_and_param_order():
+    a = httpx.Request("GET", "https://api.etherscan.io/v2/api?module=contract&apikey=secret&address=0x1")
+    b = httpx.Request("GET", "https://api.etherscan.io/v2/api?address=0x1&module=contract")
+    assert request_key(a) == request_key(b)
+    assert "secret" not in request_key(a)
+
+
+def test_replay_serves_recorded_responses_without_network():
+    async def run(root):
+        store = ResponseStore(root)
+        recorder = RecordReplayTransport("record", store, httpx.MockTransport(_upstream))
+        async with httpx.AsyncClient(transport=recorder) as client:
+            recorded = await client.get("https://api.dexscreener.com/tokens/0xabc")
+            await client.get("https://api.dexscreener.com/tokens/0xdef")
+        assert recorded.json() == {"path": "/tokens/0xabc"}
+
+        # A fresh store reads the index back from disk.
+        reloaded = ResponseStore(root)
+        assert len(reloaded) == 2
+        replayer = RecordReplayTransport("replay", reloaded, latency_scale=0)
+        async with httpx.AsyncClient(transport=replayer) as client:
+            replayed = await client.get("https://api.dexscreener.com/tokens/0xabc")
+            missing = await client.get("https://api.dexscreener.com/tokens/0x999")
+        return replayed, missing
+
+    with tempfile.TemporaryDirectory() as root:
+        replayed, missing = asyncio.run(run(root))
+
+    assert replayed.status_code == 200
+    assert replayed.json() == {"path": "/tokens/0xabc"}
+    assert replayed.headers["content-type"] == "application/json"
+    assert "x-other" not in replayed.headers
+    assert missing.status_code == 404 and missing.headers["X-Replay-Miss"] == "1"
+
+
+def test_identical_bodies_are_stored_once():
+    with tempfile.TemporaryDirectory() as root:
+        store = ResponseStore(root)
+        store.put("GET https://a/1", 200, {}, b"same body", 0.01)
+        store.put("GET https://a/2", 200, {}, b"same body", 0.02)
+        blobs = list(store.root.glob("blobs/*/*.z"))
+        assert len(blobs) == 1
+        assert store.body(store.get("GET https://a/2")["body"]) == b"same body"
+
+
+def test_upstream_clients_replay_from_settings():
+    from services.clients import UpstreamClients
+
+    async def run(root):
+        store = ResponseStore(root)
+        store.put("GET https://api.gopluslabs.io/api/v1/token_security/1", 200,
+                  {"content-type": "application/json"}, b'{"code": 1}', 0.0)
+        upstreams = UpstreamClients()
+        try:
+            response = await upstreams.get("goplus").get("https://api.gopluslabs.io/api/v1/token_security/1")
+        finally:
+            await upstreams.aclose()
+        return response
+
+    with tempfile.TemporaryDirectory() as root:
+        settings.upstream_mode, settings.upstream_record_dir = "replay", root
+        try:
+            response = asyncio.run(run(root))
+        finally:
+            settings.upstream_mode, settings.upstream_record_dir = "off", "recordings"
+
+    assert response.json() == {"code": 1}
+
+
+if __name__ == "__main__":
+    test_request_key_ignores_api_key_and_param_order()
+    test_replay_serves_recorded_responses_without_network()
+    test_identical_bodies_are_stored_once()
+    test_upstream_clients_replay_from_settings()
+    print("All tests passed!")
@@ -1,7 +1,23 @@
 """Test the scoring engine with known inputs."""
-from scoring import compute_risk_score
+import json
+import random
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+import cache
+import scoring_rules
+from batch_scoring import SignalColumns, score_columns, score_infos
+from scoring import compute_risk_score, score_incrementally
+from scoring_rules import compile_rules, get_rules, load_rules
+from cache_backends import SQLiteBackend
+from config import settings
 from models import TokenInfo, MarketInfo, HoldersInfo, AdminInfo, TradeRiskInfo
 
+ADMIN_FLAGS = [flag for flag, _, _ in get_rules().admin_flag_scores]
+
 
 def test_low_risk_token():
     token = TokenInfo(address="0x" + "a" * 40, name="USDT", symbol="USDT", verified=True, age_days=2000)
@@ -37,8 +53,160 @@ def test_missing_data_doesnt_crash():
     assert score.label in ("LOW", "MEDIUM", "HIGH")
 
 
+def _random_signals(rng: random.Random):
+    def maybe(value, p=0.2):
+        return None if rng.random() < p else value
+
+    def pct():
+        return rng.choice([0, 5, 10, 10.5, 20, 20.01, 30, 50, 70, 70.5, rng.uniform(0, 100)])
+
+    token = TokenInfo(
+        address="0x" + "d" * 40,
+        verified=rng.choice([None, True, False]),
+        age_days=maybe(rng.choice([0, 2, 3, 6, 7, 29, 30, 89, 90, 1000]), 0.3),
+    )
+    market = maybe(MarketInfo(
+        liquidity_usd=maybe(rng.choice([0, 4_999.5, 5_000, 19_999, 20_000, 49_999, 50_000, 99_999, 100_000, rng.uniform(0, 1e6)])),
+        pair_created_at=maybe(1_600_000_000_000, 0.5),
+    ))
+    holders = maybe(HoldersInfo(
+        top1_pct=maybe(pct()),
+        top5_pct=maybe(pct()),
+        holder_count=rng.choice([None, "10", "49", "50", "199", "200", "1000000", "n/a", ""]),
+    ))
+    admin = AdminInfo(
+        has_owner=rng.choice([None, True, False]),
+        owner_renounced=rng.choice([None, True, False]),
+        flags=rng.sample(ADMIN_FLAGS + ["external_call_risk", "pause_function_detected"], rng.randint(0, 6)),
+    )
+    trade_risk = maybe(TradeRiskInfo(
+        honeypot=rng.random() < 0.1,
+        cannot_sell=rng.random() < 0.2,
+        cannot_buy=rng.random() < 0.2,
+        sell_tax_pct=maybe(pct()),
+        buy_tax_pct=maybe(pct()),
+    ))
+    return token, market, holders, admin, trade_risk
+
+
+def test_batch_scorer_matches_scalar_scorer():
+    rng = random.Random(1234)
+    signals = [_random_signals(rng) for _ in range(3000)]
+
+    cols = SignalColumns.from_signals(signals)
+    scores = score_columns(cols)
+    batch = score_infos(cols, scores)
+
+    for signal, batch_score in zip(signals, batch):
+        assert batch_score == compute_risk_score(*signal)
+    assert {"LOW", "MEDIUM", "HIGH"} <= set(scores.label)
+
+
+def test_batch_scorer_matches_scalar_scorer_under_other_rules():
+    rng = random.Random(99)
+    signals = [_random_signals(rng) for _ in range(1000)]
+    base = get_rules()
+    rules = replace(
+        base,
+        version="test",
+        label_thresholds=((50, "HIGH"), (20, "MEDIUM")),
+        liquidity_tiers=((10_000, 20, "Thin liquidity (${value:,.0f})."),),
+        admin_flag_scores=base.admin_flag_scores[::-1][:5],
+    )
+
+    cols = SignalColumns.from_signals(signals)
+    batch = score_infos(cols, rules=rules)
+
+    for signal, batch_score in zip(signals, batch):
+        assert batch_score == compute_risk_score(*signal, rules=rules)
+        assert batch_score.rules_version == "test"
+
+
+def test_incremental_rescoring_matches_full_scoring():
+    rng = random.Random(7)
+    for _ in range(2000):
+        before = _random_signals(rng)
+        fresh = _random_signals(rng)
+        # Each component either carries over unchanged or is replaced.
+        after = tuple(b if rng.random() < 0.6 else f for b, f in zip(before, fresh))
+        _, breakdown, _ = score_incrementally(*before)
+        score, _, _ = score_incrementally(*after, previous=breakdown)
+        assert score == compute_risk_score(*after)
+
+
+def test_only_changed_categories_are_recomputed():
+    token = TokenInfo(address="0x" + "e" * 40, verified=True, age_days=400)
+    holders = HoldersInfo(top1_pct=30, top5_pct=60, holder_count="900")
+    admin = AdminInfo(has_owner=True, owner_renounced=False, flags=["mint_function_detected"])
+    trade_risk = TradeRiskInfo(sell_tax_pct=12, buy_tax_pct=3)
+
+    _, first, recomputed = score_incrementally(token, MarketInfo(liquidity_usd=40_000), holders, admin, trade_risk)
+    assert len(recomputed) == 6
+    score, _, recomputed = score_incrementally(
+        token, MarketInfo(liquidity_usd=41_000), holders, admin, trade_risk, previous=first,
+    )
+    assert recomputed == ["liquidity"]
+    assert "Low liquidity ($41,000)." in score.reasons
+
+    # A different rules version invalidates every cached category.
+    rules = replace(get_rules(), version="other")
+    _, _, recomputed = score_incrementally(
+        token, MarketInfo(liquidity_usd=41_000), holders, admin, trade_risk, rules=rules, previous=first,
+    )
+    assert len(recomputed) == 6
+
+
+def test_rule_table_round_trip_and_validation():
+    with open(Path(__file__).parent / "scoring_rules.json", encoding="utf-8") as f:
+        table = json.load(f)
+    assert compile_rules(table) == load_rules()
+
+    for bad_reason in ("{value:>999999999}", "{other}", "{value[0]}", "unclosed {value"):
+        broken = json.loads(json.dumps(table))
+        broken["liquidity"]["liquidity_usd"][0]["reason"] = bad_reason
+        with pytest.raises(ValueError):
+            compile_rules(broken)
+
+    broken = json.loads(json.dumps(table))
+    broken["age"]["age_days"][0]["below"] = "three"
+    with pytest.raises(ValueError):
+        compile_rules(broken)
+
+    del table["liquidity"]["missing"]
+    with pytest.raises(ValueError):
+        compile_rules(table)
+
+
+def test_reloaded_rules_reach_other_workers(tmp_path):
+    with open(Path(__file__).parent / "scoring_rules.json", encoding="utf-8") as f:
+        table = json.load(f)
+    table["version"] = "reloaded"
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps(table), encoding="utf-8")
+
+    original_backend, original_rules, original_table = cache._backend, get_rules(), scoring_rules._active_table
+    cache._backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    try:
+        # This worker reloads; a second worker still has the original rules.
+        scoring_rules.reload_rules(str(rules_file))
+        scoring_rules._active_rules, scoring_rules._active_table = original_rules, original_table
+        settings.scoring_rules_sync_seconds = 0
+        assert get_rules().version == "reloaded"
+    finally:
+        settings.scoring_rules_sync_seconds = 5.0
+        cache._backend = original_backend
+        scoring_rules._active_rules, scoring_rules._active_table = original_rules, original_table
+
+
 if __name__ == "__main__":
     test_low_risk_token()
     test_honeypot_scores_high()
     test_missing_data_doesnt_crash()
+    test_batch_scorer_matches_scalar_scorer()
+    test_batch_scorer_matches_scalar_scorer_under_other_rules()
+    test_incremental_rescoring_matches_full_scoring()
+    test_only_changed_categories_are_recomputed()
+    test_rule_table_round_trip_and_validation()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_reloaded_rules_reach_other_workers(Path(tmp))
     print("All tests passed!")
@@ -0,0 +1,47 @@
+"""Test single-flight coalescing of concurrent identical calls."""
+import asyncio
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("ethereum:0xabc", work) for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert results == ["result"] * 10
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "executions": 1, "coalesced": 9, "errors": 0}
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("k", boom) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["errors"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_execution()
+    test_exception_reaches_every_caller()
+    print("All tests passed!")
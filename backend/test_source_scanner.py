@@ -0,0 +1,45 @@
+"""Test the verified-source feature scanner."""
+import json
+
+from source_scanner import scan_source
+
+PLAIN = """
+// mint tokens here? no: this comment must be ignored. blacklist pause
+pragma solidity ^0.8.0;
+contract Token is Ownable {
+    string constant NOTE = "setFee is not called here";
+    uint256 public administrator;
+    function _mint(address to, uint256 amount) internal {}
+    function setTaxFeePercent(uint256 fee) external onlyOwner {}
+    /* function pause() external {} */
+}
+"""
+
+
+def test_plain_source_matches_identifiers_not_comments():
+    flags = scan_source(PLAIN)
+    assert flags == (
+        "mint_function_detected",
+        "fee_modification_detected",
+        "tax_modification_detected",
+        "owner_restricted_functions",
+    )
+
+
+def test_standard_json_multi_file_source():
+    standard_json = {
+        "language": "Solidity",
+        "sources": {
+            "contracts/Token.sol": {"content": "contract T {\n// pause\nbool tradingEnabled;\n}"},
+            "contracts/Guard.sol": {"content": "contract G { mapping(address => bool) isBlacklisted; }"},
+        },
+    }
+    flags = scan_source("{" + json.dumps(standard_json) + "}")
+    assert flags == ("blacklist_terms_detected", "trading_toggle_detected")
+
+
+def test_results_are_memoized_by_source_hash():
+    source = "contract M { function whenNotPaused() {} }"
+    first = scan_source(source)
+    assert first == ("pause_function_detected",)
+    assert scan_source(source) is first
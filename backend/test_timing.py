@@ -0,0 +1,48 @@
+"""Test the Server-Timing breakdown and the sampling profiler."""
+import asyncio
+import time
+
+from profiler import SamplingProfiler
+from timing import add_timing, server_timing_header, start_timing, timed
+
+
+def test_child_tasks_record_into_the_request_breakdown():
+    async def fetch(source):
+        with timed(source):
+            await asyncio.sleep(0.01)
+
+    async def request():
+        timings = start_timing()
+        with timed("cache"):
+            pass
+        await asyncio.gather(fetch("dexscreener"), fetch("goplus"))
+        add_timing("score", 0.002)
+        add_timing("score", 0.001)
+        return timings
+
+    timings = asyncio.run(request())
+    assert list(timings) == ["cache", "dexscreener", "goplus", "score"]
+    assert timings["dexscreener"] >= 0.01
+    assert server_timing_header({"score": 0.003}, total=0.0125) == "score;dur=3.0, total;dur=12.5"
+
+    add_timing("outside_request", 1.0)  # no active breakdown: ignored
+
+
+def test_profiler_finds_the_hot_function():
+    def spin():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    with SamplingProfiler(interval=0.002) as profiler:
+        spin()
+
+    summary = profiler.summary(top=3)
+    assert summary["samples"] > 10
+    assert "spin" in summary["hot_functions"][0]["frame"]
+
+
+if __name__ == "__main__":
+    test_child_tasks_record_into_the_request_breakdown()
+    test_profiler_finds_the_hot_function()
+    print("All tests passed!")
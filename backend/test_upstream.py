@@ -0,0 +1,75 @@
+"""Test upstream retries and hedged requests."""
+import asyncio
+import httpx
+
+import ratelimit
+from services import upstream
+from services.upstream import upstream_get
+
+
+def test_retries_honor_retry_after_then_succeed():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) < 3:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await upstream_get(client, "goplus", "https://example.test/")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert len(attempts) == 3
+
+
+def test_slow_first_attempt_is_hedged_and_cancelled():
+    upstream._latencies["dexscreener"] = upstream.deque([0.01] * 50, maxlen=200)
+    attempts = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) == 1:
+            await asyncio.sleep(5)
+        return httpx.Response(200, json={"attempt": len(attempts)})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.wait_for(
+                upstream_get(client, "dexscreener", "https://example.test/"), timeout=1,
+            )
+
+    try:
+        response = asyncio.run(run())
+    finally:
+        upstream._latencies.pop("dexscreener")
+
+    assert response.json() == {"attempt": 2}
+    assert upstream.upstream_stats()["dexscreener"]["hedge_wins"] == 1
+
+
+def test_requests_queued_for_a_rate_limit_slot_are_not_hedged():
+    upstream._latencies["etherscan"] = upstream.deque([0.01] * 50, maxlen=200)
+    ratelimit._limiters["etherscan"] = ratelimit.TokenBucket("etherscan", rate=20, burst=1, max_wait=5)
+    hedges_before = upstream._counters("etherscan")["hedges"]
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        return httpx.Response(200)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            # Most of these wait in the limiter's queue far longer than the hedge delay.
+            await asyncio.gather(*(upstream_get(client, "etherscan", "https://example.test/") for _ in range(12)))
+
+    try:
+        asyncio.run(run())
+    finally:
+        upstream._latencies.pop("etherscan")
+        ratelimit._limiters.pop("etherscan")
+
+    assert len(attempts) == 12
+    assert upstream._counters("etherscan")["hedges"] == hedges_before
@@ -0,0 +1,85 @@
+"""Test hot-key tracking and the bounded watchlist refresh cycle."""
+import asyncio
+import time
+
+import cache
+from config import settings
+from models import AdminInfo, AnalyzeResponse, LinksInfo, ScoreInfo, TokenInfo
+from watchlist import RequestTracker, due_keys, pinned_keys, refresh_cycle
+
+
+def test_tracker_ranks_recent_traffic():
+    tracker = RequestTracker(decay=0.5)
+    for _ in range(5):
+        tracker.record("ethereum:0xold")
+    tracker.decay()
+    tracker.decay()
+    for _ in range(2):
+        tracker.record("base:0xnew")
+    tracker.record("ethereum:0xrare")
+
+    assert tracker.top(2) == ["base:0xnew", "ethereum:0xold"]
+    for _ in range(5):
+        tracker.decay()
+    assert len(tracker) == 0
+
+
+def test_due_keys_include_missing_and_nearly_stale_reports():
+    pinned_a, pinned_b = "0x" + "aa" * 20, "0x" + "bb" * 20
+    settings.watchlist_tokens = (
+        f"Ethereum:{pinned_a.upper().replace('0X', '0x')}, base:{pinned_b},bogus,"
+        f"solana:{pinned_b},base:0x123,ethereum:{pinned_a}"
+    )
+    try:
+        score = ScoreInfo(risk_score=10, label="LOW")
+        cache.set_cached(f"ethereum:{pinned_a}", score, stored_at=time.time() - settings.cache_ttl_seconds + 10)
+        cache.set_cached(f"base:{pinned_b}", score)
+        # No DEX pair: only fresh for the short no-pair TTL, so it's due much sooner.
+        unlisted = AnalyzeResponse(
+            token=TokenInfo(address="0xddd"), admin=AdminInfo(), score=score, links=LinksInfo(),
+        )
+        cache.set_cached("bsc:0xddd", unlisted, stored_at=time.time() - 60)
+
+        stats = dict(cache._stats)
+        # Pins are normalized to cache keys; unknown chains and bad addresses are dropped.
+        assert pinned_keys() == [f"ethereum:{pinned_a}", f"base:{pinned_b}"]
+        assert due_keys(pinned_keys() + ["arbitrum:0xccc", "bsc:0xddd"]) == [
+            f"ethereum:{pinned_a}", "arbitrum:0xccc", "bsc:0xddd",
+        ]
+        # Checking what's due isn't a cache lookup.
+        assert cache._stats == stats
+    finally:
+        settings.watchlist_tokens = ""
+    assert pinned_keys() == []
+
+
+def test_refresh_cycle_bounds_concurrency_and_survives_errors():
+    settings.watchlist_concurrency = 2
+    running = 0
+    peak = 0
+    refreshed = []
+
+    async def refresh(key):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if key == "ethereum:0xbad":
+            raise RuntimeError("upstream down")
+        refreshed.append(key)
+
+    keys = [f"ethereum:0x{i}" for i in range(6)] + ["ethereum:0xbad"]
+    try:
+        assert asyncio.run(refresh_cycle(refresh, keys)) == 6
+    finally:
+        settings.watchlist_concurrency = 4
+    assert peak == 2
+    assert sorted(refreshed) == sorted(keys[:-1])
+
+
+if __name__ == "__main__":
+    test_tracker_ranks_recent_traffic()
+    test_due_keys_include_missing_and_nearly_stale_reports()
+    test_refresh_cycle_bounds_concurrency_and_survives_errors()
+    print("All tests passed!")
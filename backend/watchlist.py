@@ -0,0 +1,129 @@
+"""
+Watchlist refresher that keeps hot tokens warm.
+
+Counts requests per chain:address (with decay each cycle, so the ranking
+follows recent traffic) and periodically re-analyzes the top-K tokens plus any
+pinned in settings.watchlist_tokens shortly before their cached report goes
+stale. Refreshes run through a small concurrency pool at background priority,
+so they queue behind interactive lookups in the upstream rate limiters.
+"""
+import asyncio
+import heapq
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+
+from analyzer import normalize_address
+from cache import peek_cached_entry
+from config import get_chain_config, settings
+from logs import get_logger
+
+logger = get_logger(__name__)
+
+
+class RequestTracker:
+    def __init__(self, decay: float = 0.5):
+        self.decay_factor = decay
+        self._counts: Dict[str, float] = {}
+
+    def record(self, key: str) -> None:
+        self._counts[key] = self._counts.get(key, 0.0) + 1.0
+
+    def decay(self) -> None:
+        """Scale every count down and forget keys that have gone cold."""
+        self._counts = {
+            key: count * self.decay_factor
+            for key, count in self._counts.items()
+            if count * self.decay_factor >= 0.1
+        }
+
+    def top(self, k: int) -> List[str]:
+        return heapq.nlargest(k, self._counts, key=self._counts.get)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+tracker = RequestTracker()
+_stats = {"cycles": 0, "refreshed": 0, "errors": 0, "last_cycle_at": None}
+# (settings.watchlist_tokens, its parsed keys), so pins are validated once per value.
+_pins: Tuple[str, List[str]] = ("", [])
+
+
+def pinned_keys() -> List[str]:
+    """
+    Parse settings.watchlist_tokens ("chain:address,chain:address") into
+    normalized cache keys. Pins with an unknown chain or a bad address are
+    logged and skipped; duplicates are dropped.
+    """
+    global _pins
+    raw = settings.watchlist_tokens
+    if raw == _pins[0]:
+        return list(_pins[1])
+
+    keys = []
+    for item in raw.split(","):
+        if not item.strip():
+            continue
+        chain, _, address = item.strip().partition(":")
+        chain = chain.strip().lower()
+        try:
+            get_chain_config(chain)
+            keys.append(f"{chain}:{normalize_address(address)}")
+        except ValueError as e:
+            logger.warning("Skipping watchlist pin", extra={"pin": item.strip(), "error": str(e)})
+    _pins = (raw, list(dict.fromkeys(keys)))
+    return list(_pins[1])
+
+
+def due_keys(keys: Iterable[str]) -> List[str]:
+    """
+    Keys with no cached report, or one that goes stale within the refresh-ahead
+    window. Checking doesn't count as a cache lookup, and each entry's own
+    freshness (shorter for tokens without a DEX pair) decides when it's due.
+    """
+    ahead = settings.watchlist_refresh_ahead_seconds
+    due = []
+    for key in keys:
+        entry = peek_cached_entry(key)
+        if entry is None or entry.age >= entry.fresh_for - ahead:
+            due.append(key)
+    return due
+
+
+async def refresh_cycle(refresh: Callable[[str], Awaitable], keys: List[str]) -> int:
+    """Refresh keys with at most settings.watchlist_concurrency in flight. Returns successes."""
+    semaphore = asyncio.Semaphore(max(1, settings.watchlist_concurrency))
+
+    async def refresh_one(key: str) -> bool:
+        async with semaphore:
+            try:
+                await refresh(key)
+                return True
+            except Exception as e:
+                logger.warning("Watchlist refresh failed", extra={"cache_key": key, "error": str(e)})
+                return False
+
+    results = await asyncio.gather(*(refresh_one(key) for key in keys))
+    refreshed = sum(results)
+    _stats["cycles"] += 1
+    _stats["refreshed"] += refreshed
+    _stats["errors"] += len(results) - refreshed
+    _stats["last_cycle_at"] = time.time()
+    return refreshed
+
+
+async def run_refresher(refresh: Callable[[str], Awaitable]) -> None:
+    """Refresh loop for the app lifespan; runs until cancelled."""
+    while True:
+        await asyncio.sleep(settings.watchlist_interval_seconds)
+        keys = list(dict.fromkeys(pinned_keys() + tracker.top(settings.watchlist_top_k)))
+        await refresh_cycle(refresh, due_keys(keys))
+        tracker.decay()
+
+
+def watchlist_stats() -> dict:
+    return {
+        "tracked": len(tracker),
+        "pinned": len(pinned_keys()),
+        **_stats,
+    }
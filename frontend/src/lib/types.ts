@@ -51,6 +51,7 @@ export interface ScoreInfo {
   risk_score: number;
   label: "LOW" | "MEDIUM" | "HIGH";
   reasons: string[];
+  rules_version?: string | null;
 }
 
 export interface LinksInfo {
@@ -66,11 +67,14 @@ export interface AnalyzeResponse {
   trade_risk: TradeRiskInfo | null;
   score: ScoreInfo;
   links: LinksInfo;
+  partial: boolean;
+  skipped_sources: Record<string, string>;
 }
 
 export interface AnalyzeRequest {
   chain: string;
   token_address: string;
+  budget_ms?: number;
 }
 
 export type Chain = "ethereum" | "base" | "arbitrum" | "polygon" | "bsc";